@@ -0,0 +1,299 @@
+"""
+Account creation for signup and bulk onboarding, and account deletion.
+
+Both creation paths create the ``User`` row and its ``Doctor``/``Patient``
+profile in one transaction, and rely on the unique ``email`` constraint
+instead of a pre-query to detect existing accounts.
+
+Deletion is a single ``DELETE FROM "user"``: profiles, appointments and
+tombstones follow through ``ON DELETE CASCADE``. Bulk purges run it in
+batches of ``PURGE_BATCH_SIZE`` users, one short transaction each.
+"""
+
+import csv
+import io
+import json
+from datetime import date as date_cls
+
+from sqlalchemy import delete, exists, insert, select
+
+from models import db, insert_ignore, User, Doctor, Patient, Appointment
+from passwords import password_hasher
+from slots import DEFAULT_AVAILABILITY, parse_availability
+from sync import record_deletions
+from versions import ROLE_SCOPES, bump, doctor_scope
+
+ROLES = ("Doctor", "Patient", "Admin")
+REQUIRED_FIELDS = ("name", "email", "password", "role")
+IMPORT_BATCH_SIZE = 1000
+# Every imported row costs a password hash inside the request (~170 ms at the
+# default scrypt cost), which must finish within GUNICORN_TIMEOUT (30 s): 100
+# rows take ~17 s even when the hashing workers share a single core
+MAX_IMPORT_ROWS = 100
+PURGE_ROLES = ("Doctor", "Patient")
+PURGE_BATCH_SIZE = 500
+MAX_PURGE_IDS = 10_000
+
+
+def validate_account(data):
+    """
+    Checks a signup payload.
+
+    Returns:
+        str: Error message, or None if the payload is valid.
+    """
+    if not all(data.get(field) for field in REQUIRED_FIELDS):
+        return "Missing required fields"
+
+    if data["role"] not in ROLES:
+        return "Invalid role. Please select 'Doctor', 'Patient', or 'Admin'."
+
+    # Validate the doctor's availability spec before creating anything
+    if data["role"] == "Doctor":
+        try:
+            parse_availability(data.get("available_slots") or DEFAULT_AVAILABILITY)
+        except ValueError as e:
+            return f"Invalid available_slots: {str(e)}"
+
+    return None
+
+
+def profile_row(user_id, data):
+    """Values of the Doctor/Patient row belonging to a new user, or None."""
+    if data["role"] == "Doctor":
+        return {
+            "id": user_id,
+            "name": data["name"],
+            "email": data["email"],
+            "specialty": data.get("specialty") or "General",
+            "available_slots": data.get("available_slots") or DEFAULT_AVAILABILITY,
+        }
+    if data["role"] == "Patient":
+        return {"id": user_id, "name": data["name"], "email": data["email"]}
+    return None
+
+
+def create_account(data):
+    """
+    Adds a user and its profile to the session, flushing once to get the ID.
+
+    The caller commits; a duplicate email raises ``IntegrityError``.
+    """
+    user = User(name=data["name"], email=data["email"], role=data["role"])
+    user.set_password(data["password"])
+    db.session.add(user)
+    db.session.flush()
+
+    profile = profile_row(user.id, data)
+    if profile is not None:
+        model = Doctor if data["role"] == "Doctor" else Patient
+        db.session.add(model(**profile))
+    bump(ROLE_SCOPES[data["role"]])
+    return user
+
+
+def parse_import(body, content_type):
+    """
+    Reads import rows from a JSON ``{"users": [...]}`` body or a CSV upload.
+
+    CSV columns: name, email, password, role, specialty, available_slots.
+    """
+    if content_type.startswith("text/csv"):
+        return list(csv.DictReader(io.StringIO(body.decode("utf-8-sig"))))
+
+    users = json.loads(body or b"{}").get("users")
+    if not isinstance(users, list) or not all(isinstance(u, dict) for u in users):
+        raise ValueError("Expected {'users': [...]} or a CSV body")
+    return users
+
+
+def import_accounts(rows):
+    """
+    Creates many accounts with batched multi-row INSERTs.
+
+    Invalid rows and rows whose email is already taken are skipped and
+    reported; everything else is written in a single transaction.
+
+    Returns:
+        dict: ``created`` count, ``skipped`` emails and per-row ``errors``.
+    """
+    if len(rows) > MAX_IMPORT_ROWS:
+        raise ValueError(f"At most {MAX_IMPORT_ROWS} rows per import")
+
+    valid, errors, seen = [], [], set()
+    for index, row in enumerate(rows):
+        error = validate_account(row)
+        if error is None and row["email"] in seen:
+            error = "Duplicate email in import"
+        if error:
+            errors.append({"row": index, "email": row.get("email"), "error": error})
+            continue
+        seen.add(row["email"])
+        valid.append(row)
+
+    hashes = password_hasher.hash_many([row["password"] for row in valid])
+
+    created, skipped, roles = 0, [], set()
+    for start in range(0, len(valid), IMPORT_BATCH_SIZE):
+        batch = valid[start : start + IMPORT_BATCH_SIZE]
+        batch_hashes = hashes[start : start + IMPORT_BATCH_SIZE]
+        stmt = (
+            insert_ignore(User)
+            .values(
+                [
+                    {
+                        "name": row["name"],
+                        "email": row["email"],
+                        "password_hash": password_hash,
+                        "role": row["role"],
+                    }
+                    for row, password_hash in zip(batch, batch_hashes)
+                ]
+            )
+            .on_conflict_do_nothing(index_elements=["email"])
+            .returning(User.id, User.email)
+        )
+        inserted = {email: user_id for user_id, email in db.session.execute(stmt)}
+
+        profiles = {Doctor: [], Patient: []}
+        for row in batch:
+            if row["email"] not in inserted:
+                skipped.append(row["email"])
+                continue
+            roles.add(row["role"])
+            profile = profile_row(inserted[row["email"]], row)
+            if profile is not None:
+                profiles[Doctor if row["role"] == "Doctor" else Patient].append(profile)
+
+        for model, values in profiles.items():
+            if values:
+                db.session.execute(insert(model).values(values))
+        created += len(inserted)
+
+    bump(*(ROLE_SCOPES[role] for role in roles))
+    return {"created": created, "skipped": skipped, "errors": errors}
+
+
+def delete_accounts(user_ids, roles=PURGE_ROLES):
+    """
+    Deletes users of ``roles`` with everything that belongs to them.
+
+    The caller commits. Patients' appointments are read before the delete, as
+    the cascade leaves no trace of them, so the doctors' sync clients still get
+    tombstones and 'deleted' events.
+
+    Args:
+        user_ids (list): IDs of the users to delete.
+        roles (tuple): Only users with one of these roles are deleted.
+
+    Returns:
+        dict: Role of every deleted user, by ID.
+    """
+    appointments = []
+    if "Patient" in roles:
+        appointments = db.session.execute(
+            select(
+                Appointment.id,
+                Appointment.doctor_id,
+                Appointment.date,
+                Appointment.patient_id,
+            ).where(Appointment.patient_id.in_(user_ids))
+        ).all()
+
+    deleted = dict(
+        db.session.execute(
+            delete(User)
+            .where(User.id.in_(user_ids), User.role.in_(roles))
+            .returning(User.id, User.role),
+            execution_options={"synchronize_session": False},
+        ).all()
+    )
+    if not deleted:
+        return deleted
+
+    # Deleted doctors' schedules and tombstones are gone with them
+    record_deletions(
+        [
+            (appointment_id, doctor_id, day)
+            for appointment_id, doctor_id, day, patient_id in appointments
+            if patient_id in deleted and doctor_id not in deleted
+        ]
+    )
+    doctors = [user_id for user_id, role in deleted.items() if role == "Doctor"]
+    bump(
+        *(ROLE_SCOPES[role] for role in deleted.values()),
+        *(doctor_scope(doctor_id) for doctor_id in doctors),
+    )
+    return deleted
+
+
+def parse_purge_request(data):
+    """
+    Validates a purge request body.
+
+    Expected JSON payload, one of:
+        {"ids": [1, 2, 3]}                    doctors and patients by ID
+        {"inactive_since": "2024-01-01"}      patients whose last appointment
+                                              is before that date
+
+    Returns:
+        tuple: (list of IDs or None, date or None)
+
+    Raises:
+        ValueError: If neither or both selectors are given, or they are invalid.
+    """
+    data = data or {}
+    ids, since = data.get("ids"), data.get("inactive_since")
+    if (ids is None) == (since is None):
+        raise ValueError("Provide either 'ids' or 'inactive_since'")
+
+    if ids is not None:
+        if not isinstance(ids, list) or not 0 < len(ids) <= MAX_PURGE_IDS:
+            raise ValueError(f"'ids' must be a list of 1 to {MAX_PURGE_IDS} IDs")
+        return sorted({int(i) for i in ids}), None
+
+    return None, date_cls.fromisoformat(since)
+
+
+def inactive_patients(since, after, limit):
+    """
+    IDs of patients with appointments, none of them on or after ``since``.
+
+    Patients without any appointment are left alone: nothing tells a new
+    account from an abandoned one.
+    """
+    return list(
+        db.session.execute(
+            select(Patient.id)
+            .where(
+                Patient.id > after,
+                exists().where(Appointment.patient_id == Patient.id),
+                ~exists().where(
+                    Appointment.patient_id == Patient.id, Appointment.date >= since
+                ),
+            )
+            .order_by(Patient.id)
+            .limit(limit)
+        ).scalars()
+    )
+
+
+def purge_batches(ids=None, since=None, batch_size=PURGE_BATCH_SIZE):
+    """
+    Yields the IDs of the users to purge, ``batch_size`` at a time.
+
+    The caller deletes and commits each batch before asking for the next, so
+    no transaction holds locks on more than one batch of rows.
+    """
+    if ids is not None:
+        for start in range(0, len(ids), batch_size):
+            yield ids[start : start + batch_size]
+        return
+
+    after = 0
+    while True:
+        batch = inactive_patients(since, after, batch_size)
+        if not batch:
+            return
+        yield batch
+        after = batch[-1]
@@ -0,0 +1,183 @@
+"""
+Appointment analytics from the ``appointment_stat`` rollup.
+
+``appointment_stat`` holds the number of appointments per doctor, day and
+status. Every write path already reports the appointments it touched to
+``sync.py`` (``record_changes``/``record_deletions``), which recounts the
+affected (doctor, day) pairs from ``appointment`` in the same transaction:
+
+- a recount reads at most one day of one doctor per pair, through the
+  unique slot index;
+- it runs after the doctor's change counter was bumped, and that row stays
+  locked until commit, so concurrent writes to one doctor recount one after
+  the other and the last recount sees all of them.
+
+Dashboards sum a few rollup rows per doctor and day instead of scanning
+appointments. ``check`` recomputes the rollup from ``appointment`` and reports,
+or repairs, the differences, e.g. after writes that bypassed the application.
+Doctors' rows go with them through ``ON DELETE CASCADE``.
+"""
+
+from collections import defaultdict
+
+from sqlalchemy import delete, func, insert, select, tuple_
+
+from directory import doctor_directory
+from models import db, Appointment, AppointmentStat
+from slots import slot_engine
+
+GROUPS = ("specialty", "doctor")
+MAX_ANALYTICS_DAYS = 366
+REFRESH_CHUNK = 500  # (doctor, day) pairs per recount statement
+
+
+def recount_query(*criteria):
+    """Per doctor, day and status appointment counts from the base table."""
+    return (
+        select(
+            Appointment.doctor_id,
+            Appointment.date,
+            Appointment.status,
+            func.count(),
+        )
+        .where(*criteria)
+        .group_by(Appointment.doctor_id, Appointment.date, Appointment.status)
+    )
+
+
+def refresh_days(days):
+    """
+    Recounts the rollup rows of (doctor ID, date) pairs in this transaction.
+
+    Args:
+        days: (doctor ID, date) pairs whose appointments changed.
+    """
+    days = sorted(set(days))
+    for start in range(0, len(days), REFRESH_CHUNK):
+        chunk = days[start : start + REFRESH_CHUNK]
+        db.session.execute(
+            delete(AppointmentStat).where(
+                tuple_(AppointmentStat.doctor_id, AppointmentStat.date).in_(chunk)
+            ),
+            execution_options={"synchronize_session": False},
+        )
+        db.session.execute(
+            insert(AppointmentStat).from_select(
+                ["doctor_id", "date", "status", "count"],
+                recount_query(
+                    tuple_(Appointment.doctor_id, Appointment.date).in_(chunk)
+                ),
+            )
+        )
+
+
+def rebuild():
+    """Recounts the whole rollup in this transaction, e.g. after bulk loads."""
+    db.session.execute(delete(AppointmentStat))
+    db.session.execute(
+        insert(AppointmentStat).from_select(
+            ["doctor_id", "date", "status", "count"], recount_query()
+        )
+    )
+
+
+def check(repair=False):
+    """
+    Compares the rollup with a full recount of ``appointment``.
+
+    Args:
+        repair (bool): Recount the days that differ; the caller commits.
+
+    Returns:
+        list: ``{"doctor_id", "date", "status", "expected", "actual"}`` of
+        every row that differs.
+    """
+    expected = {
+        (doctor_id, day, status): count
+        for doctor_id, day, status, count in db.session.execute(recount_query())
+    }
+    actual = {
+        (doctor_id, day, status): count
+        for doctor_id, day, status, count in db.session.execute(
+            select(
+                AppointmentStat.doctor_id,
+                AppointmentStat.date,
+                AppointmentStat.status,
+                AppointmentStat.count,
+            )
+        )
+    }
+    differing = sorted(
+        key
+        for key in expected.keys() | actual.keys()
+        if expected.get(key, 0) != actual.get(key, 0)
+    )
+    if repair:
+        refresh_days((doctor_id, day) for doctor_id, day, _ in differing)
+
+    return [
+        {
+            "doctor_id": doctor_id,
+            "date": day.isoformat(),
+            "status": status,
+            "expected": expected.get((doctor_id, day, status), 0),
+            "actual": actual.get((doctor_id, day, status), 0),
+        }
+        for doctor_id, day, status in differing
+    ]
+
+
+def summary(start, end, group="specialty", specialty=None):
+    """
+    Booking counts and utilization per specialty or doctor over a date range.
+
+    Capacity is the number of slots of each doctor's availability template
+    over the range; utilization is booked appointments, whatever their
+    status, over capacity.
+
+    Args:
+        start (date): First day.
+        end (date): Last day, included.
+        group (str): 'specialty' or 'doctor'.
+        specialty (str): Only count doctors of this specialty.
+
+    Returns:
+        list: One dict per specialty or doctor, in name/ID order.
+    """
+    counts = defaultdict(dict)
+    for doctor_id, status, count in db.session.execute(
+        select(
+            AppointmentStat.doctor_id,
+            AppointmentStat.status,
+            func.sum(AppointmentStat.count),
+        )
+        .where(AppointmentStat.date.between(start, end))
+        .group_by(AppointmentStat.doctor_id, AppointmentStat.status)
+    ):
+        counts[doctor_id][status] = int(count)
+
+    days = (end - start).days + 1
+    rows = {}
+    for doctor in doctor_directory.snapshot().doctors:
+        if specialty and doctor.specialty != specialty:
+            continue
+        if group == "doctor":
+            key, row = doctor.id, {"doctor_id": doctor.id, "name": doctor.name}
+        else:
+            key, row = doctor.specialty, {"doctors": 0}
+        row = rows.setdefault(
+            key,
+            {**row, "specialty": doctor.specialty, "capacity": 0, "statuses": {}},
+        )
+        if group != "doctor":
+            row["doctors"] += 1
+        row["capacity"] += len(slot_engine.template_for(doctor).labels) * days
+        for status, count in counts.get(doctor.id, {}).items():
+            row["statuses"][status] = row["statuses"].get(status, 0) + count
+
+    for row in rows.values():
+        row["booked"] = sum(row["statuses"].values())
+        row["utilization"] = (
+            round(row["booked"] / row["capacity"], 4) if row["capacity"] else None
+        )
+    return [rows[key] for key in sorted(rows)]
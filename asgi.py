@@ -0,0 +1,354 @@
+"""
+Optional async (ASGI) serving mode.
+
+    uvicorn asgi:application --host 0.0.0.0 --port 5001
+
+The read-heavy GET endpoints below are served by native async handlers on
+SQLAlchemy's asyncio engine (psycopg 3 for Postgres, aiosqlite for SQLite)
+and the in-process doctor directory, so one worker keeps many requests in
+flight while they wait on the database:
+
+    GET /doctors
+    GET /available-times/<doctor_name>/<date>
+    GET /admin/doctors, /admin/patients, /admin/admins
+
+Every other request, including all writes, falls through to the Flask app,
+run on a thread pool through asgiref's WSGI adapter. The async handlers share
+the Flask app's JWT settings, identity and revocation caches, models, query
+builders (``pagination``, ``slots``, ``versions``) and JSON provider, so both
+paths return the same responses and ETags.
+"""
+
+import asyncio
+import re
+from datetime import date as date_cls
+from urllib.parse import parse_qsl
+
+from asgiref.sync import sync_to_async
+from asgiref.wsgi import WsgiToAsgiInstance
+from flask_jwt_extended import decode_token
+from jwt import ExpiredSignatureError
+from sqlalchemy.ext.asyncio import create_async_engine
+from werkzeug.datastructures import MultiDict
+from werkzeug.http import parse_cookie, parse_date, parse_etags
+
+from app import app
+from auth import identity_for
+from cache import MISSING
+from compression import response_compression, weak_etag
+from config import engine_options
+from directory import FIELDS as DIRECTORY_FIELDS, PUBLIC_FIELDS, doctor_directory
+from directory import SCOPE as DIRECTORY_SCOPE
+from models import User
+from pagination import keyset_query, keyset_result
+from revocation import token_revocation
+from schemas import PATIENT, USER
+from serialization import json_response
+from slots import slot_engine
+from versions import (
+    cache_headers,
+    current_query,
+    current_result,
+    etag_for,
+    is_not_modified,
+)
+
+ASYNC_DRIVERS = {"postgresql": "postgresql+psycopg", "sqlite": "sqlite+aiosqlite"}
+
+
+def async_url(url):
+    """Database URL for the asyncio engine, e.g. postgresql+psycopg://..."""
+    scheme, sep, rest = url.partition("://")
+    return ASYNC_DRIVERS.get(scheme, scheme) + sep + rest
+
+
+class WsgiFallback(WsgiToAsgiInstance):
+    """
+    One Flask request run on the default thread pool.
+
+    ``WsgiToAsgi`` runs every request on one thread-sensitive executor, which
+    serializes them and breaks under concurrent load; Flask needs neither.
+    """
+
+    run_wsgi_app = sync_to_async(
+        WsgiToAsgiInstance.__dict__["run_wsgi_app"].func, thread_sensitive=False
+    )
+
+
+class Request:
+    """The parts of an ASGI HTTP request the async handlers need."""
+
+    def __init__(self, scope):
+        self.path = scope["path"]
+        self.query_string = scope["query_string"].decode("latin-1")
+        self.full_path = f"{self.path}?{self.query_string}"  # As in werkzeug
+        self.args = MultiDict(parse_qsl(self.query_string, keep_blank_values=True))
+        self.headers = {
+            name.decode("latin-1"): value.decode("latin-1")
+            for name, value in scope["headers"]
+        }
+        self.cookies = parse_cookie(self.headers.get("cookie", ""))
+
+
+class AsyncAPI:
+    """ASGI app: async handlers for some GET routes, Flask for everything else."""
+
+    def __init__(self, flask_app):
+        self.app = flask_app
+        self.engine = None
+        self.routes = []
+
+    def route(self, pattern, *roles, error="Unauthorized"):
+        """Registers an async GET handler for ``pattern`` (a regex)."""
+
+        def decorator(fn):
+            self.routes.append((re.compile(pattern), fn, roles, error))
+            return fn
+
+        return decorator
+
+    def connect(self):
+        # Created on first use, inside the worker's event loop
+        if self.engine is None:
+            url = self.app.config["SQLALCHEMY_DATABASE_URI"]
+            self.engine = create_async_engine(async_url(url), **engine_options(url))
+        return self.engine.connect()
+
+    async def blocking(self, fn, *args):
+        """Runs a blocking helper on a thread, inside an app context."""
+
+        def call():
+            with self.app.app_context():
+                return fn(*args)
+
+        return await asyncio.to_thread(call)
+
+    # ------------------------- ASGI -------------------------
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            return await self.lifespan(receive, send)
+
+        if scope["type"] == "http" and scope["method"] == "GET":
+            for pattern, handler, roles, error in self.routes:
+                match = pattern.fullmatch(scope["path"])
+                if match:
+                    request = Request(scope)
+                    identity, denied = await self.authenticate(request, roles, error)
+                    if denied:
+                        status, body, headers = denied
+                    else:
+                        # ASGI paths arrive percent-decoded already
+                        status, body, headers = await handler(
+                            request, identity, *match.groups()
+                        )
+                    return await self.respond(send, request, status, body, headers)
+
+        await WsgiFallback(self.app)(scope, receive, send)
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                if self.engine is not None:
+                    await self.engine.dispose()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def respond(self, send, request, status, body, headers):
+        headers = dict(headers)
+        payload = b""
+        if isinstance(body, bytes):  # Pre-serialized JSON
+            payload = body
+            headers["Content-Type"] = "application/json"
+        elif body is not None:
+            # Serialized exactly like the Flask views
+            with self.app.app_context():
+                response = json_response(body)
+            payload = response.get_data()
+            headers["Content-Type"] = response.content_type
+        vary = []
+        if body is not None:
+            vary.append("Accept-Encoding")
+            compression = response_compression.for_app(self.app)
+            if 200 <= status < 300 and compression.should_compress(
+                "application/json", len(payload), request.headers.get("accept-encoding")
+            ):
+                payload = compression.compress(payload)
+                headers["Content-Encoding"] = "gzip"
+                if "ETag" in headers:
+                    headers["ETag"] = weak_etag(headers["ETag"])
+        headers["Content-Length"] = str(len(payload))
+
+        # Same policy as flask_cors' CORS(app, supports_credentials=True)
+        origin = request.headers.get("origin")
+        if origin:
+            headers["Access-Control-Allow-Origin"] = origin
+            headers["Access-Control-Allow-Credentials"] = "true"
+            vary.append("Origin")
+        if vary:
+            headers["Vary"] = ", ".join(vary)
+
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [
+                    (name.encode("latin-1"), value.encode("latin-1"))
+                    for name, value in headers.items()
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": payload})
+
+    # ------------------------- AUTH -------------------------
+
+    async def authenticate(self, request, roles, error):
+        """
+        The async counterpart of ``auth.role_required``.
+
+        Returns:
+            tuple: (identity, None) or (None, (status, body, headers)) to deny.
+        """
+        config = self.app.config
+        token = request.cookies.get(config["JWT_ACCESS_COOKIE_NAME"])
+        if not token:
+            msg = f'Missing cookie "{config["JWT_ACCESS_COOKIE_NAME"]}"'
+            return None, (401, {"msg": msg}, {})
+
+        try:
+            with self.app.app_context():
+                claims = decode_token(token)
+        except ExpiredSignatureError:
+            return None, (401, {"msg": "Token has expired"}, {})
+        except Exception as e:
+            return None, (422, {"msg": str(e)}, {})
+
+        # Cached answers cost no thread hop
+        revocation = token_revocation.for_app(self.app)
+        revoked = revocation.is_token_revoked(claims, cached_only=True)
+        if revoked is MISSING:
+            revoked = await self.blocking(revocation.is_token_revoked, claims)
+        if revoked:
+            return None, (401, {"msg": "Token has been revoked"}, {})
+
+        user_id = int(claims[config["JWT_IDENTITY_CLAIM"]])
+        if "role" in claims:
+            with self.app.app_context():
+                identity = identity_for(user_id, claims)  # Never queries
+        else:
+            identity = await self.blocking(identity_for, user_id, claims)
+        if not identity or identity["role"] not in roles:
+            return None, (403, {"error": error}, {})
+        return identity, None
+
+    # ------------------------- HANDLERS -------------------------
+
+    @staticmethod
+    def not_modified(request, etag, changed_at):
+        return is_not_modified(
+            etag,
+            changed_at,
+            parse_etags(request.headers.get("if-none-match")),
+            parse_date(request.headers.get("if-modified-since")),
+        )
+
+    async def directory(self):
+        """The doctor directory's snapshot, checked against the counter on a thread."""
+        directory = doctor_directory.for_app(self.app)
+        return directory.fresh() or await self.blocking(directory.snapshot)
+
+    async def directory_page(self, request, identity, fields):
+        """One page of doctors from the directory, see ``routes/appointments.py``."""
+        snapshot = await self.directory()
+        versions = {DIRECTORY_SCOPE: snapshot.version}
+        etag = etag_for(versions, request.full_path, identity["id"])
+        headers = cache_headers(etag, snapshot.changed_at)
+        if self.not_modified(request, etag, snapshot.changed_at):
+            return 304, None, headers
+
+        try:
+            return 200, snapshot.page(fields, request.args), headers
+        except ValueError as e:
+            return 400, {"error": str(e)}, {}
+
+    async def versioned_page(
+        self, request, identity, scope, key, schema, fields, *criteria
+    ):
+        """
+        One keyset page of ``schema`` rows with the conditional GET handling of
+        ``versions.conditional``, on a single async connection.
+        """
+        async with self.connect() as conn:
+            rows = (await conn.execute(current_query([scope]))).all()
+            versions, changed_at = current_result(rows, [scope])
+            etag = etag_for(versions, request.full_path, identity["id"])
+            headers = cache_headers(etag, changed_at)
+            if self.not_modified(request, etag, changed_at):
+                return 304, None, headers
+
+            try:
+                stmt, limit, schema = keyset_query(
+                    schema, fields, request.args, *criteria
+                )
+            except ValueError as e:
+                return 400, {"error": str(e)}, {}
+            page, next_after = keyset_result(await conn.execute(stmt), limit, schema)
+
+        return 200, {key: page, "next_after": next_after}, headers
+
+
+api = AsyncAPI(app)
+
+
+@api.route(r"/doctors", "Doctor", "Patient", "Admin")
+async def get_doctors(request, identity):
+    return await api.directory_page(request, identity, PUBLIC_FIELDS)
+
+
+@api.route(r"/available-times/([^/]+)/([^/]+)", "Doctor", "Admin", "Patient")
+async def available_times(request, identity, doctor_name, date):
+    try:
+        day = date_cls.fromisoformat(date)
+    except ValueError:
+        return 400, {"error": "Invalid date"}, {}
+
+    doctor = (await api.directory()).by_name.get(doctor_name)
+    if not doctor:
+        return 404, {"error": "Doctor not found"}, {}
+
+    engine = slot_engine.for_app(api.app)
+    async with api.connect() as conn:
+        booked = await conn.execute(engine.booked_slots_query(doctor.id, day))
+    template = engine.template_for(doctor)
+    return 200, {"available_times": template.free_slots(booked.scalars())}, {}
+
+
+@api.route(r"/admin/doctors", "Admin")
+async def list_doctors(request, identity):
+    return await api.directory_page(request, identity, DIRECTORY_FIELDS)
+
+
+@api.route(r"/admin/patients", "Admin")
+async def list_patients(request, identity):
+    return await api.versioned_page(
+        request, identity, "patients", "patients", PATIENT, ("id", "name", "email")
+    )
+
+
+@api.route(r"/admin/admins", "Admin")
+async def list_admins(request, identity):
+    return await api.versioned_page(
+        request,
+        identity,
+        "admins",
+        "admins",
+        USER,
+        ("id", "name", "email"),
+        User.role == "Admin",
+    )
+
+
+application = api
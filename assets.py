@@ -0,0 +1,265 @@
+"""
+Static frontend build and serving.
+
+``flask --app app build-assets`` turns the frontend sources (the HTML pages
+at the repository root, ``css/``, ``js/`` and ``fonts/``) into ``ASSETS_DIR``
+(``dist/`` by default):
+
+- stylesheets are minified, and scripts too when ``rjsmin`` is installed;
+- every stylesheet, script and font gets its content hash in its name
+  (``css/style.3f9c0a1d2e.css``) and references to it from pages and
+  stylesheets are rewritten accordingly;
+- text files are precompressed to ``.gz``, and to ``.br`` when ``brotli`` is
+  installed.
+
+The app then serves the build: hashed files with a one-year ``immutable``
+``Cache-Control``, so repeat visits don't even revalidate them, and pages with
+``no-cache`` so a deploy is picked up right away. Each file is sent in the
+best precompressed encoding the client accepts. ``manifest.json`` maps every
+source path to its hashed name.
+"""
+
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import posixpath
+import re
+
+from flask import abort, request, send_from_directory
+
+from extensions import AppLocal
+
+try:
+    import brotli
+except ImportError:  # Optional dependency, only .gz files are written without it
+    brotli = None
+
+try:
+    import rjsmin
+except ImportError:  # Optional dependency, scripts are only precompressed without it
+    rjsmin = None
+
+ASSET_DIRS = ("css", "js", "fonts")
+SKIPPED_EXTENSIONS = (".map", ".scss")  # Sources of the built stylesheets
+COMPRESSED_EXTENSIONS = (".html", ".css", ".js", ".json", ".svg", ".ttf", ".eot")
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))  # In order of preference
+IMMUTABLE = "public, max-age=31536000, immutable"
+MANIFEST = "manifest.json"
+
+CSS_TOKENS = re.compile(
+    r"(\"(?:\\.|[^\"\\])*\"|'(?:\\.|[^'\\])*'|/\*.*?\*/)", re.DOTALL
+)
+CSS_URL = re.compile(r"url\(\s*(?:\"([^\"]*)\"|'([^']*)'|([^)'\"\s]*))\s*\)")
+HTML_REFERENCE = re.compile(r"\b(href|src)=\"([^\"]+)\"")
+SOURCE_MAP = re.compile(
+    r"^\s*(?:/\*# sourceMappingURL=.*?\*/|//# sourceMappingURL=.*)$", re.M
+)
+
+
+def minify_css(css):
+    """
+    Drops comments (except ``/*!`` licenses) and insignificant whitespace.
+
+    Strings are copied as is. Whitespace is only removed around ``{};,>``
+    and after ``:``, where it never changes the meaning of a rule.
+    """
+    parts = []
+    for i, token in enumerate(CSS_TOKENS.split(css)):
+        if i % 2:
+            if token.startswith("/*!") or not token.startswith("/*"):
+                parts.append(token)
+            continue
+        token = re.sub(r"\s+", " ", token)
+        token = re.sub(r"\s*([{};,>])\s*", r"\1", token)
+        parts.append(re.sub(r":\s+", ":", token))
+    return "".join(parts).replace(";}", "}").strip()
+
+
+def minify_js(js):
+    return rjsmin.jsmin(js) if rjsmin is not None else js
+
+
+def hashed_name(path, content):
+    """``css/style.css`` -> ``css/style.<10 hex digits of sha256>.css``."""
+    root, ext = posixpath.splitext(path)
+    return f"{root}.{hashlib.sha256(content).hexdigest()[:10]}{ext}"
+
+
+def resolve(reference, base_dir):
+    """
+    Source path of a relative reference, and its ``?query#fragment`` suffix.
+
+    Returns:
+        tuple: (normalized path or None for absolute/external URLs, suffix)
+    """
+    if not reference or reference.startswith(("/", "#", "data:")) or ":" in reference:
+        return None, ""
+    path, suffix = re.match(r"([^?#]*)(.*)", reference).groups()
+    return posixpath.normpath(posixpath.join(base_dir, path)), suffix
+
+
+def rewrite_css_urls(css, path, manifest):
+    """Points ``url()``s of the stylesheet at ``path`` to hashed names."""
+    base_dir = posixpath.dirname(path)
+
+    def replace(match):
+        reference = next(group for group in match.groups() if group is not None)
+        target, suffix = resolve(reference, base_dir)
+        if target not in manifest:
+            return match.group(0)
+        return f"url({posixpath.relpath(manifest[target], base_dir)}{suffix})"
+
+    return CSS_URL.sub(replace, css)
+
+
+def rewrite_html_references(html, manifest):
+    """Points ``href``/``src`` attributes of a root page to hashed names."""
+
+    def replace(match):
+        target, suffix = resolve(match.group(2), "")
+        if target not in manifest:
+            return match.group(0)
+        return f'{match.group(1)}="{manifest[target]}{suffix}"'
+
+    return HTML_REFERENCE.sub(replace, html)
+
+
+def precompress(path, content):
+    """Writes ``.gz``/``.br`` variants of a text file when they are smaller."""
+    if not path.endswith(COMPRESSED_EXTENSIONS):
+        return
+    variants = {".gz": gzip.compress(content, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants[".br"] = brotli.compress(content, quality=11)
+    for suffix, compressed in variants.items():
+        if len(compressed) < len(content):
+            with open(path + suffix, "wb") as f:
+                f.write(compressed)
+
+
+def build(source_dir, output_dir):
+    """
+    Builds the frontend from ``source_dir`` into ``output_dir``.
+
+    Fonts are hashed first, then stylesheets (whose ``url()``s point at the
+    fonts), scripts and finally the pages.
+
+    Returns:
+        dict: The manifest, source path -> hashed path.
+    """
+    sources = sorted(
+        posixpath.join(directory, name)
+        for directory in ASSET_DIRS
+        if os.path.isdir(os.path.join(source_dir, directory))
+        for name in os.listdir(os.path.join(source_dir, directory))
+        if not name.endswith(SKIPPED_EXTENSIONS)
+    )
+    order = {".css": 1, ".js": 2}
+    sources.sort(key=lambda path: order.get(posixpath.splitext(path)[1], 0))
+    pages = sorted(name for name in os.listdir(source_dir) if name.endswith(".html"))
+
+    manifest = {}
+
+    def write(path, content):
+        target = os.path.join(output_dir, path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, "wb") as f:
+            f.write(content)
+        precompress(target, content)
+
+    for path in sources:
+        with open(os.path.join(source_dir, path), "rb") as f:
+            content = f.read()
+        if path.endswith(".css"):
+            css = SOURCE_MAP.sub("", content.decode("utf-8"))
+            content = minify_css(rewrite_css_urls(css, path, manifest)).encode()
+        elif path.endswith(".js"):
+            content = minify_js(SOURCE_MAP.sub("", content.decode("utf-8"))).encode()
+        manifest[path] = hashed_name(path, content)
+        write(manifest[path], content)
+
+    for page in pages:
+        with open(os.path.join(source_dir, page), encoding="utf-8") as f:
+            write(page, rewrite_html_references(f.read(), manifest).encode())
+
+    write(MANIFEST, json.dumps(manifest, indent=2, sort_keys=True).encode())
+    return manifest
+
+
+class StaticAssets:
+    """Serves a build of ``build`` with cache headers and precompression."""
+
+    def __init__(self):
+        self.root = None
+        self.immutable = set()
+
+    def init_app(self, app):
+        """Registers the frontend routes and the ``build-assets`` command."""
+        self.root = os.path.abspath(
+            app.config.get("ASSETS_DIR") or os.path.join(app.root_path, "dist")
+        )
+        self.load()
+
+        app.add_url_rule("/", "frontend_index", self.serve_page)
+        app.add_url_rule("/<name>.html", "frontend_page", self.serve_page)
+        for directory in ASSET_DIRS:
+            app.add_url_rule(
+                f"/{directory}/<path:filename>",
+                f"frontend_{directory}",
+                self.serve_asset,
+                defaults={"directory": directory},
+            )
+
+        @app.cli.command("build-assets")
+        def build_assets():
+            """Build the frontend into ASSETS_DIR."""
+            manifest = build(app.root_path, self.root)
+            self.load()
+            print(f"Built {len(manifest)} assets into {self.root}")
+
+    def load(self):
+        """Reads the hashed file names from the build's manifest."""
+        try:
+            with open(os.path.join(self.root, MANIFEST)) as f:
+                self.immutable = set(json.load(f).values())
+        except FileNotFoundError:
+            self.immutable = set()
+
+    def serve_page(self, name="login"):
+        return self.send(f"{name}.html")
+
+    def serve_asset(self, directory, filename):
+        return self.send(posixpath.join(directory, filename))
+
+    def send(self, path):
+        if not os.path.isfile(os.path.join(self.root, path)):
+            abort(404)
+
+        encoding, suffix = None, ""
+        for candidate, candidate_suffix in ENCODINGS:
+            if request.accept_encodings[candidate] and os.path.isfile(
+                os.path.join(self.root, path + candidate_suffix)
+            ):
+                encoding, suffix = candidate, candidate_suffix
+                break
+
+        response = send_from_directory(
+            self.root,
+            path + suffix,
+            mimetype=mimetypes.guess_type(path)[0] or "application/octet-stream",
+            conditional=True,
+            max_age=None,
+        )
+        if encoding:
+            response.headers["Content-Encoding"] = encoding
+        if path.endswith(COMPRESSED_EXTENSIONS):
+            response.vary.add("Accept-Encoding")
+        response.headers["Cache-Control"] = (
+            IMMUTABLE if path in self.immutable else "no-cache"
+        )
+        return response
+
+
+static_assets = AppLocal("static_assets", StaticAssets)
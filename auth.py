@@ -0,0 +1,126 @@
+"""
+Role/identity layer for JWT-protected routes.
+
+The role and profile ID of a user are carried as additional JWT claims (see
+``identity_claims``), so authorization does not need a ``User`` lookup on every
+request. Identities are kept in a small process-local TTL + LRU cache which the
+delete routes invalidate explicitly. Tokens of deleted users are rejected
+before this layer, by the shared revocation store (``revocation``).
+"""
+
+from functools import wraps
+
+from flask import g, jsonify, request
+from flask_jwt_extended import get_jwt, get_jwt_identity, jwt_required
+
+from cache import MISSING, TTLCache
+from extensions import AppLocal
+from models import User
+
+ROLES = ("Doctor", "Patient", "Admin")
+
+
+class IdentityCache(TTLCache):
+    """TTL + LRU cache of user identities keyed by user ID."""
+
+    def init_app(self, app):
+        """Read cache sizing from the app config."""
+        self.maxsize = app.config.get("IDENTITY_CACHE_SIZE", self.maxsize)
+        self.ttl = app.config.get("IDENTITY_CACHE_TTL", self.ttl)
+        self.clear()
+
+    def invalidate(self, user_id):
+        """
+        Drops a deleted user's identity. Their tokens are rejected by
+        ``revocation``, and a new account reusing the ID starts afresh.
+        """
+        self.pop(int(user_id))
+
+
+identity_cache = AppLocal("identity_cache", IdentityCache)
+
+
+def identity_claims(user):
+    """Additional JWT claims issued at login."""
+    return {
+        "role": user.role,
+        "name": user.name,
+        # Doctor and Patient profiles share their primary key with the user row
+        "profile_id": user.id if user.role in ("Doctor", "Patient") else None,
+    }
+
+
+def _load_identity(user_id, claims):
+    if "role" in claims:
+        return {
+            "id": user_id,
+            "role": claims["role"],
+            "name": claims.get("name"),
+            "profile_id": claims.get("profile_id"),
+        }
+
+    # Tokens issued before role claims existed fall back to the database
+    user = User.query.get(user_id)
+    if not user:
+        return None
+    return {"id": user.id, **identity_claims(user)}
+
+
+def identity_for(user_id, claims):
+    """
+    Cached identity of a token's user.
+
+    Only queries the database for tokens issued without role claims.
+    """
+    identity = identity_cache.get(user_id)
+    if identity is MISSING:
+        identity = _load_identity(user_id, claims)
+        identity_cache.put(user_id, identity)
+    return identity
+
+
+def current_identity():
+    """
+    Returns the identity of the logged-in user.
+
+    Must be called inside a request where the JWT has been verified.
+
+    Returns:
+        dict: ``id``, ``role``, ``name`` and ``profile_id`` of the user, or
+        ``None`` if the account has been deleted.
+    """
+    if "identity" in g:
+        return g.identity
+
+    identity = identity_for(int(get_jwt_identity()), get_jwt())
+    g.identity = identity
+    return identity
+
+
+def role_required(*roles, error="Unauthorized"):
+    """
+    Route decorator that verifies the JWT and checks the user's role.
+
+    Args:
+        *roles (str): Roles allowed to access the route. Any known role if empty.
+        error (str): Error message returned with the 403 response.
+    """
+    allowed = roles or ROLES
+
+    def decorator(fn):
+        @wraps(fn)
+        @jwt_required()
+        def wrapper(*args, **kwargs):
+            # CORS preflight requests carry no JWT
+            if request.method == "OPTIONS":
+                return fn(*args, **kwargs)
+
+            identity = current_identity()
+            if not identity or identity["role"] not in allowed:
+                return jsonify({"error": error}), 403
+
+            return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
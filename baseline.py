@@ -0,0 +1,62 @@
+"""
+Schema of the first release, which created its tables with ``db.create_all()``.
+
+The migrations start from it: the oldest one, 0906aa28d4ae, alters these
+tables but doesn't create them, and they already match its result. A database
+created that way is brought up to date with::
+
+    flask --app app db stamp 0906aa28d4ae
+    flask --app app db upgrade
+
+``flask --app app init-db`` does the same for an empty database, so new
+databases go through the migrations that deployed ones went through.
+"""
+
+import sqlalchemy as sa
+
+REVISION = "0906aa28d4ae"
+
+metadata = sa.MetaData()
+
+sa.Table(
+    "user",
+    metadata,
+    sa.Column("id", sa.Integer, primary_key=True),
+    sa.Column("name", sa.String(80), nullable=False),
+    sa.Column("email", sa.String(120), unique=True, nullable=False),
+    sa.Column("password_hash", sa.String(256), nullable=False),
+    sa.Column("role", sa.String(20), nullable=False),
+)
+
+sa.Table(
+    "doctor",
+    metadata,
+    sa.Column(
+        "id", sa.Integer, sa.ForeignKey("user.id", ondelete="CASCADE"), primary_key=True
+    ),
+    sa.Column("name", sa.String(80), nullable=False),
+    sa.Column("email", sa.String(120), unique=True, nullable=False),
+    sa.Column("specialty", sa.String(100), nullable=False),
+    sa.Column("available_slots", sa.String(100), nullable=False),
+)
+
+sa.Table(
+    "patient",
+    metadata,
+    sa.Column(
+        "id", sa.Integer, sa.ForeignKey("user.id", ondelete="CASCADE"), primary_key=True
+    ),
+    sa.Column("name", sa.String(80), nullable=False),
+    sa.Column("email", sa.String(120), unique=True, nullable=False),
+)
+
+sa.Table(
+    "appointment",
+    metadata,
+    sa.Column("id", sa.Integer, primary_key=True),
+    sa.Column("patient_id", sa.Integer, sa.ForeignKey("patient.id"), nullable=False),
+    sa.Column("doctor_id", sa.Integer, sa.ForeignKey("doctor.id"), nullable=False),
+    sa.Column("date", sa.String(20), nullable=False),
+    sa.Column("time_slot", sa.String(20), nullable=False),
+    sa.Column("status", sa.String(20), nullable=False),
+)
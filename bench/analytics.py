@@ -0,0 +1,86 @@
+"""
+Latency of the admin analytics from the rollup versus scanning appointments.
+
+Seeds a synthetic hospital (default 1k doctors, 1M appointments) into the
+database configured in ``config.Config``, then answers "booked and done
+appointments per specialty" over growing date ranges two ways:
+
+    rollup   - ``analytics.summary`` over ``appointment_stat``
+    scan     - every appointment of the range fetched and counted client-side,
+               what dashboards had to do before
+
+Finally runs ``analytics.check`` and exits with status 1 if the rollup
+disagrees with the appointments.
+
+Usage:
+    python bench/analytics.py --doctors 1000 --appointments 1000000
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from collections import Counter
+from datetime import timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import select  # noqa: E402
+
+from analytics import check, summary  # noqa: E402
+from app import app  # noqa: E402
+from bench.seed import FIRST_DAY, seed_hospital  # noqa: E402
+from models import db, Appointment, Doctor  # noqa: E402
+
+
+def scan(start, end):
+    """The client-side equivalent of ``summary`` without capacity."""
+    specialties = dict(db.session.execute(select(Doctor.id, Doctor.specialty)).all())
+    counts = Counter()
+    for doctor_id, status in db.session.execute(
+        select(Appointment.doctor_id, Appointment.status).where(
+            Appointment.date.between(start, end)
+        )
+    ):
+        counts[specialties[doctor_id], status] += 1
+    return counts
+
+
+def median_ms(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--doctors", type=int, default=1_000)
+    parser.add_argument("--patients", type=int, default=10_000)
+    parser.add_argument("--appointments", type=int, default=1_000_000)
+    parser.add_argument("--days", type=int, nargs="+", default=[7, 30, 365])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with app.app_context():
+        db.create_all()
+        seed_hospital(args.doctors, args.patients, args.appointments)
+
+        print(f"{'days':>6}{'rollup ms':>12}{'scan ms':>12}")
+        for days in args.days:
+            end = FIRST_DAY + timedelta(days=days - 1)
+            rollup = median_ms(lambda: summary(FIRST_DAY, end), args.repeat)
+            scanned = median_ms(lambda: scan(FIRST_DAY, end), args.repeat)
+            print(f"{days:>6}{rollup:>12.2f}{scanned:>12.2f}")
+
+        mismatches = check()
+        print(f"consistency check: {len(mismatches)} mismatched rows")
+        if mismatches:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
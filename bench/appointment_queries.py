@@ -0,0 +1,108 @@
+"""
+Query latency of the hot appointment/doctor lookups, with and without indexes.
+
+Seeds a synthetic hospital (default 5k doctors, 50k patients, 1M appointments)
+into the database configured in ``config.Config``, then times each query. On
+Postgres the "without indexes" run drops the access-path indexes inside a
+transaction that is rolled back afterwards, so the schema is left untouched.
+
+Usage:
+    python bench/appointment_queries.py --doctors 5000 --appointments 1000000
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time as timer
+from datetime import timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text  # noqa: E402
+
+from app import app  # noqa: E402
+from bench.seed import FIRST_DAY, doctor_name, seed_hospital  # noqa: E402
+from models import db  # noqa: E402
+
+QUERIES = {
+    "doctor_by_name": "SELECT id FROM doctor WHERE name = :doctor_name",
+    "booked_slots_doctor_day": (
+        "SELECT time_slot FROM appointment WHERE doctor_id = :doctor_id "
+        "AND date = :day"
+    ),
+    "doctor_week_sorted": (
+        "SELECT id, date, time_slot FROM appointment WHERE doctor_id = :doctor_id "
+        "AND date BETWEEN :day AND :week_end ORDER BY date, time_slot"
+    ),
+    "slot_taken": (
+        "SELECT 1 FROM appointment WHERE doctor_id = :doctor_id AND date = :day "
+        "AND time_slot = '10:00'"
+    ),
+    "patient_history_sorted": (
+        "SELECT id, date, time_slot FROM appointment WHERE patient_id = :patient_id "
+        "ORDER BY date DESC"
+    ),
+}
+
+DROP_INDEXES = (
+    "DROP INDEX ix_doctor_name",
+    "DROP INDEX ix_appointment_patient_id_date",
+    "ALTER TABLE appointment DROP CONSTRAINT uq_appointment_doctor_date_time_slot",
+)
+
+
+def run_queries(conn, ids, num_doctors, repeat):
+    results = {}
+    for name, sql in QUERIES.items():
+        samples = []
+        for i in range(repeat):
+            doctor = (i * 7919) % num_doctors
+            params = {
+                "doctor_name": doctor_name(doctor),
+                "doctor_id": ids["doctor"] + doctor,
+                "patient_id": ids["patient"] + i,
+                "day": FIRST_DAY + timedelta(days=i % 20),
+                "week_end": FIRST_DAY + timedelta(days=i % 20 + 6),
+            }
+            start = timer.perf_counter()
+            conn.execute(text(sql), params).fetchall()
+            samples.append((timer.perf_counter() - start) * 1000)
+        results[name] = statistics.median(samples)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--doctors", type=int, default=5_000)
+    parser.add_argument("--patients", type=int, default=50_000)
+    parser.add_argument("--appointments", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    with app.app_context():
+        db.create_all()
+        ids = seed_hospital(args.doctors, args.patients, args.appointments)
+
+        with db.engine.connect() as conn:
+            if conn.dialect.name == "postgresql":
+                conn.execute(text("ANALYZE"))
+            after = run_queries(conn, ids, args.doctors, args.repeat)
+            conn.rollback()
+
+            before = None
+            if conn.dialect.name == "postgresql":
+                trans = conn.begin()
+                for statement in DROP_INDEXES:
+                    conn.execute(text(statement))
+                before = run_queries(conn, ids, args.doctors, args.repeat)
+                trans.rollback()
+
+    print(f"{'query':<28}{'no index (ms)':>16}{'indexed (ms)':>16}")
+    for name, indexed in after.items():
+        unindexed = f"{before[name]:.3f}" if before else "n/a"
+        print(f"{name:<28}{unindexed:>16}{indexed:>16.3f}")
+
+
+if __name__ == "__main__":
+    main()
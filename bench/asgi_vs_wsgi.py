@@ -0,0 +1,142 @@
+"""
+Concurrency of the sync (gunicorn gthread) and async (uvicorn, ``asgi.py``)
+serving modes at a fixed memory budget.
+
+Both servers run the same number of worker processes, so they hold about the
+same memory; the peak resident set size of the server (master plus workers)
+is reported next to throughput. The replayed mix is the one of
+``gunicorn_presets.py``: mostly endpoints with native async handlers plus
+``/me``, which the ASGI app hands to Flask.
+
+Usage:
+    DATABASE_URL=postgresql://... python bench/asgi_vs_wsgi.py \\
+        --workers 1 --concurrency 16 64 256 --duration 20
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import threading
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from app import app  # noqa: E402
+from models import db  # noqa: E402
+from bench.gunicorn_presets import (  # noqa: E402
+    login,
+    run_load,
+    start_server,
+    wait_for_server,
+)
+from bench.seed import seed_hospital  # noqa: E402
+
+
+def start_uvicorn(port, workers):
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "asgi:application",
+            "--port",
+            str(port),
+            "--workers",
+            str(workers),
+            "--no-access-log",
+        ],
+        cwd=ROOT,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    return wait_for_server(server, port, "uvicorn")
+
+
+def rss_kb(pid):
+    """Resident set size of a process and all its descendants, in KiB."""
+    total = 0
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    total += int(line.split()[1])
+        for task in os.listdir(f"/proc/{pid}/task"):
+            with open(f"/proc/{pid}/task/{task}/children") as children:
+                total += sum(rss_kb(int(child)) for child in children.read().split())
+    except (FileNotFoundError, ProcessLookupError):
+        pass
+    return total
+
+
+def peak_rss(pid, stop):
+    """Samples ``rss_kb`` every 100 ms until ``stop`` is set."""
+    peak = [0]
+
+    def sample():
+        while not stop.wait(0.1):
+            peak[0] = max(peak[0], rss_kb(pid))
+
+    thread = threading.Thread(target=sample, daemon=True)
+    thread.start()
+    return peak, thread
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--modes", nargs="+", default=["wsgi", "asgi"])
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[16, 64, 256])
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--doctors", type=int, default=1_000)
+    parser.add_argument("--patients", type=int, default=10_000)
+    parser.add_argument("--appointments", type=int, default=100_000)
+    parser.add_argument("--port", type=int, default=5099)
+    args = parser.parse_args()
+
+    with app.app_context():
+        db.create_all()
+        seed_hospital(args.doctors, args.patients, args.appointments)
+        db.engine.dispose()
+
+    print(
+        f"{'mode':<6}{'clients':>8}{'req/sec':>10}{'p50 ms':>10}{'p95 ms':>10}"
+        f"{'RSS MiB':>10}{'errors':>8}"
+    )
+    for mode in args.modes:
+        for concurrency in args.concurrency:
+            if mode == "wsgi":
+                server = start_server("gthread", args.port, args.workers)
+            else:
+                server = start_uvicorn(args.port, args.workers)
+            stop = threading.Event()
+            peak, sampler = peak_rss(server.pid, stop)
+            try:
+                cookie = login(args.port)
+                latencies, errors = run_load(
+                    args.port, cookie, args.doctors, concurrency, args.duration
+                )
+            finally:
+                stop.set()
+                sampler.join()
+                server.terminate()
+                server.wait()
+
+            rss = peak[0] / 1024
+            if not latencies:
+                print(
+                    f"{mode:<6}{concurrency:>8}{'-':>10}{'-':>10}{'-':>10}"
+                    f"{rss:>10.1f}{errors:>8}"
+                )
+                continue
+            quantiles = statistics.quantiles(latencies, n=100)
+            print(
+                f"{mode:<6}{concurrency:>8}{len(latencies) / args.duration:>10.1f}"
+                f"{quantiles[49] * 1000:>10.2f}{quantiles[94] * 1000:>10.2f}"
+                f"{rss:>10.1f}{errors:>8}"
+            )
+
+
+if __name__ == "__main__":
+    main()
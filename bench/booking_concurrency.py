@@ -0,0 +1,137 @@
+"""
+Concurrency stress test for /book-appointment-api.
+
+Seeds one doctor and N patients, then fires N parallel bookings at the same
+slot. Exactly one must succeed and every other request must get the
+"Time slot already booked" 400. Runs against the database configured in
+``config.Config`` (use Postgres; SQLite serializes writers), with the schema
+from ``flask --app app init-db``.
+
+Usage:
+    python bench/booking_concurrency.py --workers 32 --rounds 20
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app  # noqa: E402
+from models import db, User, Doctor, Patient  # noqa: E402
+
+BASE_URL = "https://localhost"
+
+
+def seed(num_patients):
+    """Creates a doctor and patients with a random suffix, returns their emails."""
+    tag = uuid.uuid4().hex[:8]
+    doctor_name = f"bench-doc-{tag}"
+    doctor_email = f"bench-doc-{tag}@example.com"
+    patient_emails = [f"bench-pat-{tag}-{i}@example.com" for i in range(num_patients)]
+
+    with app.app_context():
+        doctor_user = User(name=doctor_name, email=doctor_email, role="Doctor")
+        doctor_user.set_password("bench")
+        db.session.add(doctor_user)
+        db.session.flush()
+        db.session.add(
+            Doctor(
+                id=doctor_user.id,
+                name=doctor_name,
+                email=doctor_email,
+                specialty="Bench",
+                available_slots="12:00AM-12:00AM/1",
+            )
+        )
+        for email in patient_emails:
+            user = User(name=email, email=email, role="Patient")
+            user.password_hash = doctor_user.password_hash  # Skip hashing per patient
+            db.session.add(user)
+            db.session.flush()
+            db.session.add(Patient(id=user.id, name=email, email=email))
+        db.session.commit()
+        patient_ids = [
+            user.id for user in User.query.filter(User.email.in_(patient_emails))
+        ]
+
+    return doctor_name, patient_emails, patient_ids
+
+
+def logged_in_client(email):
+    client = app.test_client()
+    client.post("/login", json={"email": email, "password": "bench"}, base_url=BASE_URL)
+    return client
+
+
+def book(client, patient_id, doctor_name, date, time_slot, barrier):
+    csrf = client.get_cookie("csrf_access_token", domain="localhost").value
+    barrier.wait()
+    response = client.post(
+        "/book-appointment-api",
+        json={
+            "patient_id": patient_id,
+            "doctor": doctor_name,
+            "date": date,
+            "time": time_slot,
+        },
+        headers={"X-CSRF-TOKEN": csrf},
+        base_url=BASE_URL,
+    )
+    return response.status_code
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--rounds", type=int, default=10)
+    args = parser.parse_args()
+
+    doctor_name, emails, patient_ids = seed(args.workers)
+    clients = [logged_in_client(email) for email in emails]
+
+    failures = 0
+    total_requests = 0
+    elapsed = 0.0
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        for round_no in range(args.rounds):
+            # Every round targets a fresh slot: minute offsets of one day
+            time_slot = f"{(round_no // 60) % 12 or 12:02d}:{round_no % 60:02d}AM"
+            barrier = threading.Barrier(args.workers)
+            start = time.perf_counter()
+            futures = [
+                pool.submit(
+                    book,
+                    client,
+                    patient_id,
+                    doctor_name,
+                    "2030-01-01",
+                    time_slot,
+                    barrier,
+                )
+                for client, patient_id in zip(clients, patient_ids)
+            ]
+            statuses = [future.result() for future in futures]
+            elapsed += time.perf_counter() - start
+            total_requests += len(statuses)
+
+            ok, conflicts = statuses.count(200), statuses.count(400)
+            if ok != 1 or conflicts != len(statuses) - 1:
+                failures += 1
+                print(
+                    f"round {round_no}: {ok} succeeded, {conflicts} conflicts, {statuses}"
+                )
+
+    print(
+        f"{args.rounds} rounds x {args.workers} workers: "
+        f"{total_requests / elapsed:.0f} bookings/sec, {failures} failed rounds"
+    )
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
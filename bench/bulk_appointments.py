@@ -0,0 +1,129 @@
+"""
+Bulk appointment endpoints vs. the per-appointment loop.
+
+Seeds one doctor with 2 x N appointments, then marks N of them done one
+request at a time and the other N with a single bulk request. The same is
+done for deletion. Runs against the database configured in ``config.Config``,
+with the schema from ``flask --app app init-db``.
+
+Usage:
+    python bench/bulk_appointments.py --appointments 30
+"""
+
+import argparse
+import os
+import sys
+import time as timer
+import uuid
+from datetime import date, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert, select  # noqa: E402
+
+from app import app  # noqa: E402
+from models import db, User, Doctor, Patient, Appointment  # noqa: E402
+
+BASE_URL = "https://localhost"
+
+
+def seed(num_appointments):
+    """Creates a doctor and a patient with 2 x N appointments, returns their IDs."""
+    tag = uuid.uuid4().hex[:8]
+    with app.app_context():
+        doctor = User(
+            name=f"bench-doc-{tag}", email=f"bench-doc-{tag}@example.com", role="Doctor"
+        )
+        doctor.set_password("bench")
+        patient = User(
+            name=f"bench-pat-{tag}",
+            email=f"bench-pat-{tag}@example.com",
+            role="Patient",
+        )
+        patient.password_hash = doctor.password_hash
+        db.session.add_all([doctor, patient])
+        db.session.flush()
+        db.session.add(
+            Doctor(
+                id=doctor.id,
+                name=doctor.name,
+                email=doctor.email,
+                specialty="Bench",
+                available_slots="12:00AM-12:00AM/1",
+            )
+        )
+        db.session.add(Patient(id=patient.id, name=patient.name, email=patient.email))
+        db.session.execute(
+            insert(Appointment).values(
+                [
+                    {
+                        "patient_id": patient.id,
+                        "doctor_id": doctor.id,
+                        "date": date(2031, 1, 1 + i // 1440),
+                        "time_slot": time(i % 1440 // 60, i % 60),
+                    }
+                    for i in range(2 * num_appointments)
+                ]
+            )
+        )
+        db.session.commit()
+        ids = list(
+            db.session.execute(
+                select(Appointment.id)
+                .where(Appointment.doctor_id == doctor.id)
+                .order_by(Appointment.id)
+            ).scalars()
+        )
+        return doctor.email, ids
+
+
+def timed(fn):
+    start = timer.perf_counter()
+    fn()
+    return (timer.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--appointments", type=int, default=30)
+    args = parser.parse_args()
+    n = args.appointments
+
+    doctor_email, ids = seed(n)
+    loop_ids, bulk_ids = ids[:n], ids[n:]
+
+    client = app.test_client()
+    client.post(
+        "/login", json={"email": doctor_email, "password": "bench"}, base_url=BASE_URL
+    )
+    headers = {
+        "X-CSRF-TOKEN": client.get_cookie("csrf_access_token", domain="localhost").value
+    }
+
+    def call(method, path, **kwargs):
+        response = client.open(
+            path, method=method, headers=headers, base_url=BASE_URL, **kwargs
+        )
+        assert response.status_code == 200, response.get_json()
+
+    results = {
+        "done (loop)": timed(
+            lambda: [call("PUT", f"/doctor/appointments/{i}/done") for i in loop_ids]
+        ),
+        "done (bulk)": timed(
+            lambda: call("PUT", "/doctor/appointments/done", json={"ids": bulk_ids})
+        ),
+        "delete (loop)": timed(
+            lambda: [call("DELETE", f"/doctor/appointments/{i}") for i in loop_ids]
+        ),
+        "delete (bulk)": timed(
+            lambda: call("DELETE", "/doctor/appointments", json={"ids": bulk_ids})
+        ),
+    }
+
+    for name, elapsed in results.items():
+        print(f"{name:<16}{n:>6} appointments{elapsed:>10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+CPU time and allocations of the JSON response paths across list sizes.
+
+Fetches patient and appointment rows once from the database configured in
+``config.Config`` (seeding it if empty), then serializes the same rows into a
+response three ways:
+
+    dicts/stdlib   - a dict per row, ``jsonify`` with Flask's default provider
+    dicts/orjson   - a dict per row, ``jsonify`` with ``OrjsonProvider``
+    schema         - ``schemas`` encoders straight from the rows, embedded
+                     by ``json_response``
+
+CPU is the process time of one serialization, allocations the tracemalloc
+peak of one serialization.
+
+Usage:
+    python bench/json_serialization.py --sizes 10 100 1000 10000
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import jsonify  # noqa: E402
+from flask.json.provider import DefaultJSONProvider  # noqa: E402
+
+from app import app  # noqa: E402
+from bench.seed import seed_hospital  # noqa: E402
+from models import db, Appointment, Patient  # noqa: E402
+from schemas import APPOINTMENT, PATIENT  # noqa: E402
+from serialization import OrjsonProvider, json_response, orjson  # noqa: E402
+from slots import format_slot_time  # noqa: E402
+
+
+def patient_dicts(rows):
+    return [dict(row._mapping) for row in rows]
+
+
+def appointment_dicts(rows):
+    return [
+        {
+            "id": appointment_id,
+            "patient_name": patient_name,
+            "date": day.isoformat(),
+            "time": format_slot_time(time_slot),
+            "status": status,
+        }
+        for appointment_id, patient_name, day, time_slot, status in rows
+    ]
+
+
+def variants(key, schema, to_dicts):
+    """Serializers of one list, each returning the response body."""
+    providers = {"dicts/stdlib": DefaultJSONProvider(app)}
+    if orjson is not None:
+        providers["dicts/orjson"] = OrjsonProvider(app)
+
+    def with_dicts(provider):
+        def serialize(rows):
+            app.json = provider
+            return jsonify({key: to_dicts(rows), "next_after": None}).get_data()
+
+        return serialize
+
+    def with_schema(rows):
+        app.json = providers["dicts/stdlib"]
+        return json_response({key: schema.encode(rows), "next_after": None}).get_data()
+
+    serializers = {name: with_dicts(provider) for name, provider in providers.items()}
+    serializers["schema"] = with_schema
+    return serializers
+
+
+def measure(serialize, rows, min_time=0.2):
+    """Returns (CPU ms per call, peak KiB allocated by one call)."""
+    calls, start = 0, time.process_time()
+    while time.process_time() - start < min_time:
+        serialize(rows)
+        calls += 1
+    cpu = (time.process_time() - start) / calls
+
+    tracemalloc.start()
+    serialize(rows)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return cpu * 1000, peak / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000])
+    args = parser.parse_args()
+    largest = max(args.sizes)
+
+    with app.test_request_context():
+        db.create_all()
+        seed_hospital(100, largest, largest)
+        patients = db.session.execute(
+            PATIENT.select().order_by(Patient.id).limit(largest)
+        ).all()
+        appointments = db.session.execute(
+            APPOINTMENT.select()
+            .outerjoin(Patient, Patient.id == Appointment.patient_id)
+            .order_by(Appointment.id)
+            .limit(largest)
+        ).all()
+
+        print(f"{'list':<14}{'rows':>7}{'variant':>15}{'CPU ms':>10}{'peak KiB':>11}")
+        for key, schema, to_dicts, rows in (
+            ("patients", PATIENT, patient_dicts, patients),
+            ("appointments", APPOINTMENT, appointment_dicts, appointments),
+        ):
+            serializers = variants(key, schema, to_dicts)
+            bodies = {name: fn(rows[:10]) for name, fn in serializers.items()}
+            if len(set(bodies.values())) != 1:  # Seeded names are ASCII
+                raise AssertionError(f"Serializers disagree on {key}: {bodies}")
+
+            for size in args.sizes:
+                for name, serialize in serializers.items():
+                    cpu, peak = measure(serialize, rows[:size])
+                    print(f"{key:<14}{size:>7}{name:>15}{cpu:>10.3f}{peak:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
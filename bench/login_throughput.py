@@ -0,0 +1,78 @@
+"""
+Login throughput across password hashing schemes, costs and pool sizes.
+
+For every preset a fresh user is created with that scheme, then ``--logins``
+logins are fired from ``--concurrency`` threads through the Flask test client.
+Runs against the database configured in ``config.Config``.
+
+Usage:
+    python bench/login_throughput.py --logins 200 --concurrency 16 --pool 4
+"""
+
+import argparse
+import os
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app  # noqa: E402
+from models import db, User  # noqa: E402
+from passwords import password_hasher  # noqa: E402
+
+BASE_URL = "https://localhost"
+PRESETS = [
+    ("pbkdf2", 100_000),
+    ("pbkdf2", 600_000),
+    ("scrypt", 14),
+    ("scrypt", 15),
+    ("bcrypt", 10),
+    ("bcrypt", 12),
+]
+
+
+def create_user():
+    email = f"bench-login-{uuid.uuid4().hex[:8]}@example.com"
+    with app.app_context():
+        user = User(name=email, email=email, role="Admin")
+        user.set_password("bench")
+        db.session.add(user)
+        db.session.commit()
+    return email
+
+
+def login(email):
+    response = app.test_client().post(
+        "/login", json={"email": email, "password": "bench"}, base_url=BASE_URL
+    )
+    return response.status_code
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--logins", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--pool", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    print(f"{'scheme':<8}{'cost':>8}{'pool':>6}{'logins/sec':>12}")
+    for scheme, cost in PRESETS:
+        for workers in (0, args.pool):
+            password_hasher.for_app(app).configure(scheme, cost, workers)
+            email = create_user()
+
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+                statuses = list(pool.map(login, [email] * args.logins))
+            elapsed = time.perf_counter() - start
+
+            assert statuses.count(200) == args.logins, statuses
+            print(f"{scheme:<8}{cost:>8}{workers:>6}{args.logins / elapsed:>12.1f}")
+
+    password_hasher.for_app(app).shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Page-load bytes and time of the frontend before and after the asset pipeline.
+
+For each page, follows what a browser loads from this app: the page, the
+``navbar.html`` it fetches, its local stylesheets and scripts, and the woff2
+fonts those stylesheets use. Then compares:
+
+    before  - the source files as a plain static server sends them:
+              uncompressed, revalidated on every visit
+    after   - a fresh ``assets.build`` served by the app through the Flask
+              test client with ``Accept-Encoding: br, gzip``: minified,
+              precompressed, hashed assets cached as immutable
+
+Load time is modelled from the bytes and requests, for a browser opening six
+connections per host: ``ceil(requests / 6) * RTT + bytes / bandwidth``, on the
+first visit and on a repeat visit with a warm cache (revalidations only).
+Server time is the time the app took to serve the "after" requests.
+
+Usage:
+    python bench/page_weight.py --pages appointment.html admin_dashboard.html \\
+        --bandwidth-mbps 10 --rtt-ms 50
+"""
+
+import argparse
+import math
+import os
+import posixpath
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from app import app  # noqa: E402
+from assets import (  # noqa: E402
+    CSS_URL,
+    HTML_REFERENCE,
+    build,
+    resolve,
+    static_assets,
+)
+
+CONNECTIONS = 6
+
+
+def page_resources(page):
+    """Local files a browser loads for ``page``, in source paths."""
+    with open(os.path.join(ROOT, page), encoding="utf-8") as f:
+        html = f.read()
+    resources = [page, "navbar.html"]
+    for _, reference in HTML_REFERENCE.findall(html):
+        path, _ = resolve(reference, "")
+        if path and path.endswith((".css", ".js")):
+            resources.append(path)
+
+    for stylesheet in [path for path in resources if path.endswith(".css")]:
+        with open(os.path.join(ROOT, stylesheet), encoding="utf-8") as f:
+            css = f.read()
+        for match in CSS_URL.finditer(css):
+            reference = next(group for group in match.groups() if group is not None)
+            path, _ = resolve(reference, posixpath.dirname(stylesheet))
+            if path and path.endswith(".woff2") and path not in resources:
+                resources.append(path)
+    return resources
+
+
+def load_time(requests, size, bandwidth_mbps, rtt_ms):
+    """Modelled load time in ms, see the module docstring."""
+    rounds = math.ceil(requests / CONNECTIONS)
+    return rounds * rtt_ms + size * 8 / (bandwidth_mbps * 1000)
+
+
+def before(resources):
+    size = sum(os.path.getsize(os.path.join(ROOT, path)) for path in resources)
+    # Every file is revalidated on a repeat visit
+    return size, len(resources), len(resources)
+
+
+def after(resources, manifest):
+    client = app.test_client()
+    headers = {"Accept-Encoding": "br, gzip"}
+    size = repeat = 0
+    start = time.perf_counter()
+    for path in resources:
+        response = client.get("/" + manifest.get(path, path), headers=headers)
+        if response.status_code != 200:
+            raise RuntimeError(f"{path} failed with {response.status_code}")
+        size += len(response.get_data())
+        if "immutable" not in response.headers.get("Cache-Control", ""):
+            repeat += 1
+    server_ms = (time.perf_counter() - start) * 1000
+    return size, len(resources), repeat, server_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--pages", nargs="+", default=["appointment.html", "admin_dashboard.html"]
+    )
+    parser.add_argument("--bandwidth-mbps", type=float, default=10)
+    parser.add_argument("--rtt-ms", type=float, default=50)
+    args = parser.parse_args()
+    network = (args.bandwidth_mbps, args.rtt_ms)
+
+    with tempfile.TemporaryDirectory() as output:
+        manifest = build(ROOT, output)
+        static = static_assets.for_app(app)
+        static.root = output
+        static.load()
+
+        print(
+            f"{'page':<22}{'':<8}{'requests':>9}{'KiB':>9}{'first ms':>10}"
+            f"{'repeat ms':>11}{'server ms':>11}"
+        )
+        for page in args.pages:
+            resources = page_resources(page)
+            size, requests, revalidated = before(resources)
+            print(
+                f"{page:<22}{'before':<8}{requests:>9}{size / 1024:>9.1f}"
+                f"{load_time(requests, size, *network):>10.1f}"
+                f"{load_time(revalidated, 0, *network):>11.1f}{'-':>11}"
+            )
+            size, requests, revalidated, server_ms = after(resources, manifest)
+            print(
+                f"{'':<22}{'after':<8}{requests:>9}{size / 1024:>9.1f}"
+                f"{load_time(requests, size, *network):>10.1f}"
+                f"{load_time(revalidated, 0, *network):>11.1f}{server_ms:>11.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
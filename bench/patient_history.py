@@ -0,0 +1,113 @@
+"""
+SQL statements per ``/patient/appointments`` page across history sizes.
+
+Gives one patient per ``--sizes`` entry that many appointments, half of them
+upcoming and half past, then fetches a full page of each window through the
+Flask test client and counts the statements it runs. Next to it, the count of
+the lazy ORM equivalent (``patient.appointments`` and ``appointment.doctor``
+per row) shows the N+1 the endpoint avoids.
+
+Exits with status 1 when the endpoint's count depends on the history size.
+
+Usage:
+    DATABASE_URL=sqlite:////tmp/hms_bench.db python bench/patient_history.py \\
+        --sizes 1 10 100 500
+"""
+
+import argparse
+import os
+import sys
+from datetime import date, time, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func, insert, select  # noqa: E402
+
+from app import app  # noqa: E402
+from models import db, Appointment, Patient  # noqa: E402
+from pagination import MAX_PAGE_SIZE  # noqa: E402
+from bench.seed import SLOTS_PER_DAY, patient_email, seed_hospital  # noqa: E402
+from bench.traffic import ClientSession, QueryCounter, login  # noqa: E402
+
+DOCTORS = 50
+
+
+def give_history(patient_id, size, first_doctor, offset):
+    """Books ``size`` appointments for the patient unless it already has some."""
+    existing = db.session.execute(
+        select(func.count()).where(Appointment.patient_id == patient_id)
+    ).scalar()
+    if existing:
+        return
+    today = date.today()
+    rows = []
+    for i in range(offset, offset + size):
+        slot, doctor = divmod(i, DOCTORS)
+        day, hour = divmod(slot, SLOTS_PER_DAY)
+        rows.append(
+            {
+                "patient_id": patient_id,
+                "doctor_id": first_doctor + doctor,
+                # Alternate between the two windows
+                "date": today + timedelta(days=day + 1 if i % 2 else -day - 1),
+                "time_slot": time(9 + hour),
+                "status": "pending",
+            }
+        )
+    db.session.execute(insert(Appointment).values(rows))
+    db.session.commit()
+
+
+def lazy_queries(counter, patient_id):
+    """Statements run by loading the history through the lazy relationships."""
+    db.session.expunge_all()
+    before = counter.read()
+    patient = db.session.get(Patient, patient_id)
+    for appointment in patient.appointments:
+        appointment.doctor.name, appointment.doctor.specialty
+    return counter.read() - before
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 10, 100, 500])
+    args = parser.parse_args()
+    if max(args.sizes) > 2 * MAX_PAGE_SIZE:
+        parser.error(f"sizes are limited to {2 * MAX_PAGE_SIZE} (two full pages)")
+
+    with app.app_context():
+        db.create_all()
+        ids = seed_hospital(DOCTORS, len(args.sizes), 0)
+        counter = QueryCounter(db.engine)
+        offset = 0
+        for i, size in enumerate(args.sizes):
+            give_history(ids["patient"] + i, size, ids["doctor"], offset)
+            offset += size
+
+    print(
+        f"{'appointments':>13}{'window':>10}{'rows':>7}{'queries':>9}{'lazy ORM':>10}"
+    )
+    counts = set()
+    for i, size in enumerate(args.sizes):
+        session = login(ClientSession(), patient_email(i))
+        with app.app_context():
+            lazy = lazy_queries(counter, ids["patient"] + i)
+        for window in ("upcoming", "past"):
+            path = f"/patient/appointments?window={window}&limit={MAX_PAGE_SIZE}"
+            session.request("GET", path)  # Warm the identity caches
+            before = counter.read()
+            status, payload = session.request("GET", path)
+            queries = counter.read() - before
+            if status != 200:
+                raise RuntimeError(f"{path} failed with {status}")
+            counts.add(queries)
+            rows = len(payload["appointments"])
+            print(f"{size:>13}{window:>10}{rows:>7}{queries:>9}{lazy:>10}")
+
+    if len(counts) != 1:
+        print(f"Query count depends on the history size: {sorted(counts)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Cold start of a worker and setup cost of an isolated test app.
+
+Cold start: ``--runs`` fresh interpreters each import ``app`` under
+``-X importtime``, build ``app.app`` (what ``gunicorn app:app`` does in every
+worker) and serve a first login, which opens the first database connection.
+Reports the median of every phase and the import time by top-level package.
+``--baseline`` runs the same probe in another checkout, e.g. one made with
+``git worktree add /tmp/hms-baseline <commit>``, to compare trees.
+
+Test setup: the time to get an isolated app with an empty schema and serve a
+signup and a login, either from a fresh ``create_app(TestConfig)`` (in-memory
+SQLite) or by dropping and recreating the tables of one shared app backed by
+an SQLite file.
+
+Cold starts run against ``DATABASE_URL``, which must have the schema (``flask
+--app app init-db``).
+
+Usage:
+    DATABASE_URL=sqlite:////tmp/hms.db python bench/startup.py --runs 10 \\
+        --tests 50 --baseline /tmp/hms-baseline
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from app import create_app  # noqa: E402
+from config import TestConfig  # noqa: E402
+from models import db  # noqa: E402
+
+BASE_URL = "https://localhost"
+PHASES = ("import", "build", "first_request")
+
+# Run in a fresh interpreter; older trees build the app while importing it
+PROBE = """
+import json, time
+start = time.perf_counter()
+import app as module
+imported = time.perf_counter()
+application = module.app
+built = time.perf_counter()
+application.test_client().post(
+    "/login", json={"email": "nobody@example.com", "password": "x"},
+    base_url="https://localhost",
+)
+done = time.perf_counter()
+print(json.dumps({
+    "import": imported - start, "build": built - imported,
+    "first_request": done - built,
+}))
+"""
+
+
+def import_times(stderr):
+    """Self import time in seconds per top-level package, from -X importtime."""
+    totals = defaultdict(float)
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, _, name = line[len("import time:") :].split("|")
+        if self_us.strip().isdigit():
+            totals[name.strip().split(".")[0]] += int(self_us) / 1e6
+    return totals
+
+
+def cold_starts(tree, runs):
+    """Phase timings and per-package import times of ``runs`` cold starts."""
+    phases, packages = defaultdict(list), defaultdict(list)
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", PROBE],
+            cwd=tree,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        phases["process"].append(time.perf_counter() - start)
+        for phase, seconds in json.loads(result.stdout.splitlines()[-1]).items():
+            phases[phase].append(seconds)
+        for package, seconds in import_times(result.stderr).items():
+            packages[package].append(seconds)
+    return (
+        {phase: statistics.median(times) for phase, times in phases.items()},
+        {package: statistics.median(times) for package, times in packages.items()},
+    )
+
+
+def signup_and_login(app):
+    client = app.test_client()
+    user = {"name": "test", "email": "test@example.com", "password": "test"}
+    client.post("/signup", json={**user, "role": "Patient"}, base_url=BASE_URL)
+    response = client.post("/login", json=user, base_url=BASE_URL)
+    assert response.status_code == 200, response.get_data(as_text=True)
+
+
+def fresh_app_setup():
+    signup_and_login(create_app(TestConfig))
+
+
+def shared_app_setup(app):
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+    signup_and_login(app)
+
+
+def time_setup(setup, tests):
+    start = time.perf_counter()
+    for _ in range(tests):
+        setup()
+    return (time.perf_counter() - start) / tests
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--tests", type=int, default=50)
+    parser.add_argument("--baseline", help="Checkout of the tree to compare with")
+    parser.add_argument("--top", type=int, default=8, help="Packages to list")
+    args = parser.parse_args()
+
+    trees = [("current", ROOT)]
+    if args.baseline:
+        trees.insert(0, ("baseline", os.path.abspath(args.baseline)))
+    results = {name: cold_starts(tree, args.runs) for name, tree in trees}
+
+    print(f"Cold start, median of {args.runs} runs (ms)")
+    print(f"{'':<16}" + "".join(f"{name:>12}" for name, _ in trees))
+    for phase in PHASES + ("process",):
+        print(
+            f"{phase:<16}"
+            + "".join(f"{results[name][0][phase] * 1000:>12.1f}" for name, _ in trees)
+        )
+
+    print("\nImport time by package (ms)")
+    packages = set().union(*(results[name][1] for name, _ in trees))
+    top = sorted(
+        packages,
+        key=lambda package: max(results[name][1].get(package, 0) for name, _ in trees),
+        reverse=True,
+    )[: args.top]
+    for package in top:
+        print(
+            f"{package:<16}"
+            + "".join(
+                f"{results[name][1].get(package, 0) * 1000:>12.1f}" for name, _ in trees
+            )
+        )
+
+    with tempfile.TemporaryDirectory() as tmp:
+
+        class SharedConfig(TestConfig):
+            SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp}/shared.db"
+
+        shared = create_app(SharedConfig)
+        fresh = time_setup(fresh_app_setup, args.tests)
+        reset = time_setup(lambda: shared_app_setup(shared), args.tests)
+        with shared.app_context():
+            db.engine.dispose()
+
+    print(f"\nIsolated test setup, mean of {args.tests} (ms)")
+    print(f"{'create_app(TestConfig), in-memory':<40}{fresh * 1000:>10.1f}")
+    print(f"{'shared app, drop and create tables':<40}{reset * 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
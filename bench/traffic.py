@@ -0,0 +1,460 @@
+"""
+Replays realistic HMS traffic mixes and records a per-endpoint baseline.
+
+Seeds a synthetic hospital (see ``bench/seed.py``) into the database from
+``DATABASE_URL`` (Postgres or SQLite), then replays a weighted mix of logins,
+dashboards, availability lookups, bookings, doctor views and admin lists from
+``--concurrency`` clients, either in-process through the Flask test client or
+against a real gunicorn started with ``gunicorn.conf.py``.
+
+Per endpoint it reports count, throughput, p50/p95/p99 latency and SQL queries
+per request: counted on the engine with the test client, read from the
+``Server-Timing`` header of gunicorn (started with INSTRUMENTATION_ENABLED,
+see ``instrumentation.py``). ``--output`` writes the results as JSON; ``--baseline`` compares against such a file and exits with
+status 1 when an endpoint's p95 or query count regressed.
+
+Usage:
+    DATABASE_URL=sqlite:////tmp/hms_bench.db python bench/traffic.py \\
+        --mix patient --transport client --duration 15 --output baseline.json
+    DATABASE_URL=postgresql://... python bench/traffic.py --transport gunicorn \\
+        --baseline baseline.json
+"""
+
+import argparse
+import datetime
+import http.client
+import json
+import os
+import random
+import re
+import statistics
+import sys
+import threading
+import time
+from collections import defaultdict
+from datetime import timedelta
+from urllib.parse import quote
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event  # noqa: E402
+
+from app import app  # noqa: E402
+from models import db  # noqa: E402
+from slots import format_minutes  # noqa: E402
+from bench.gunicorn_presets import start_server  # noqa: E402
+from bench.seed import (  # noqa: E402
+    FIRST_DAY,
+    PASSWORD,
+    doctor_name,
+    patient_email,
+    seed_hospital,
+)
+
+BASE_URL = "https://localhost"
+SERVER_TIMING_QUERIES = re.compile(r'db;dur=[\d.]+;desc="(\d+) queries"')
+BOOKABLE_DAYS = 365
+SLOT_LABELS = [format_minutes(hour * 60) for hour in range(9, 17)]  # Seeded hours
+
+
+def doctor_email(i):
+    return f"doctor{i:06d}@bench.example.com"
+
+
+class Hospital:
+    """Sizes and first IDs of the seeded data, used to address random rows."""
+
+    def __init__(self, ids, doctors, patients):
+        self.ids = ids
+        self.doctors = doctors
+        self.patients = patients
+
+    def doctor(self):
+        return random.randrange(self.doctors)
+
+    def patient(self):
+        return random.randrange(self.patients)
+
+    def day(self):
+        return FIRST_DAY + timedelta(days=random.randrange(BOOKABLE_DAYS))
+
+
+# ------------------------- OPERATIONS -------------------------
+#
+# Each operation takes the caller's session and the hospital and returns
+# (endpoint, method, path, json body, accepted status codes).
+
+
+def op_login(session, hospital):
+    body = {"email": patient_email(hospital.patient()), "password": PASSWORD}
+    return "POST /login", "POST", "/login", body, (200,)
+
+
+def op_dashboard(session, hospital):
+    return "GET /dashboard", "GET", "/dashboard", None, (200,)
+
+
+def op_doctors(session, hospital):
+    return "GET /doctors", "GET", "/doctors?limit=50", None, (200,)
+
+
+def op_available_times(session, hospital):
+    name = quote(doctor_name(hospital.doctor()))
+    path = f"/available-times/{name}/{hospital.day().isoformat()}"
+    return "GET /available-times", "GET", path, None, (200,)
+
+
+def op_book(session, hospital):
+    body = {
+        "patient_id": session.user_id,
+        "doctor": doctor_name(hospital.doctor()),
+        "date": hospital.day().isoformat(),
+        "time": random.choice(SLOT_LABELS),
+    }
+    # Losing a slot to another client is a normal outcome
+    return (
+        "POST /book-appointment-api",
+        "POST",
+        "/book-appointment-api",
+        body,
+        (200, 400),
+    )
+
+
+def op_patient_appointments(session, hospital):
+    window = random.choice(("upcoming", "past"))
+    path = f"/patient/appointments?window={window}&limit=20"
+    return "GET /patient/appointments", "GET", path, None, (200,)
+
+
+def op_doctor_appointments(session, hospital):
+    return "GET /doctor/appointments", "GET", "/doctor/appointments", None, (200,)
+
+
+def op_admin_doctors(session, hospital):
+    return "GET /admin/doctors", "GET", "/admin/doctors?limit=50", None, (200,)
+
+
+def op_admin_patients(session, hospital):
+    return "GET /admin/patients", "GET", "/admin/patients?limit=50", None, (200,)
+
+
+# role -> [(weight, operation)]
+MIXES = {
+    "patient": {
+        "Patient": [
+            (2, op_login),
+            (10, op_dashboard),
+            (10, op_doctors),
+            (40, op_available_times),
+            (10, op_book),
+            (10, op_patient_appointments),
+        ],
+    },
+    "doctor": {
+        "Doctor": [(10, op_dashboard), (60, op_doctor_appointments)],
+    },
+    "admin": {
+        "Admin": [
+            (10, op_dashboard),
+            (30, op_admin_doctors),
+            (30, op_admin_patients),
+            (10, op_doctors),
+        ],
+    },
+}
+MIXES["mixed"] = {role: ops for mix in MIXES.values() for role, ops in mix.items()}
+
+
+# ------------------------- TRANSPORTS -------------------------
+
+
+class ClientSession:
+    """A logged-in user talking to the app through the Flask test client."""
+
+    def __init__(self):
+        self.client = app.test_client()
+        self.user_id = None
+
+    def request(self, method, path, body=None):
+        headers = {}
+        csrf = self.client.get_cookie("csrf_access_token", domain="localhost")
+        if csrf and method != "GET":
+            headers["X-CSRF-TOKEN"] = csrf.value
+        response = self.client.open(
+            path, method=method, json=body, headers=headers, base_url=BASE_URL
+        )
+        return response.status_code, response.get_json(silent=True)
+
+
+class HTTPSession:
+    """A logged-in user talking to a gunicorn server over a keep-alive connection."""
+
+    def __init__(self, port):
+        self.port = port
+        self.conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        self.cookies = {}
+        self.user_id = None
+        self.queries = None  # SQL statements of the last request
+
+    def request(self, method, path, body=None):
+        # The JWT cookies are Secure; send them back by hand over plain HTTP
+        headers = {"Cookie": "; ".join(f"{k}={v}" for k, v in self.cookies.items())}
+        if method != "GET" and "csrf_access_token" in self.cookies:
+            headers["X-CSRF-TOKEN"] = self.cookies["csrf_access_token"]
+        if body is not None:
+            headers["Content-Type"] = "application/json"
+            body = json.dumps(body)
+
+        try:
+            self.conn.request(method, path, body=body, headers=headers)
+            response = self.conn.getresponse()
+            payload = response.read()
+        except (OSError, http.client.HTTPException):
+            self.conn.close()
+            self.conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=30)
+            return 0, None
+
+        timing = SERVER_TIMING_QUERIES.search(response.getheader("Server-Timing", ""))
+        self.queries = int(timing.group(1)) if timing else None
+        for name, value in response.getheaders():
+            if name.lower() == "set-cookie":
+                key, _, value = value.split(";", 1)[0].partition("=")
+                self.cookies[key] = value
+        try:
+            return response.status, json.loads(payload)
+        except ValueError:
+            return response.status, None
+
+
+def login(session, email):
+    status, _ = session.request(
+        "POST", "/login", {"email": email, "password": PASSWORD}
+    )
+    if status != 200:
+        raise RuntimeError(f"Login of {email} failed with {status}")
+    _, payload = session.request("GET", "/dashboard")
+    session.user_id = payload.get("patient_id") or payload.get("doctor_id")
+    return session
+
+
+# ------------------------- RUNNER -------------------------
+
+
+class QueryCounter:
+    """Counts SQL statements executed by the current thread."""
+
+    def __init__(self, engine):
+        self.local = threading.local()
+        event.listen(engine, "before_cursor_execute", self._count)
+
+    def _count(self, *args):
+        self.local.count = getattr(self.local, "count", 0) + 1
+
+    def read(self):
+        return getattr(self.local, "count", 0)
+
+
+def role_email(role, hospital):
+    if role == "Patient":
+        return patient_email(hospital.patient())
+    if role == "Doctor":
+        return doctor_email(hospital.doctor())
+    return "admin0@bench.example.com"
+
+
+def run_mix(mix, hospital, new_session, concurrency, duration, counter=None):
+    """
+    Replays ``mix`` from ``concurrency`` threads for ``duration`` seconds.
+
+    Returns:
+        dict: endpoint -> list of (latency seconds, accepted, queries).
+    """
+    samples = defaultdict(list)
+    lock = threading.Lock()
+    roles = list(mix)
+    stop_at = time.monotonic() + duration
+
+    def worker(index):
+        role = roles[index % len(roles)]
+        operations = [op for _, op in mix[role]]
+        weights = [weight for weight, _ in mix[role]]
+        session = login(new_session(), role_email(role, hospital))
+        local = defaultdict(list)
+
+        while time.monotonic() < stop_at:
+            operation = random.choices(operations, weights)[0]
+            endpoint, method, path, body, accepted = operation(session, hospital)
+            # Logins are measured on a throwaway session
+            target = new_session() if operation is op_login else session
+
+            queries = counter.read() if counter else 0
+            start = time.perf_counter()
+            status, _ = target.request(method, path, body)
+            latency = time.perf_counter() - start
+            queries = counter.read() - queries if counter else target.queries
+            local[endpoint].append((latency, status in accepted, queries))
+
+        with lock:
+            for endpoint, values in local.items():
+                samples[endpoint].extend(values)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples
+
+
+def percentile(quantiles, p):
+    return round(quantiles[p - 1] * 1000, 3)
+
+
+def summarize(samples, duration):
+    results = {}
+    for endpoint, values in sorted(samples.items()):
+        latencies = sorted(latency for latency, _, _ in values)
+        quantiles = (
+            statistics.quantiles(latencies, n=100, method="inclusive")
+            if len(latencies) > 1
+            else latencies * 99
+        )
+        queries = [q for _, _, q in values if q is not None]
+        results[endpoint] = {
+            "count": len(values),
+            "errors": sum(1 for _, accepted, _ in values if not accepted),
+            "rps": round(len(values) / duration, 1),
+            "p50_ms": percentile(quantiles, 50),
+            "p95_ms": percentile(quantiles, 95),
+            "p99_ms": percentile(quantiles, 99),
+            "queries": round(statistics.mean(queries), 2) if queries else None,
+        }
+    return results
+
+
+def print_results(results, duration):
+    print(
+        f"{'endpoint':<32}{'count':>8}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}"
+        f"{'p99 ms':>9}{'queries':>9}{'errors':>8}"
+    )
+    for endpoint, r in results.items():
+        print(
+            f"{endpoint:<32}{r['count']:>8}{r['rps']:>9.1f}{r['p50_ms']:>9.2f}"
+            f"{r['p95_ms']:>9.2f}{r['p99_ms']:>9.2f}{format_queries(r):>9}"
+            f"{r['errors']:>8}"
+        )
+    total = sum(r["count"] for r in results.values())
+    print(f"{'total':<32}{total:>8}{total / duration:>9.1f}")
+
+
+def format_queries(result):
+    return "n/a" if result["queries"] is None else f"{result['queries']:.2f}"
+
+
+def compare(results, baseline, tolerance):
+    """Prints p95/query deltas against ``baseline`` and returns the regressions."""
+    regressions = []
+    print(f"\n{'endpoint':<32}{'p95 before':>12}{'p95 now':>10}{'queries':>12}")
+    for endpoint, now in results.items():
+        before = baseline["endpoints"].get(endpoint)
+        if before is None:
+            continue
+        slower = now["p95_ms"] > before["p95_ms"] * (1 + tolerance)
+        more_queries = (
+            now["queries"] is not None
+            and before["queries"] is not None
+            and now["queries"] > before["queries"] + 0.01
+        )
+        if slower or more_queries:
+            regressions.append(endpoint)
+        print(
+            f"{endpoint:<32}{before['p95_ms']:>12.2f}{now['p95_ms']:>10.2f}"
+            f"{format_queries(before) + '->' + format_queries(now):>12}"
+            f"{'  REGRESSION' if endpoint in regressions else ''}"
+        )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--mix", choices=sorted(MIXES), default="mixed")
+    parser.add_argument("--transport", choices=("client", "gunicorn"), default="client")
+    parser.add_argument("--preset", default="gthread", help="gunicorn.conf.py preset")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--doctors", type=int, default=1_000)
+    parser.add_argument("--patients", type=int, default=10_000)
+    parser.add_argument("--appointments", type=int, default=100_000)
+    parser.add_argument("--port", type=int, default=5098)
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument("--output", help="Write the results as JSON")
+    parser.add_argument("--baseline", help="Compare against a JSON baseline")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.2, help="Allowed p95 slowdown (0.2=20%%)"
+    )
+    args = parser.parse_args()
+    random.seed(args.seed)
+
+    with app.app_context():
+        db.create_all()
+        ids = seed_hospital(args.doctors, args.patients, args.appointments)
+        dialect = db.engine.dialect.name
+        counter = QueryCounter(db.engine) if args.transport == "client" else None
+    hospital = Hospital(ids, args.doctors, args.patients)
+
+    server = None
+    if args.transport == "gunicorn":
+        with app.app_context():
+            db.engine.dispose()
+        os.environ.setdefault("INSTRUMENTATION_ENABLED", "1")
+        server = start_server(args.preset, args.port, None)
+        new_session = lambda: HTTPSession(args.port)  # noqa: E731
+    else:
+        new_session = ClientSession
+
+    try:
+        samples = run_mix(
+            MIXES[args.mix],
+            hospital,
+            new_session,
+            args.concurrency,
+            args.duration,
+            counter,
+        )
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    results = summarize(samples, args.duration)
+    print_results(results, args.duration)
+
+    report = {
+        "meta": {
+            "created": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "dialect": dialect,
+            "mix": args.mix,
+            "transport": args.transport,
+            "preset": args.preset if server is not None else None,
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "doctors": args.doctors,
+            "patients": args.patients,
+            "appointments": args.appointments,
+        },
+        "endpoints": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
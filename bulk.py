@@ -0,0 +1,95 @@
+"""
+Set-based bulk operations on appointments.
+
+A whole batch is handled by one ``UPDATE``/``DELETE ... RETURNING id``
+statement in a single transaction. Ownership is part of the WHERE clause, so a
+doctor can never touch another doctor's appointments.
+"""
+
+from datetime import date as date_cls
+
+from sqlalchemy import delete, select, update
+
+from models import db, Appointment
+from sync import record_changes, record_deletions
+
+MAX_BULK_IDS = 1000
+ACTIONS = {"done": "done", "delete": "deleted"}
+
+
+def parse_bulk_request(data):
+    """
+    Validates a bulk request body.
+
+    Expected JSON payload, one of:
+        {"ids": [1, 2, 3]}
+        {"date": "2025-02-10"}
+
+    Returns:
+        tuple: (list of IDs or None, date or None)
+
+    Raises:
+        ValueError: If neither or both selectors are given, or they are invalid.
+    """
+    data = data or {}
+    ids, day = data.get("ids"), data.get("date")
+    if (ids is None) == (day is None):
+        raise ValueError("Provide either 'ids' or 'date'")
+
+    if ids is not None:
+        if not isinstance(ids, list) or not 0 < len(ids) <= MAX_BULK_IDS:
+            raise ValueError(f"'ids' must be a list of 1 to {MAX_BULK_IDS} IDs")
+        return [int(i) for i in ids], None
+
+    return None, date_cls.fromisoformat(day)
+
+
+def bulk_appointment_action(action, ids=None, day=None, doctor_id=None):
+    """
+    Marks appointments as done or deletes them in one statement.
+
+    Args:
+        action (str): 'done' or 'delete'.
+        ids (list): Appointment IDs to act on.
+        day (date): Act on every appointment of this date instead of ``ids``.
+        doctor_id (int): Restrict to this doctor's appointments (ownership check).
+
+    Returns:
+        dict: Per-ID result, 'done'/'deleted', 'not_found' or 'forbidden'.
+    """
+    if action == "done":
+        stmt = update(Appointment).values(status="done")
+    else:
+        stmt = delete(Appointment)
+
+    stmt = stmt.where(
+        Appointment.id.in_(ids) if ids is not None else Appointment.date == day
+    )
+    if doctor_id is not None:
+        stmt = stmt.where(Appointment.doctor_id == doctor_id)
+
+    rows = db.session.execute(
+        stmt.returning(Appointment.id, Appointment.doctor_id, Appointment.date),
+        execution_options={"synchronize_session": False},
+    ).all()
+    affected = {row.id for row in rows}
+    if action == "done":
+        record_changes(rows, "done")
+    else:
+        record_deletions(rows)
+    results = {appointment_id: ACTIONS[action] for appointment_id in affected}
+
+    missing = set(ids or ()) - affected
+    if missing:
+        # Only misses need a second look, to tell foreign rows from absent ones
+        existing = set(
+            db.session.execute(
+                select(Appointment.id).where(Appointment.id.in_(missing))
+            ).scalars()
+        )
+        for appointment_id in missing:
+            results[appointment_id] = (
+                "forbidden" if appointment_id in existing else "not_found"
+            )
+
+    return results
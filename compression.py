@@ -0,0 +1,85 @@
+"""
+gzip for large API JSON responses.
+
+JSON bodies of at least ``COMPRESS_MIN_SIZE`` bytes are gzipped when the
+client accepts it; smaller ones aren't worth the CPU nor the gzip header.
+Streamed responses (exports, event streams) and responses that already have
+a ``Content-Encoding`` are left alone. The ETag of a compressed response is
+made weak, as its bytes differ from the identity encoding's; conditional GETs
+compare ETags weakly (see ``versions.is_not_modified``).
+
+Static assets are precompressed at build time instead, see ``assets.py``.
+"""
+
+import gzip
+
+from flask import request
+from werkzeug.http import parse_accept_header
+
+from extensions import AppLocal
+
+COMPRESSIBLE_MIMETYPES = ("application/json",)
+
+
+def accepts_gzip(accept_encoding):
+    """Whether an ``Accept-Encoding`` header value allows gzip."""
+    return parse_accept_header(accept_encoding or "")["gzip"] > 0
+
+
+def weak_etag(etag):
+    """A quoted ETag header value, made weak."""
+    return etag if etag.startswith("W/") else "W/" + etag
+
+
+class ResponseCompression:
+    """Gzips JSON responses above a size threshold in ``after_request``."""
+
+    def __init__(self):
+        self.min_size = 1024
+        self.level = 6
+
+    def init_app(self, app):
+        """Reads ``COMPRESS_MIN_SIZE`` (0 disables) and ``COMPRESS_LEVEL``."""
+        self.min_size = app.config.get("COMPRESS_MIN_SIZE", self.min_size)
+        self.level = app.config.get("COMPRESS_LEVEL", self.level)
+        if self.min_size:
+            app.after_request(self._after_request)
+
+    def should_compress(self, mimetype, size, accept_encoding):
+        return (
+            bool(self.min_size)
+            and mimetype in COMPRESSIBLE_MIMETYPES
+            and size >= self.min_size
+            and accepts_gzip(accept_encoding)
+        )
+
+    def compress(self, payload):
+        # mtime=0 keeps the output, and so the ETag, stable
+        return gzip.compress(payload, compresslevel=self.level, mtime=0)
+
+    def _after_request(self, response):
+        if response.mimetype not in COMPRESSIBLE_MIMETYPES:
+            return response
+
+        response.vary.add("Accept-Encoding")
+        if (
+            response.is_streamed
+            or response.direct_passthrough
+            or "Content-Encoding" in response.headers
+            or not 200 <= response.status_code < 300
+            or not self.should_compress(
+                response.mimetype,
+                response.calculate_content_length() or 0,
+                request.headers.get("Accept-Encoding"),
+            )
+        ):
+            return response
+
+        response.set_data(self.compress(response.get_data()))
+        response.headers["Content-Encoding"] = "gzip"
+        if "ETag" in response.headers:
+            response.headers["ETag"] = weak_etag(response.headers["ETag"])
+        return response
+
+
+response_compression = AppLocal("response_compression", ResponseCompression)
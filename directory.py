@@ -0,0 +1,214 @@
+"""
+In-process doctor directory.
+
+The doctor roster changes rarely but is read on every page load and every
+booking. Each worker keeps an immutable snapshot of all doctors, indexed by
+ID, name and specialty, with the rows of ``/doctors`` and ``/admin/doctors``
+pre-serialized to JSON. Those endpoints, name resolution in
+``/available-times`` and booking, and ``/availability`` are served from it.
+
+Snapshots are tagged with the ``doctors`` change counter (see
+``versions.py``), which every signup, import and deletion of a doctor bumps
+in its transaction:
+
+- the worker that committed the change drops its snapshot right away;
+- other workers compare the counter with their snapshot at most every
+  ``DOCTOR_DIRECTORY_TTL`` seconds, the only database access of a read.
+
+ETags of pages served from a snapshot are built from the snapshot's version,
+so they always describe the body they come with.
+"""
+
+import bisect
+import threading
+import time
+from collections import defaultdict, namedtuple
+from itertools import islice
+
+from sqlalchemy import event as orm_event
+
+from extensions import AppLocal
+from models import db, Doctor
+from pagination import page_params
+from schemas import DOCTOR
+from versions import current
+
+SCOPE = "doctors"
+FIELDS = DOCTOR.keys  # /admin/doctors
+PUBLIC_FIELDS = ("id", "name", "specialty")  # /doctors
+
+DoctorEntry = namedtuple("DoctorEntry", FIELDS)
+
+
+class DirectorySnapshot:
+    """All doctors at one version of the ``doctors`` counter."""
+
+    def __init__(self, doctors, version, changed_at):
+        self.doctors = tuple(doctors)  # In ID order
+        self.version = version
+        self.changed_at = changed_at
+        self.by_id = {doctor.id: doctor for doctor in self.doctors}
+        # Names aren't unique; like the former ``filter_by(name=...)``, one wins
+        self.by_name = {doctor.name: doctor for doctor in reversed(self.doctors)}
+        by_specialty = defaultdict(list)
+        for doctor in self.doctors:
+            by_specialty[doctor.specialty].append(doctor)
+        self.by_specialty = {key: tuple(value) for key, value in by_specialty.items()}
+
+        self._ids = [doctor.id for doctor in self.doctors]
+        self._positions = {doctor.id: i for i, doctor in enumerate(self.doctors)}
+        self._json = {}
+        for fields in (PUBLIC_FIELDS, FIELDS):
+            self.rows_json(fields)
+
+    def rows_json(self, fields):
+        """Every doctor serialized with ``fields``, as bytes in ID order."""
+        rows = self._json.get(fields)
+        if rows is None:
+            schema = DOCTOR.only(fields)
+            positions = [FIELDS.index(key) for key in schema.keys]
+            rows = tuple(
+                row.encode()
+                for row in schema.encode_rows(
+                    [[doctor[i] for i in positions] for doctor in self.doctors]
+                )
+            )
+            self._json[fields] = rows  # Same result if two threads race here
+        return rows
+
+    def page(self, allowed_fields, args):
+        """
+        One page of doctors with the parameters of ``pagination.keyset_page``.
+
+        Args:
+            allowed_fields (tuple): Fields that may be selected; all by default.
+            args: Query parameters (a ``MultiDict``).
+
+        Returns:
+            bytes: The ``{"doctors": [...], "next_after": ...}`` JSON body.
+
+        Raises:
+            ValueError: If limit, after or fields are invalid.
+        """
+        limit, after, fields = page_params(allowed_fields, args)
+
+        doctors, ids = self.doctors, self._ids
+        if args.get("specialty"):
+            doctors = self.by_specialty.get(args["specialty"], ())
+            ids = [doctor.id for doctor in doctors]
+        start = 0 if after is None else bisect.bisect_right(ids, after)
+        prefixes = [
+            (field, args[field].lower())
+            for field in ("name", "email")
+            if args.get(field)
+        ]
+
+        matches = []
+        for doctor in islice(doctors, start, None):
+            if all(getattr(doctor, f).lower().startswith(p) for f, p in prefixes):
+                matches.append(doctor)
+                if len(matches) > limit:
+                    break
+        next_after = matches[limit - 1].id if len(matches) > limit else None
+
+        rows = self.rows_json(fields)
+        return b"".join(
+            (
+                b'{"doctors":[',
+                b",".join(
+                    rows[self._positions[doctor.id]] for doctor in matches[:limit]
+                ),
+                b'],"next_after":',
+                b"null" if next_after is None else b"%d" % next_after,
+                b"}\n",
+            )
+        )
+
+
+class DoctorDirectory:
+    """Per-worker doctor snapshot, refreshed from the ``doctors`` counter."""
+
+    def __init__(self):
+        self.ttl = 1
+        self._snapshot = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """Reads ``DOCTOR_DIRECTORY_TTL`` and hooks into the session's commits."""
+        self.ttl = app.config.get("DOCTOR_DIRECTORY_TTL", self.ttl)
+        self.clear()
+
+        # Once for the session every app shares, see ``_after_commit``
+        if not orm_event.contains(db.session, "after_commit", _after_commit):
+            orm_event.listen(db.session, "after_commit", _after_commit)
+            orm_event.listen(db.session, "after_rollback", _after_rollback)
+
+    def expire(self):
+        """Checks the counter again on the next read."""
+        self._checked_at = 0.0
+
+    def clear(self):
+        with self._lock:
+            self._snapshot = None
+            self._checked_at = 0.0
+
+    def fresh(self):
+        """The snapshot if its version was checked within ``ttl``, else None."""
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() - self._checked_at < self.ttl:
+            return snapshot
+        return None
+
+    def snapshot(self):
+        """
+        The current snapshot, reloaded when the ``doctors`` counter moved.
+
+        Needs an app context; only queries the database every ``ttl`` seconds.
+        """
+        snapshot = self.fresh()
+        if snapshot is None:
+            with self._lock:  # One reload per worker, the others wait for it
+                snapshot = self.fresh() or self._refresh()
+        return snapshot
+
+    def _refresh(self):
+        checked_at = time.monotonic()
+        # Counter before rows: a concurrent change leaves the snapshot labelled
+        # older than its rows, so the next check reloads it
+        versions, changed_at = current(SCOPE)
+        snapshot = self._snapshot
+        if snapshot is None or snapshot.version != versions[SCOPE]:
+            rows = db.session.execute(DOCTOR.select().order_by(Doctor.id))
+            snapshot = DirectorySnapshot(
+                [DoctorEntry(*row) for row in rows], versions[SCOPE], changed_at
+            )
+        self._snapshot, self._checked_at = snapshot, checked_at
+        return snapshot
+
+    def versions(self, *scopes):
+        """``versions.current`` for the ``doctors`` scope, from the snapshot."""
+        snapshot = self.snapshot()
+        return {SCOPE: snapshot.version}, snapshot.changed_at
+
+    def find(self, name):
+        """The doctor called ``name`` or None."""
+        return self.snapshot().by_name.get(name)
+
+
+doctor_directory = AppLocal("doctor_directory", DoctorDirectory)
+
+
+def snapshot_versions(*scopes):
+    """``versions`` of the current app's directory, a ``conditional`` source."""
+    return doctor_directory.versions(*scopes)
+
+
+def _after_commit(session):
+    # Sessions only exist inside an app context: expire that app's directory
+    if SCOPE in session.info.pop("bumped_scopes", ()):
+        doctor_directory.expire()
+
+
+def _after_rollback(session):
+    session.info.pop("bumped_scopes", None)
@@ -0,0 +1,257 @@
+"""
+Server-Sent Events for appointment changes.
+
+Writes publish small events ("booked", "done", "deleted") naming the doctor and
+the appointment IDs; dashboards react by running a delta sync (see
+``sync.py``). Each event goes to ``doctor:<id>`` and to the ``admin``
+firehose. The transport between workers is pluggable (``EVENTS_BACKEND``):
+
+    memory    - in-process only, for tests and single-worker servers
+    postgres  - ``NOTIFY`` inside the writing transaction, one ``LISTEN``
+                connection (psycopg2) per worker fans events out to its
+                subscribers
+
+Events are only delivered once their transaction commits. Each worker keeps
+the last ``EVENTS_REPLAY_SIZE`` events, so a reconnecting ``EventSource``
+resumes after its ``Last-Event-ID``. When that ID has already left the buffer,
+or when a slow client overflows its ``EVENTS_QUEUE_SIZE`` queue, the client
+gets a ``reset`` event and should resync. Idle streams get a comment line every
+``EVENTS_HEARTBEAT`` seconds, which also detects disconnected clients.
+
+Each open stream holds a worker thread or greenlet. ``gunicorn.conf.py``
+defaults to the gevent preset so thousands of idle dashboards cost neither
+threads nor database polling, and refuses to start several workers on the
+memory broker.
+"""
+
+import itertools
+import json
+import logging
+import os
+import queue
+import select
+import threading
+import time
+from collections import deque
+
+from sqlalchemy import event as orm_event, text
+
+from extensions import AppLocal
+from models import db
+
+CHANNEL = "hms_events"  # Postgres NOTIFY channel
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryBroker:
+    """Delivers events to the subscribers of this process after commit."""
+
+    transactional = False
+
+    def __init__(self, hub, app=None):
+        self.hub = hub
+
+    def publish(self, payload):
+        self.hub.dispatch(json.loads(payload))
+
+
+class PostgresBroker:
+    """``NOTIFY`` in the writing transaction, ``LISTEN`` on one connection per worker."""
+
+    transactional = True
+
+    def __init__(self, hub, app=None):
+        self.hub = hub
+        self.app = app
+        self._listener_pid = None
+        self._lock = threading.Lock()
+
+    def publish(self, payload):
+        db.session.execute(
+            text("SELECT pg_notify(:channel, :payload)"),
+            {"channel": CHANNEL, "payload": payload},
+        )
+
+    def start(self):
+        # Threads don't survive fork, so each (gunicorn) worker starts its own
+        with self._lock:
+            if self._listener_pid == os.getpid():
+                return
+            self._listener_pid = os.getpid()
+        threading.Thread(
+            target=self._listen, name="events-listener", daemon=True
+        ).start()
+
+    def _listen(self):
+        with self.app.app_context():
+            engine = db.engine
+        while True:
+            try:
+                conn = engine.raw_connection()
+                try:
+                    raw = conn.driver_connection
+                    raw.autocommit = True
+                    raw.cursor().execute(f"LISTEN {CHANNEL}")
+                    while True:
+                        if select.select([raw], [], [], 60) == ([], [], []):
+                            continue
+                        raw.poll()
+                        while raw.notifies:
+                            self.hub.dispatch(json.loads(raw.notifies.pop(0).payload))
+                finally:
+                    conn.invalidate()
+            except Exception:
+                logger.exception("Event listener failed, reconnecting")
+                time.sleep(1)
+
+
+BACKENDS = {"memory": MemoryBroker, "postgres": PostgresBroker}
+
+
+class Subscriber:
+    """Bounded queue of one open stream."""
+
+    def __init__(self, channels, size):
+        self.channels = set(channels)
+        self.queue = queue.Queue(maxsize=size)
+        self.overflowed = False
+
+    def offer(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except queue.Full:
+            # Never block the publisher on a slow client; it resyncs instead
+            self.overflowed = True
+
+
+class EventHub:
+    """Publishes events and fans them out to the open streams of this process."""
+
+    def __init__(self, broker=None):
+        self.broker = broker or MemoryBroker(self)
+        self.heartbeat = 15
+        self.queue_size = 100
+        self.replay = deque(maxlen=1000)
+        self.subscribers = set()
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+
+    def init_app(self, app, broker=None):
+        """
+        Selects the broker from ``EVENTS_BACKEND`` unless ``broker`` is given,
+        and hooks event delivery into the session's commit/rollback.
+        """
+        if broker is None:
+            broker = BACKENDS[app.config.get("EVENTS_BACKEND", "memory")](self, app)
+        self.broker = broker
+        self.heartbeat = app.config.get("EVENTS_HEARTBEAT", self.heartbeat)
+        self.queue_size = app.config.get("EVENTS_QUEUE_SIZE", self.queue_size)
+        self.replay = deque(maxlen=app.config.get("EVENTS_REPLAY_SIZE", 1000))
+
+        # Once for the session every app shares, see ``_after_commit``
+        if not orm_event.contains(db.session, "after_commit", _after_commit):
+            orm_event.listen(db.session, "after_commit", _after_commit)
+            orm_event.listen(db.session, "after_rollback", _after_rollback)
+
+    # ------------------------- PUBLISHING -------------------------
+
+    def publish(self, channels, type, data):
+        """
+        Publishes an event from the current transaction.
+
+        Delivered when the transaction commits, dropped if it rolls back.
+        """
+        payload = json.dumps(
+            {
+                # Unique across workers, ordered within each publisher
+                "id": f"{time.time_ns():x}-{os.getpid()}-{next(self._ids)}",
+                "channels": list(channels),
+                "type": type,
+                "data": data,
+            }
+        )
+        if self.broker.transactional:
+            self.broker.publish(payload)
+        else:
+            db.session.info.setdefault("pending_events", []).append(payload)
+
+    def dispatch(self, event):
+        """Hands a committed event to every matching stream of this process."""
+        channels = set(event["channels"])
+        with self._lock:
+            self.replay.append(event)
+            subscribers = [s for s in self.subscribers if s.channels & channels]
+        for subscriber in subscribers:
+            subscriber.offer(event)
+
+    # ------------------------- STREAMING -------------------------
+
+    def stream(self, channels, last_event_id=None):
+        """
+        Generator of SSE messages for ``channels``.
+
+        Args:
+            channels (list): Channels to follow, e.g. ``["doctor:4"]``.
+            last_event_id (str): ``Last-Event-ID`` of a reconnecting client.
+        """
+        start = getattr(self.broker, "start", None)
+        if start:
+            start()
+
+        subscriber = Subscriber(channels, self.queue_size)
+        with self._lock:
+            # Subscribe before reading the replay buffer so nothing falls between
+            self.subscribers.add(subscriber)
+            backlog = list(self.replay)
+
+        try:
+            yield "retry: 3000\n\n"
+            replayed = set()
+            if last_event_id:
+                ids = [event["id"] for event in backlog]
+                if last_event_id in ids:
+                    for event in backlog[ids.index(last_event_id) + 1 :]:
+                        if subscriber.channels & set(event["channels"]):
+                            replayed.add(event["id"])
+                            yield self.format(event)
+                else:
+                    # Missed more than the buffer holds; resume from its end
+                    latest = backlog[-1]["id"] if backlog else ""
+                    yield self.format({"id": latest, "type": "reset", "data": {}})
+
+            while True:
+                if subscriber.overflowed:
+                    subscriber.overflowed = False
+                    yield self.format({"id": "", "type": "reset", "data": {}})
+                try:
+                    event = subscriber.queue.get(timeout=self.heartbeat)
+                except queue.Empty:
+                    yield ": heartbeat\n\n"
+                    continue
+                if event["id"] not in replayed:
+                    yield self.format(event)
+        finally:
+            with self._lock:
+                self.subscribers.discard(subscriber)
+
+    @staticmethod
+    def format(event):
+        return (
+            f"id: {event['id']}\n"
+            f"event: {event['type']}\n"
+            f"data: {json.dumps(event['data'])}\n\n"
+        )
+
+
+event_hub = AppLocal("event_hub", EventHub)
+
+
+def _after_commit(session):
+    # Sessions only exist inside an app context: publish through that app's hub
+    for payload in session.info.pop("pending_events", ()):
+        event_hub.broker.publish(payload)
+
+
+def _after_rollback(session):
+    session.info.pop("pending_events", None)
@@ -0,0 +1,43 @@
+"""
+Per-app state of the module-level extensions.
+
+Routes and models import ``doctor_directory``, ``event_hub``,
+``password_hasher`` and the like at module level, but each app built by
+``create_app`` needs its own caches, stores, pools and settings, or the last
+app built would serve every other one. Those names are ``AppLocal`` handles:
+``init_app`` builds a new instance for the app and keeps it in
+``app.extensions``, and every other attribute is looked up on the instance
+of the current app.
+
+Code running outside an app context (the ASGI handlers, benchmarks) gets the
+instance with ``for_app``.
+"""
+
+from flask import current_app
+
+
+class AppLocal:
+    """Module-level handle of an extension instantiated once per app."""
+
+    def __init__(self, name, factory):
+        self._name = name
+        self._factory = factory
+
+    def init_app(self, app, *args, **kwargs):
+        """Builds the instance of ``app`` and runs its ``init_app``, if any."""
+        instance = self._factory()
+        app.extensions[self._name] = instance
+        init_app = getattr(instance, "init_app", None)
+        if init_app is not None:
+            init_app(app, *args, **kwargs)
+        return instance
+
+    def for_app(self, app):
+        """The instance of ``app``."""
+        return app.extensions[self._name]
+
+    def __getattr__(self, name):
+        return getattr(current_app.extensions[self._name], name)
+
+    def __repr__(self):
+        return f"<AppLocal {self._name!r}>"
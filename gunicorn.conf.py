@@ -0,0 +1,104 @@
+"""
+Gunicorn settings for the production image.
+
+Usage:
+    gunicorn -c gunicorn.conf.py app:app
+
+``GUNICORN_PRESET`` picks a worker model, the other variables override it:
+
+    sync     - one request per process, for CPU-bound debugging only
+    gthread  - a few processes with a thread pool each; keep ``DB_POOL_SIZE``
+               >= ``GUNICORN_THREADS`` so threads don't queue on the
+               connection pool. Every open dashboard holds one of the threads
+               with its event stream, so only for deployments without them
+    gevent   - (default) cooperative greenlets, so open event streams and
+               other slow/idle clients cost no threads; requires ``gevent``
+               and, with Postgres, ``psycogreen`` (both in the image). Passwords
+               are hashed inline unless ``PASSWORD_HASH_WORKERS`` is set
+
+    GUNICORN_BIND                 default 0.0.0.0:5000
+    WEB_CONCURRENCY               worker processes
+    GUNICORN_WORKER_CLASS         overrides the preset's worker class
+    GUNICORN_THREADS              threads per gthread worker
+    GUNICORN_WORKER_CONNECTIONS   greenlets per gevent worker
+    GUNICORN_TIMEOUT              seconds before a silent worker is restarted
+    GUNICORN_MAX_REQUESTS         recycle workers after this many requests (0 = never)
+
+With several workers, events must travel through Postgres
+(``EVENTS_BACKEND=postgres``, the default on a Postgres database): startup
+fails with the in-process ``memory`` broker, which would drop the events
+written by other workers.
+"""
+
+import multiprocessing
+import os
+
+from config import Config, env_int
+
+cpus = multiprocessing.cpu_count()
+
+PRESETS = {
+    "sync": {"worker_class": "sync", "workers": cpus * 2 + 1, "threads": 1},
+    "gthread": {"worker_class": "gthread", "workers": cpus + 1, "threads": 4},
+    "gevent": {"worker_class": "gevent", "workers": cpus, "threads": 1},
+}
+
+preset_name = os.environ.get("GUNICORN_PRESET", "gevent")
+if preset_name not in PRESETS:
+    raise ValueError(
+        f"Unknown GUNICORN_PRESET {preset_name!r}, expected {list(PRESETS)}"
+    )
+preset = PRESETS[preset_name]
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:5000")
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", preset["worker_class"])
+workers = env_int("WEB_CONCURRENCY", preset["workers"])
+threads = env_int("GUNICORN_THREADS", preset["threads"])
+worker_connections = env_int("GUNICORN_WORKER_CONNECTIONS", 1000)
+timeout = env_int("GUNICORN_TIMEOUT", 30)
+graceful_timeout = timeout
+keepalive = 5
+max_requests = env_int("GUNICORN_MAX_REQUESTS", 0)
+max_requests_jitter = max_requests // 10
+
+if workers > 1 and Config.EVENTS_BACKEND == "memory":
+    raise ValueError(
+        "EVENTS_BACKEND=memory only reaches the event streams of its own worker; "
+        "use EVENTS_BACKEND=postgres or WEB_CONCURRENCY=1"
+    )
+
+# Import the app once in the master so workers fork with it already loaded
+preload_app = True
+
+accesslog = "-"
+errorlog = "-"
+
+if worker_class == "gevent":
+    # Patch before the app (and its database driver) is imported by preload_app
+    from gevent import monkey
+
+    monkey.patch_all()
+    try:
+        from psycogreen.gevent import patch_psycopg
+    except ImportError:  # Without it psycopg2 blocks the whole worker
+        pass
+    else:
+        patch_psycopg()
+
+    # A hashing process pool started from a monkey-patched worker relies on a
+    # manager thread and on futures that gevent patches, which hasn't been
+    # proven safe; hash inline instead, which blocks the worker's greenlets
+    # for the duration of one hash, unless PASSWORD_HASH_WORKERS says otherwise
+    if "PASSWORD_HASH_WORKERS" not in os.environ:
+        Config.PASSWORD_HASH_WORKERS = 0
+
+
+def post_fork(server, worker):
+    """Give every worker its own connection pool."""
+    from app import app
+    from models import db
+
+    # Sockets inherited from the master must not be shared between processes;
+    # close=False leaves them open for the master instead of closing them here
+    with app.app_context():
+        db.engine.dispose(close=False)
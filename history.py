@@ -0,0 +1,106 @@
+"""
+A patient's appointment history, in upcoming and past windows.
+
+    GET /patient/appointments?window=upcoming    today onwards, soonest first
+    GET /patient/appointments?window=past        before today, latest first
+
+Pages are cut on ``(date, time_slot, id)``, the order of the list, so a page
+costs one index range scan of ``ix_appointment_patient_id_date`` however deep
+the client is, and rows booked or cancelled meanwhile never shift a page. The
+doctor's name and specialty are joined in the same query: a page is always a
+single statement, whatever its size.
+"""
+
+from datetime import date, datetime
+
+from sqlalchemy import tuple_
+
+from models import db, Appointment, Doctor
+from pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from schemas import PATIENT_APPOINTMENT
+
+WINDOWS = ("upcoming", "past")
+
+
+def format_cursor(row):
+    """The ``after`` cursor of a row: ``<date>.<HHMM>.<id>``."""
+    return f"{row.date.isoformat()}.{row.time:%H%M}.{row.id}"
+
+
+def parse_cursor(cursor):
+    """
+    Splits an ``after`` cursor into its (date, time slot, ID) key.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    day, slot, appointment_id = cursor.split(".")
+    return (
+        date.fromisoformat(day),
+        datetime.strptime(slot, "%H%M").time(),
+        int(appointment_id),
+    )
+
+
+def history_query(patient_id, args, today=None):
+    """
+    Builds the query of one page of a patient's appointments.
+
+    Args:
+        patient_id (int): The patient.
+        args: Query parameters (a ``MultiDict``): ``window`` (upcoming by
+            default), ``limit`` and ``after``.
+        today (date): Boundary between the windows, today by default.
+
+    Returns:
+        tuple: (SELECT statement, page size)
+
+    Raises:
+        ValueError: If window, limit or after are invalid.
+    """
+    window = args.get("window", "upcoming")
+    if window not in WINDOWS:
+        raise ValueError(f"window must be one of: {', '.join(WINDOWS)}")
+    limit = int(args.get("limit", DEFAULT_PAGE_SIZE))
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+
+    today = today or date.today()
+    key = tuple_(Appointment.date, Appointment.time_slot, Appointment.id)
+    stmt = (
+        PATIENT_APPOINTMENT.select()
+        .outerjoin(Doctor, Doctor.id == Appointment.doctor_id)
+        .where(Appointment.patient_id == patient_id)
+        .limit(limit + 1)
+    )
+    if window == "upcoming":
+        stmt = stmt.where(Appointment.date >= today).order_by(
+            Appointment.date, Appointment.time_slot, Appointment.id
+        )
+    else:
+        stmt = stmt.where(Appointment.date < today).order_by(
+            Appointment.date.desc(), Appointment.time_slot.desc(), Appointment.id.desc()
+        )
+
+    after = args.get("after")
+    if after:
+        after = parse_cursor(after)
+        stmt = stmt.where(key > after if window == "upcoming" else key < after)
+    return stmt, limit
+
+
+def history_page(patient_id, args, today=None):
+    """
+    One page of a patient's appointments, see ``history_query``.
+
+    Returns:
+        tuple: (page as a ``RawJSON`` array, cursor to pass as ``after`` for
+        the next page or None)
+
+    Raises:
+        ValueError: If window, limit or after are invalid.
+    """
+    stmt, limit = history_query(patient_id, args, today)
+    rows = db.session.execute(stmt).all()
+    next_after = format_cursor(rows[limit - 1]) if len(rows) > limit else None
+    return PATIENT_APPOINTMENT.encode(rows[:limit]), next_after
@@ -0,0 +1,219 @@
+"""
+Per-request SQL and timing instrumentation.
+
+When ``INSTRUMENTATION_ENABLED`` is set, every request records its SQL
+statement count, total database time, slowest statement and wall time:
+
+- The figures are returned in a ``Server-Timing`` header, e.g.
+  ``db;dur=3.1;desc="4 queries", db-slowest;dur=1.9, total;dur=7.4``.
+- They are aggregated per route and exposed in the Prometheus text format at
+  ``/metrics``, to admins and to scrapers sending ``METRICS_TOKEN`` as a
+  bearer token.
+- Statements slower than ``SLOW_QUERY_MS`` are logged with the route that ran
+  them.
+
+When disabled, no hooks are registered, so requests and queries pay nothing.
+Metrics are kept per process; under gunicorn every worker reports its own
+counters, so scrape each worker or sum them on the Prometheus side.
+"""
+
+import hmac
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+
+from flask import Response, request
+from sqlalchemy import event
+
+from auth import role_required
+from extensions import AppLocal
+from models import db
+
+# Upper bounds (seconds) of the request duration histogram
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class RouteStats:
+    """Counters of one (method, route) pair."""
+
+    __slots__ = ("requests", "queries", "db_time", "wall_time", "slowest", "buckets")
+
+    def __init__(self):
+        self.requests = defaultdict(int)  # status -> count
+        self.queries = 0
+        self.db_time = 0.0
+        self.wall_time = 0.0
+        self.slowest = 0.0
+        self.buckets = [0] * (len(DURATION_BUCKETS) + 1)  # Last one is +Inf
+
+
+class Instrumentation:
+    """Collects SQL and wall-time figures of every request."""
+
+    def __init__(self):
+        self.enabled = False
+        self.slow_query = 0.2
+        self.token = None
+        self.slow_queries = 0
+        self.routes = defaultdict(RouteStats)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.enabled = app.config.get("INSTRUMENTATION_ENABLED", False)
+        self.slow_query = app.config.get("SLOW_QUERY_MS", 200) / 1000
+        self.token = app.config.get("METRICS_TOKEN")
+        self.logger = app.logger
+        if not self.enabled:
+            return
+
+        with app.app_context():
+            event.listen(db.engine, "before_cursor_execute", self._before_cursor)
+            event.listen(db.engine, "after_cursor_execute", self._after_cursor)
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+        app.add_url_rule("/metrics", "metrics", self.metrics_view)
+
+    # ------------------------- HOOKS -------------------------
+
+    def _before_cursor(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    def _after_cursor(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        current = getattr(self._local, "current", None)
+        if current is not None:
+            current["queries"] += 1
+            current["db_time"] += elapsed
+            current["slowest"] = max(current["slowest"], elapsed)
+
+        if elapsed >= self.slow_query:
+            with self._lock:
+                self.slow_queries += 1
+            self.logger.warning(
+                "Slow query (%.1f ms) in %s: %s",
+                elapsed * 1000,
+                current["route"] if current else "<no request>",
+                " ".join(statement.split())[:500],
+            )
+
+    def _before_request(self):
+        self._local.current = {
+            "start": time.perf_counter(),
+            "route": request.url_rule.rule if request.url_rule else "<unmatched>",
+            "queries": 0,
+            "db_time": 0.0,
+            "slowest": 0.0,
+        }
+
+    def _after_request(self, response):
+        current = getattr(self._local, "current", None)
+        if current is None:
+            return response
+
+        wall_time = time.perf_counter() - current["start"]
+        response.headers["Server-Timing"] = (
+            f'db;dur={current["db_time"] * 1000:.2f};desc="{current["queries"]} queries", '
+            f'db-slowest;dur={current["slowest"] * 1000:.2f}, '
+            f"total;dur={wall_time * 1000:.2f}"
+        )
+        if current["route"] != "/metrics":
+            self._record(current, request.method, response.status_code, wall_time)
+        return response
+
+    def _teardown_request(self, exc):
+        self._local.current = None
+
+    def _record(self, current, method, status, wall_time):
+        with self._lock:
+            stats = self.routes[(method, current["route"])]
+            stats.requests[status] += 1
+            stats.queries += current["queries"]
+            stats.db_time += current["db_time"]
+            stats.wall_time += wall_time
+            stats.slowest = max(stats.slowest, current["slowest"])
+            stats.buckets[bisect_left(DURATION_BUCKETS, wall_time)] += 1
+
+    # ------------------------- EXPORT -------------------------
+
+    def render_metrics(self):
+        """Returns all counters in the Prometheus text exposition format."""
+        with self._lock:
+            routes = sorted(self.routes.items())
+            lines = [
+                "# HELP hms_http_requests_total Requests by route and status.",
+                "# TYPE hms_http_requests_total counter",
+            ]
+            for (method, route), stats in routes:
+                for status, count in sorted(stats.requests.items()):
+                    lines.append(
+                        f'hms_http_requests_total{{method="{method}",route="{route}",'
+                        f'status="{status}"}} {count}'
+                    )
+
+            lines += [
+                "# HELP hms_http_request_duration_seconds Request wall time.",
+                "# TYPE hms_http_request_duration_seconds histogram",
+            ]
+            for (method, route), stats in routes:
+                labels = f'method="{method}",route="{route}"'
+                cumulative = 0
+                for bound, count in zip(DURATION_BUCKETS + ("+Inf",), stats.buckets):
+                    cumulative += count
+                    lines.append(
+                        f"hms_http_request_duration_seconds_bucket"
+                        f'{{{labels},le="{bound}"}} {cumulative}'
+                    )
+                lines.append(
+                    f"hms_http_request_duration_seconds_sum{{{labels}}} "
+                    f"{stats.wall_time:.6f}"
+                )
+                lines.append(
+                    f"hms_http_request_duration_seconds_count{{{labels}}} {cumulative}"
+                )
+
+            for name, kind, help_text, value in (
+                ("hms_db_queries_total", "counter", "SQL statements.", "queries"),
+                ("hms_db_duration_seconds_total", "counter", "Time in SQL.", "db_time"),
+                ("hms_db_slowest_query_seconds", "gauge", "Slowest SQL.", "slowest"),
+            ):
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+                for (method, route), stats in routes:
+                    lines.append(
+                        f'{name}{{method="{method}",route="{route}"}} '
+                        f"{getattr(stats, value):.6g}"
+                    )
+
+            lines += [
+                f"# HELP hms_db_slow_queries_total Statements over {self.slow_query}s.",
+                "# TYPE hms_db_slow_queries_total counter",
+                f"hms_db_slow_queries_total {self.slow_queries}",
+            ]
+        return "\n".join(lines) + "\n"
+
+    def metrics_view(self):
+        authorization = request.headers.get("Authorization", "")
+        if self.token and hmac.compare_digest(
+            authorization.encode(), f"Bearer {self.token}".encode()
+        ):
+            return self._metrics_response()
+        return self._admin_metrics_view()
+
+    @role_required("Admin")
+    def _admin_metrics_view(self):
+        return self._metrics_response()
+
+    def _metrics_response(self):
+        return Response(
+            self.render_metrics(), mimetype="text/plain; version=0.0.4; charset=utf-8"
+        )
+
+    def reset(self):
+        with self._lock:
+            self.routes.clear()
+            self.slow_queries = 0
+
+
+instrumentation = AppLocal("instrumentation", Instrumentation)
@@ -27,57 +27,75 @@ document.addEventListener("DOMContentLoaded", function () {
           window.location.href = "login.html"; // Redirect if the role isn't admin
         } else {
           document.getElementById("roleDisplay").innerHTML = `Welcome, Admin`;
-          // Optionally, load doctors, patients, and admins
+          // Load the first page of doctors; other lists are fetched on demand
           viewDoctors();
-          viewPatients();
-          viewAdmins();
         }
       }
     })
     .catch((error) => console.error("Error:", error));
 });
 
+const PAGE_SIZE = 50;
+
+// The list currently shown, so "Load more" and search know what to fetch
+let listState = { type: null, title: null, after: null, items: [] };
+
 // Fetch and display list of doctors
 function viewDoctors() {
-  fetch("http://127.0.0.1:5000/admin/doctors", {
-    method: "GET",
-    credentials: "include",
-  })
-    .then((response) => response.json())
-    .then((data) => {
-      displayData(data.doctors, "Doctors", "doctor"); // Extract the doctors array
-    })
-    .catch((error) => console.error("Error loading doctors:", error));
+  loadList("doctor", "Doctors");
 }
 
 // Fetch and display list of patients
 function viewPatients() {
-  fetch("http://127.0.0.1:5000/admin/patients", {
-    method: "GET",
-    credentials: "include",
-  })
-    .then((response) => response.json())
-    .then((data) => {
-      displayData(data.patients, "Patients", "patient"); // Extract the patients array
-    })
-    .catch((error) => console.error("Error loading patients:", error));
+  loadList("patient", "Patients");
 }
 
 // Fetch and display list of admins
 function viewAdmins() {
-  fetch("http://127.0.0.1:5000/admin/admins", {
+  loadList("admin", "Admins");
+}
+
+// Fetch one page of a list; append it to the shown rows when loading more
+function loadList(type, title, append = false) {
+  if (!append) {
+    listState = { type, title, after: null, items: [] };
+  }
+
+  const params = new URLSearchParams({ limit: PAGE_SIZE, fields: "name,email" });
+  if (listState.after !== null) params.set("after", listState.after);
+  const search = document.getElementById("searchInput").value.trim();
+  if (search) params.set(search.includes("@") ? "email" : "name", search);
+
+  fetch(`http://127.0.0.1:5000/admin/${type}s?${params}`, {
     method: "GET",
     credentials: "include",
+    cache: "no-cache", // Revalidate with the ETag, 304 if the list is unchanged
   })
     .then((response) => response.json())
     .then((data) => {
-      displayData(data.admins, "Admins", "admin"); // Extract the admins array
+      if (listState.type !== type) return; // Another list was opened meanwhile
+      listState.items = listState.items.concat(data[`${type}s`]);
+      listState.after = data.next_after;
+      displayData(listState.items, title, type, data.next_after !== null);
     })
-    .catch((error) => console.error("Error loading admins:", error));
+    .catch((error) => console.error(`Error loading ${type}s:`, error));
+}
+
+function loadMore() {
+  loadList(listState.type, listState.title, true);
+}
+
+// Re-run the current list with the search box value, debounced while typing
+let searchTimer = null;
+function searchList() {
+  clearTimeout(searchTimer);
+  searchTimer = setTimeout(() => {
+    if (listState.type) loadList(listState.type, listState.title);
+  }, 300);
 }
 
 // Display list of doctors, patients, or admins
-function displayData(items, title, type) {
+function displayData(items, title, type, hasMore) {
   const dataDiv = document.getElementById("adminDataList");
   dataDiv.innerHTML = `<h4>${title} List</h4>`;
   if (items.length === 0) {
@@ -101,6 +119,9 @@ function displayData(items, title, type) {
               </tr>`;
   });
   table += "</table>";
+  if (hasMore) {
+    table += `<button class="btn btn-secondary btn-sm" onclick="loadMore()">Load more</button>`;
+  }
   dataDiv.innerHTML = table;
 }
 
@@ -97,41 +97,52 @@ document
   .getElementById("doctor")
   .addEventListener("change", fetchAvailableTimes);
 
-// Fetch available doctors
+// Fetch available doctors, following the pagination cursor until all are loaded
 function fetchDoctors() {
   const csrfToken = getCookie("csrf_access_token");
-  fetch("http://127.0.0.1:5000/doctors", {
-    method: "GET",
-    credentials: "include", // Include JWT token via cookies
-    headers: {
-      "X-CSRF-TOKEN": csrfToken, // Send CSRF token in headers
-    },
-  })
-    .then((response) => {
-      if (!response.ok) {
-        throw new Error(`HTTP error! Status: ${response.status}`);
-      }
-      return response.json();
-    })
-    .then((data) => {
-      let doctorDropdown = document.getElementById("doctor");
-      doctorDropdown.innerHTML = '<option value="">Select a Doctor</option>'; // Default option
+  let doctorDropdown = document.getElementById("doctor");
+  doctorDropdown.innerHTML = '<option value="">Select a Doctor</option>'; // Default option
 
-      if (data.doctors.length === 0) {
-        doctorDropdown.innerHTML =
-          '<option value="">No doctors available</option>';
-      } else {
+  function fetchPage(after) {
+    let params = new URLSearchParams({ limit: 500 });
+    if (after !== null) params.set("after", after);
+
+    return fetch(`http://127.0.0.1:5000/doctors?${params}`, {
+      method: "GET",
+      credentials: "include", // Include JWT token via cookies
+      cache: "no-cache", // Revalidate with the ETag, 304 if no doctor changed
+      headers: {
+        "X-CSRF-TOKEN": csrfToken, // Send CSRF token in headers
+      },
+    })
+      .then((response) => {
+        if (!response.ok) {
+          throw new Error(`HTTP error! Status: ${response.status}`);
+        }
+        return response.json();
+      })
+      .then((data) => {
         data.doctors.forEach((doc) => {
           let option = document.createElement("option");
           option.value = doc.name;
           option.textContent = `${doc.name} (${doc.specialty})`;
           doctorDropdown.appendChild(option);
         });
+        if (data.next_after !== null) {
+          return fetchPage(data.next_after);
+        }
+      });
+  }
+
+  fetchPage(null)
+    .then(() => {
+      if (doctorDropdown.options.length === 1) {
+        doctorDropdown.innerHTML =
+          '<option value="">No doctors available</option>';
       }
     })
     .catch((error) => {
       console.error("Error fetching doctors:", error);
-      let doctorDropdown = document.getElementById("doctor");
       doctorDropdown.innerHTML =
         '<option value="">Error loading doctors</option>';
     });
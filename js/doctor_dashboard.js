@@ -30,64 +30,35 @@ document.addEventListener("DOMContentLoaded", function () {
             "roleDisplay"
           ).innerHTML = `Welcome Dr. ${(data.name).toUpperCase()}`;
           viewAppointments(); // Automatically load appointments
+          listenForChanges();
         }
       }
     })
     .catch((error) => console.error("Error:", error));
 });
 
-// Fetch and display doctor's appointments
+// Appointments by ID and the cursor of the last sync, so refreshes only
+// download what changed since then
+let appointmentsById = new Map();
+let syncCursor = null;
+
+// Sync and display doctor's appointments
 function viewAppointments() {
-  fetch(`http://127.0.0.1:5000/doctor/appointments?timestamp=${Date.now()}`, {
+  const params = new URLSearchParams();
+  if (syncCursor) params.set("since", syncCursor);
+
+  fetch(`http://127.0.0.1:5000/doctor/appointments/sync?${params}`, {
     method: "GET",
     credentials: "include", // Ensure JWT is sent in cookies
+    cache: "no-store",
   })
     .then((response) => response.json())
     .then((data) => {
-      const appointments = data.appointments; // Extract the array
-      const appointmentsDiv = document.getElementById("appointmentsList");
-      appointmentsDiv.innerHTML = "";
-
-      if (!appointments || appointments.length === 0) {
-        appointmentsDiv.innerHTML = "<p>No appointments found.</p>";
-        return;
-      }
-
-      let table = `<table class='table'>
-          <thead>
-            <tr>
-              <th>Patient Name</th>
-              <th>Date</th>
-              <th>Time</th>
-              <th>Status</th>
-              <th>Actions</th>
-            </tr>
-          </thead>
-          <tbody>`;
-
-      appointments.forEach((app) => {
-        table += `<tr>
-          <td>${app.patient_name}</td>
-          <td>${app.date}</td>
-          <td>${app.time}</td>
-          <td id="status-${app.id}">${app.status || "pending"}</td>
-          <td>
-              <button class="btn btn-success btn-sm" onclick="markAsDone(${
-                app.id
-              })" ${app.status === "done" ? "disabled" : ""}>
-                Mark as Done
-              </button>
-              <button class="btn btn-danger btn-sm" onclick="deleteAppointment(${
-                app.id
-              })">
-                Delete
-              </button>
-          </td>
-      </tr>`;
-      });
-
-      table += "</tbody></table>";
-      appointmentsDiv.innerHTML = table;
+      if (data.full) appointmentsById = new Map();
+      data.deleted.forEach((id) => appointmentsById.delete(id));
+      data.appointments.forEach((app) => appointmentsById.set(app.id, app));
+      syncCursor = data.cursor;
+      renderAppointments();
     })
     .catch((error) => {
       console.error("Error loading appointments:", error);
@@ -96,6 +67,77 @@ function viewAppointments() {
     });
 }
 
+// Resync whenever the server pushes a change to this doctor's appointments.
+// EventSource reconnects by itself and resumes after the last event it saw.
+let resyncTimer = null;
+function listenForChanges() {
+  const source = new EventSource(
+    "http://127.0.0.1:5000/doctor/appointments/events",
+    { withCredentials: true }
+  );
+  ["booked", "done", "deleted", "reset"].forEach((type) =>
+    source.addEventListener(type, () => {
+      clearTimeout(resyncTimer);
+      resyncTimer = setTimeout(viewAppointments, 200); // Coalesce bursts
+    })
+  );
+}
+
+// Sort key of a "09:00AM" style time
+function minutesOf(time) {
+  const [, hours, minutes, meridiem] = time.match(/(\d+):(\d+)(AM|PM)/);
+  return ((+hours % 12) + (meridiem === "PM" ? 12 : 0)) * 60 + +minutes;
+}
+
+function renderAppointments() {
+  const appointments = [...appointmentsById.values()].sort(
+    (a, b) => a.date.localeCompare(b.date) || minutesOf(a.time) - minutesOf(b.time)
+  );
+  const appointmentsDiv = document.getElementById("appointmentsList");
+  appointmentsDiv.innerHTML = "";
+
+  if (appointments.length === 0) {
+    appointmentsDiv.innerHTML = "<p>No appointments found.</p>";
+    return;
+  }
+
+  let table = `<table class='table'>
+      <thead>
+        <tr>
+          <th>Patient Name</th>
+          <th>Date</th>
+          <th>Time</th>
+          <th>Status</th>
+          <th>Actions</th>
+        </tr>
+      </thead>
+      <tbody>`;
+
+  appointments.forEach((app) => {
+    table += `<tr>
+      <td>${app.patient_name}</td>
+      <td>${app.date}</td>
+      <td>${app.time}</td>
+      <td id="status-${app.id}">${app.status || "pending"}</td>
+      <td>
+          <button class="btn btn-success btn-sm" onclick="markAsDone(${
+            app.id
+          })" ${app.status === "done" ? "disabled" : ""}>
+            Mark as Done
+          </button>
+          <button class="btn btn-danger btn-sm" onclick="deleteAppointment(${
+            app.id
+          })">
+            Delete
+          </button>
+      </td>
+  </tr>`;
+  });
+
+  table += "</tbody></table>";
+  appointmentsDiv.innerHTML = table;
+}
+
 // Delete an appointment
 function deleteAppointment(appointmentId) {
   if (confirm("Are you sure you want to delete this appointment?")) {
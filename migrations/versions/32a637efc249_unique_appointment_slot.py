@@ -0,0 +1,38 @@
+"""Unique constraint on appointment (doctor_id, date, time_slot)
+
+Revision ID: 32a637efc249
+Revises: 0906aa28d4ae
+Create Date: 2026-10-17 10:12:41.508213
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '32a637efc249'
+down_revision = '0906aa28d4ae'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Drop double bookings left behind by the old check-then-insert path,
+    # keeping the earliest appointment of each slot
+    op.execute(
+        """
+        DELETE FROM appointment
+        WHERE id NOT IN (
+            SELECT min(id) FROM appointment GROUP BY doctor_id, date, time_slot
+        )
+        """
+    )
+
+    with op.batch_alter_table('appointment', schema=None) as batch_op:
+        batch_op.create_unique_constraint(
+            'uq_appointment_doctor_date_time_slot', ['doctor_id', 'date', 'time_slot']
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('appointment', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_appointment_doctor_date_time_slot', type_='unique')
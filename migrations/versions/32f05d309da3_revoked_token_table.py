@@ -0,0 +1,34 @@
+"""Add revoked_token table for JWT revocation
+
+Revision ID: 32f05d309da3
+Revises: bd47746eb2a3
+Create Date: 2026-10-17 13:40:06.118274
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '32f05d309da3'
+down_revision = 'bd47746eb2a3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'revoked_token',
+        sa.Column('jti', sa.String(length=36), nullable=False),
+        sa.Column('expires_at', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('jti'),
+    )
+    with op.batch_alter_table('revoked_token', schema=None) as batch_op:
+        batch_op.create_index('ix_revoked_token_expires_at', ['expires_at'])
+
+
+def downgrade():
+    with op.batch_alter_table('revoked_token', schema=None) as batch_op:
+        batch_op.drop_index('ix_revoked_token_expires_at')
+
+    op.drop_table('revoked_token')
@@ -0,0 +1,55 @@
+"""Cascade deletes from users to profiles, appointments and tombstones
+
+Revision ID: 5e2a9c71d3f0
+Revises: b4ad1fa13114
+Create Date: 2026-10-17 17:21:43.208514
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '5e2a9c71d3f0'
+down_revision = 'b4ad1fa13114'
+branch_labels = None
+depends_on = None
+
+# Postgres' default foreign key names, also given to the unnamed SQLite ones
+NAMING_CONVENTION = {'fk': '%(table_name)s_%(column_0_name)s_fkey'}
+
+
+def _appointment_foreign_keys(ondelete):
+    with op.batch_alter_table('appointment', schema=None, naming_convention=NAMING_CONVENTION) as batch_op:
+        batch_op.drop_constraint('appointment_patient_id_fkey', type_='foreignkey')
+        batch_op.drop_constraint('appointment_doctor_id_fkey', type_='foreignkey')
+        batch_op.create_foreign_key('appointment_patient_id_fkey', 'patient', ['patient_id'], ['id'], ondelete=ondelete)
+        batch_op.create_foreign_key('appointment_doctor_id_fkey', 'doctor', ['doctor_id'], ['id'], ondelete=ondelete)
+
+
+def _profile_foreign_keys(ondelete):
+    # Created unnamed and without ondelete by 0906aa28d4ae
+    for table in ('doctor', 'patient'):
+        with op.batch_alter_table(table, schema=None, naming_convention=NAMING_CONVENTION) as batch_op:
+            batch_op.drop_constraint(f'{table}_id_fkey', type_='foreignkey')
+            batch_op.create_foreign_key(f'{table}_id_fkey', 'user', ['id'], ['id'], ondelete=ondelete)
+
+
+def upgrade():
+    # Deleting the user row now takes the profile, appointments and tombstones
+    # with it. The cascades are served by the unique slot index (doctor_id),
+    # ix_appointment_patient_id_date and ix_appointment_tombstone_doctor_id_version.
+    _profile_foreign_keys('CASCADE')
+    _appointment_foreign_keys('CASCADE')
+
+    # Tombstones of doctors deleted before this revision
+    op.execute('DELETE FROM appointment_tombstone WHERE doctor_id NOT IN (SELECT id FROM doctor)')
+    with op.batch_alter_table('appointment_tombstone', schema=None) as batch_op:
+        batch_op.create_foreign_key('appointment_tombstone_doctor_id_fkey', 'doctor', ['doctor_id'], ['id'], ondelete='CASCADE')
+
+
+def downgrade():
+    with op.batch_alter_table('appointment_tombstone', schema=None) as batch_op:
+        batch_op.drop_constraint('appointment_tombstone_doctor_id_fkey', type_='foreignkey')
+
+    _appointment_foreign_keys(None)
+    _profile_foreign_keys(None)
@@ -0,0 +1,44 @@
+"""Add appointment_stat, per doctor, day and status appointment counts
+
+Revision ID: 8c41f0b6e2d7
+Revises: 5e2a9c71d3f0
+Create Date: 2026-10-17 18:40:09.517230
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8c41f0b6e2d7'
+down_revision = '5e2a9c71d3f0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'appointment_stat',
+        sa.Column('doctor_id', sa.Integer(), nullable=False),
+        sa.Column('date', sa.Date(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['doctor_id'], ['doctor.id'], name='appointment_stat_doctor_id_fkey', ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('doctor_id', 'date', 'status'),
+    )
+    with op.batch_alter_table('appointment_stat', schema=None) as batch_op:
+        batch_op.create_index('ix_appointment_stat_date', ['date', 'doctor_id', 'status', 'count'])
+
+    # Backfill; from here on the application keeps it up to date
+    op.execute(
+        'INSERT INTO appointment_stat (doctor_id, date, status, count) '
+        'SELECT doctor_id, date, status, count(*) FROM appointment '
+        'GROUP BY doctor_id, date, status'
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('appointment_stat', schema=None) as batch_op:
+        batch_op.drop_index('ix_appointment_stat_date')
+
+    op.drop_table('appointment_stat')
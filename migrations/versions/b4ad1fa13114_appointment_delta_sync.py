@@ -0,0 +1,48 @@
+"""Add appointment updated_at/version and appointment_tombstone for delta sync
+
+Revision ID: b4ad1fa13114
+Revises: c7b5ed22443e
+Create Date: 2026-10-17 15:02:17.630482
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b4ad1fa13114'
+down_revision = 'c7b5ed22443e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('appointment', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')))
+        batch_op.add_column(sa.Column('version', sa.BigInteger(), nullable=False, server_default='0'))
+        batch_op.create_index('ix_appointment_doctor_id_version', ['doctor_id', 'version'])
+
+    op.create_table(
+        'appointment_tombstone',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('doctor_id', sa.Integer(), nullable=False),
+        sa.Column('version', sa.BigInteger(), nullable=False),
+        sa.Column('deleted_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    with op.batch_alter_table('appointment_tombstone', schema=None) as batch_op:
+        batch_op.create_index('ix_appointment_tombstone_doctor_id_version', ['doctor_id', 'version'])
+        batch_op.create_index('ix_appointment_tombstone_deleted_at', ['deleted_at'])
+
+
+def downgrade():
+    with op.batch_alter_table('appointment_tombstone', schema=None) as batch_op:
+        batch_op.drop_index('ix_appointment_tombstone_deleted_at')
+        batch_op.drop_index('ix_appointment_tombstone_doctor_id_version')
+
+    op.drop_table('appointment_tombstone')
+
+    with op.batch_alter_table('appointment', schema=None) as batch_op:
+        batch_op.drop_index('ix_appointment_doctor_id_version')
+        batch_op.drop_column('version')
+        batch_op.drop_column('updated_at')
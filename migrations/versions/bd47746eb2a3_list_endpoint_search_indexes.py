@@ -0,0 +1,54 @@
+"""Indexes for paginated, searchable admin lists
+
+Revision ID: bd47746eb2a3
+Revises: d9a75c4d7ed3
+Create Date: 2026-10-17 12:24:51.730442
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'bd47746eb2a3'
+down_revision = 'd9a75c4d7ed3'
+branch_labels = None
+depends_on = None
+
+# Case-insensitive prefix search: lower(col) LIKE 'abc%'
+SEARCH_INDEXES = [
+    (table, column, f'ix_{table}_lower_{column}')
+    for table in ('user', 'doctor', 'patient')
+    for column in ('name', 'email')
+]
+
+
+def _is_postgres():
+    # varchar_pattern_ops is Postgres-only; SQLite scans for the prefix search
+    return op.get_bind().dialect.name == 'postgresql'
+
+
+def upgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.create_index('ix_user_role_id', ['role', 'id'])
+
+    with op.batch_alter_table('doctor', schema=None) as batch_op:
+        batch_op.create_index('ix_doctor_specialty', ['specialty'])
+
+    if _is_postgres():
+        for table, column, name in SEARCH_INDEXES:
+            op.create_index(
+                name, table, [sa.text(f'lower({column}) varchar_pattern_ops')]
+            )
+
+
+def downgrade():
+    if _is_postgres():
+        for table, _, name in SEARCH_INDEXES:
+            op.drop_index(name, table_name=table)
+
+    with op.batch_alter_table('doctor', schema=None) as batch_op:
+        batch_op.drop_index('ix_doctor_specialty')
+
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.drop_index('ix_user_role_id')
@@ -0,0 +1,30 @@
+"""Add change_version table for conditional GETs
+
+Revision ID: c7b5ed22443e
+Revises: 32f05d309da3
+Create Date: 2026-10-17 14:25:41.502913
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7b5ed22443e'
+down_revision = '32f05d309da3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'change_version',
+        sa.Column('scope', sa.String(length=64), nullable=False),
+        sa.Column('version', sa.BigInteger(), nullable=False),
+        sa.Column('changed_at', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('scope'),
+    )
+
+
+def downgrade():
+    op.drop_table('change_version')
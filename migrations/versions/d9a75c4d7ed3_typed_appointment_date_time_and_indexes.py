@@ -0,0 +1,101 @@
+"""Typed DATE/TIME appointment columns and access-path indexes
+
+Revision ID: d9a75c4d7ed3
+Revises: 32a637efc249
+Create Date: 2026-10-17 11:02:17.639120
+
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd9a75c4d7ed3'
+down_revision = '32a637efc249'
+branch_labels = None
+depends_on = None
+
+SLOT_LABEL = '%I:%M%p'  # '09:00AM'
+# How SQLAlchemy stores DATE and TIME values as text, e.g. on SQLite
+TEXT_DATE, TEXT_TIME = '%Y-%m-%d', '%H:%M:%S.%f'
+
+
+def _rewrite_rows(date_format, time_format, from_date_format, from_time_format):
+    conn = op.get_bind()
+    rows = conn.execute(sa.text('SELECT id, date, time_slot FROM appointment')).all()
+    if rows:
+        conn.execute(
+            sa.text('UPDATE appointment SET date = :date, time_slot = :time_slot WHERE id = :id'),
+            [
+                {
+                    'id': id,
+                    'date': datetime.strptime(date.strip(), from_date_format).strftime(date_format),
+                    'time_slot': datetime.strptime(time_slot.strip(), from_time_format).strftime(time_format),
+                }
+                for id, date, time_slot in rows
+            ],
+        )
+
+
+def upgrade():
+    # Backfill in place: dates are stored as 'YYYY-MM-DD', slots as '09:00AM'.
+    # Postgres converts them with the USING casts. Elsewhere batch mode copies
+    # the rows with CAST(... AS DATE), which SQLite turns into numbers
+    # ('2025-02-10' -> 2025): rewrite the text to what SQLAlchemy reads for
+    # DATE/TIME instead, and reflect the columns with their new types so the
+    # copy leaves them as they are.
+    reflect_args = []
+    if op.get_bind().dialect.name != 'postgresql':
+        _rewrite_rows(TEXT_DATE, TEXT_TIME, TEXT_DATE, SLOT_LABEL)
+        reflect_args = [
+            sa.Column('date', sa.Date(), nullable=False),
+            sa.Column('time_slot', sa.Time(), nullable=False),
+        ]
+
+    with op.batch_alter_table('appointment', schema=None, reflect_args=reflect_args) as batch_op:
+        batch_op.alter_column(
+            'date',
+            existing_type=sa.String(length=20),
+            type_=sa.Date(),
+            existing_nullable=False,
+            postgresql_using='date::date',
+        )
+        batch_op.alter_column(
+            'time_slot',
+            existing_type=sa.String(length=20),
+            type_=sa.Time(),
+            existing_nullable=False,
+            postgresql_using="to_timestamp(time_slot, 'HH12:MIAM')::time",
+        )
+        # doctor_id and (doctor_id, date) are served by the unique slot index
+        batch_op.create_index('ix_appointment_patient_id_date', ['patient_id', 'date'])
+
+    with op.batch_alter_table('doctor', schema=None) as batch_op:
+        batch_op.create_index('ix_doctor_name', ['name'])
+
+
+def downgrade():
+    with op.batch_alter_table('doctor', schema=None) as batch_op:
+        batch_op.drop_index('ix_doctor_name')
+
+    with op.batch_alter_table('appointment', schema=None) as batch_op:
+        batch_op.drop_index('ix_appointment_patient_id_date')
+        batch_op.alter_column(
+            'time_slot',
+            existing_type=sa.Time(),
+            type_=sa.String(length=20),
+            existing_nullable=False,
+            postgresql_using="to_char(time_slot, 'HH12:MIAM')",
+        )
+        batch_op.alter_column(
+            'date',
+            existing_type=sa.Date(),
+            type_=sa.String(length=20),
+            existing_nullable=False,
+            postgresql_using="to_char(date, 'YYYY-MM-DD')",
+        )
+
+    if op.get_bind().dialect.name != 'postgresql':
+        _rewrite_rows(TEXT_DATE, SLOT_LABEL, TEXT_DATE, TEXT_TIME)
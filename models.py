@@ -1,8 +1,31 @@
 from flask_sqlalchemy import SQLAlchemy
-from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy import event, func
+from sqlalchemy.engine import Engine
+from passwords import password_hasher
 
 db = SQLAlchemy()
 
+
+@event.listens_for(Engine, "connect")
+def enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    """SQLite only enforces foreign keys, and their ON DELETE CASCADE, when asked to."""
+    if "sqlite" in type(dbapi_connection).__module__:
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+
+def insert_ignore(model):
+    """INSERT statement supporting ``on_conflict_do_nothing`` on the bound dialect."""
+    # Imported on use: the Postgres dialects alone take longer to import than
+    # the rest of this module, and an SQLite app never needs them
+    if db.session.get_bind().dialect.name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        from sqlalchemy.dialects.postgresql import insert
+    return insert(model)
+
+
 class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(80), nullable=False)
@@ -10,11 +33,16 @@ class User(db.Model):
     password_hash = db.Column(db.String(256), nullable=False)
     role = db.Column(db.String(20), nullable=False)  # Admin, Doctor, Patient
 
+    # Keyset pages of one role (/admin/admins). Prefix search on lower(name)
+    # and lower(email) is served by varchar_pattern_ops indexes created in
+    # the migrations, as they are Postgres-only.
+    __table_args__ = (db.Index("ix_user_role_id", "role", "id"),)
+
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = password_hasher.hash(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return password_hasher.verify(self.password_hash, password)
 
     def to_dict(self):
         return {"id": self.id, "name": self.name, "email": self.email, "role": self.role}
@@ -23,9 +51,9 @@ class User(db.Model):
 class Doctor(db.Model):
     id = db.Column(db.Integer, db.ForeignKey("user.id", ondelete="CASCADE"), primary_key=True)
   # Foreign key from User
-    name = db.Column(db.String(80), nullable=False)
+    name = db.Column(db.String(80), nullable=False, index=True)
     email = db.Column(db.String(120), unique=True, nullable=False)
-    specialty = db.Column(db.String(100), nullable=False)
+    specialty = db.Column(db.String(100), nullable=False, index=True)
     available_slots = db.Column(db.String(100), nullable=False) #, default="9:00AM-5:00PM"
     appointments = db.relationship("Appointment", backref="doctor", lazy=True)
 
@@ -39,8 +67,62 @@ class Patient(db.Model):
 # Appointment Model
 class Appointment(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    patient_id = db.Column(db.Integer, db.ForeignKey("patient.id"), nullable=False)
-    doctor_id = db.Column(db.Integer, db.ForeignKey("doctor.id"), nullable=False)
-    date = db.Column(db.String(20), nullable=False)
-    time_slot = db.Column(db.String(20), nullable=False)
+    # Deleting a doctor or patient (or their user row) deletes their appointments
+    patient_id = db.Column(db.Integer, db.ForeignKey("patient.id", ondelete="CASCADE"), nullable=False)
+    doctor_id = db.Column(db.Integer, db.ForeignKey("doctor.id", ondelete="CASCADE"), nullable=False)
+    date = db.Column(db.Date, nullable=False)
+    time_slot = db.Column(db.Time, nullable=False)
     status = db.Column(db.String(20), nullable=False, default="pending")  # Add this
+    updated_at = db.Column(
+        db.DateTime, nullable=False, default=func.now(), onupdate=func.now(), server_default=func.now()
+    )
+    # Doctor's change counter at the last write, the delta sync cursor (see sync.py)
+    version = db.Column(db.BigInteger, nullable=False, default=0, server_default="0")
+
+    # A slot can only be booked once, enforced by the database. The unique
+    # index also serves doctor_id and (doctor_id, date) lookups.
+    __table_args__ = (
+        db.UniqueConstraint(
+            "doctor_id", "date", "time_slot", name="uq_appointment_doctor_date_time_slot"
+        ),
+        db.Index("ix_appointment_patient_id_date", "patient_id", "date"),
+        db.Index("ix_appointment_doctor_id_version", "doctor_id", "version"),
+    )
+
+
+# Deleted appointment, kept for a while so delta syncs can report the deletion
+class AppointmentTombstone(db.Model):
+    id = db.Column(db.Integer, primary_key=True)  # ID of the deleted appointment
+    doctor_id = db.Column(db.Integer, db.ForeignKey("doctor.id", ondelete="CASCADE"), nullable=False)
+    version = db.Column(db.BigInteger, nullable=False)
+    deleted_at = db.Column(db.DateTime, nullable=False, default=func.now(), index=True)
+
+    __table_args__ = (
+        db.Index("ix_appointment_tombstone_doctor_id_version", "doctor_id", "version"),
+    )
+
+
+# Revoked (logged-out) JWTs, kept until the token would have expired
+class RevokedToken(db.Model):
+    jti = db.Column(db.String(36), primary_key=True)
+    expires_at = db.Column(db.BigInteger, nullable=False, index=True)  # UNIX time
+
+
+# Change counter of a cached resource, see versions.py
+class ChangeVersion(db.Model):
+    scope = db.Column(db.String(64), primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False, default=0)
+    changed_at = db.Column(db.BigInteger, nullable=False)  # UNIX time
+
+
+# Appointments of a doctor on a day by status, maintained by analytics.py
+class AppointmentStat(db.Model):
+    doctor_id = db.Column(db.Integer, db.ForeignKey("doctor.id", ondelete="CASCADE"), primary_key=True)
+    date = db.Column(db.Date, primary_key=True)
+    status = db.Column(db.String(20), primary_key=True)
+    count = db.Column(db.Integer, nullable=False)
+
+    # Date ranges over all doctors, covering the summed columns
+    __table_args__ = (
+        db.Index("ix_appointment_stat_date", "date", "doctor_id", "status", "count"),
+    )
@@ -0,0 +1,130 @@
+"""
+Keyset pagination and field projection for the list endpoints.
+
+Lists are ordered by ``id`` and paged with ``WHERE id > :after LIMIT :limit``,
+so every page costs the same no matter how deep the client is. Only the
+requested columns are selected and rows are encoded to JSON by their schema
+(see ``schemas.py``), without loading ORM objects or building dicts.
+
+Query parameters understood by ``keyset_page`` (and ``keyset_query``, which
+the async endpoints of ``asgi.py`` execute themselves):
+    limit (int): Page size, 1 to MAX_PAGE_SIZE (default DEFAULT_PAGE_SIZE)
+    after (int): ID of the last row of the previous page
+    fields (str): Comma-separated subset of the endpoint's allowed fields
+    name, email (str): Case-insensitive prefix filters
+    specialty (str): Exact specialty filter (doctors only)
+"""
+
+from flask import request
+from sqlalchemy import func
+
+from models import db
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+def _escape_like(value):
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def search_criteria(model, args):
+    """Filters built from the name/email/specialty query parameters."""
+    criteria = []
+    for field in ("name", "email"):
+        value = args.get(field)
+        if value:
+            # Served by the lower(<field>) varchar_pattern_ops indexes
+            criteria.append(
+                func.lower(getattr(model, field)).like(
+                    _escape_like(value.lower()) + "%", escape="\\"
+                )
+            )
+
+    specialty = args.get("specialty")
+    if specialty and hasattr(model, "specialty"):
+        criteria.append(model.specialty == specialty)
+
+    return criteria
+
+
+def page_params(allowed_fields, args):
+    """
+    Validated limit, after and fields parameters.
+
+    Returns:
+        tuple: (page size, ``after`` ID or None, fields to select)
+
+    Raises:
+        ValueError: If limit, after or fields are invalid.
+    """
+    limit = int(args.get("limit", DEFAULT_PAGE_SIZE))
+    after = args.get("after")
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+
+    fields = allowed_fields
+    if args.get("fields"):
+        fields = tuple(args["fields"].split(","))
+        unknown = set(fields) - set(allowed_fields)
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+        if "id" not in fields:
+            fields = ("id",) + fields  # Needed for the cursor
+
+    return limit, None if after is None else int(after), fields
+
+
+def keyset_query(schema, allowed_fields, args, *criteria):
+    """
+    Builds the query of one page of ``schema.model`` rows.
+
+    Args:
+        schema (Schema): Row layout; its model needs an integer ``id`` key.
+        allowed_fields (tuple): Fields that may be selected; all by default.
+        args: Query parameters (a ``MultiDict``).
+        *criteria: Extra WHERE clauses.
+
+    Returns:
+        tuple: (SELECT statement, page size, schema of the selected fields)
+
+    Raises:
+        ValueError: If limit, after or fields are invalid.
+    """
+    limit, after, fields = page_params(allowed_fields, args)
+    schema, model = schema.only(fields), schema.model
+    stmt = (
+        schema.select()
+        .where(*criteria, *search_criteria(model, args))
+        .order_by(model.id)
+        .limit(limit + 1)
+    )
+    if after is not None:
+        stmt = stmt.where(model.id > after)
+    return stmt, limit, schema
+
+
+def keyset_result(result, limit, schema):
+    """
+    Returns:
+        tuple: (page as a ``RawJSON`` array, ID to pass as ``after`` for the
+        next page or None)
+    """
+    rows = result.all()
+    next_after = rows[limit - 1].id if len(rows) > limit else None
+    return schema.encode(rows[:limit]), next_after
+
+
+def keyset_page(schema, allowed_fields, *criteria):
+    """
+    Returns one page of rows from the request's parameters.
+
+    Returns:
+        tuple: (page as a ``RawJSON`` array, ID to pass as ``after`` for the
+        next page or None)
+
+    Raises:
+        ValueError: If limit, after or fields are invalid.
+    """
+    stmt, limit, schema = keyset_query(schema, allowed_fields, request.args, *criteria)
+    return keyset_result(db.session.execute(stmt), limit, schema)
@@ -0,0 +1,163 @@
+"""
+Pluggable password hashing.
+
+Hashing runs on a small, bounded process pool so that a burst of logins
+neither holds the GIL nor pins every web worker. The scheme and its cost are
+configurable; stored hashes that use another scheme or cost are upgraded
+transparently at the next successful login (see ``needs_rehash``).
+
+Schemes and the meaning of ``PASSWORD_HASH_COST``:
+    scrypt  - log2 of the CPU/memory cost N (default 15, i.e. N=32768)
+    pbkdf2  - number of SHA-256 iterations (default 600000)
+    bcrypt  - log2 rounds (default 12)
+    argon2  - time cost (default 3), requires the ``argon2-cffi`` package
+"""
+
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import bcrypt
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from extensions import AppLocal
+
+try:
+    import argon2
+except ImportError:  # Optional dependency
+    argon2 = None
+
+DEFAULT_COSTS = {"scrypt": 15, "pbkdf2": 600_000, "bcrypt": 12, "argon2": 3}
+
+
+def _scheme_of(stored_hash):
+    if stored_hash.startswith(("$2a$", "$2b$", "$2y$")):
+        return "bcrypt"
+    if stored_hash.startswith("$argon2"):
+        return "argon2"
+    return stored_hash.split(":", 1)[0]  # werkzeug: 'scrypt:...', 'pbkdf2:...'
+
+
+def _argon2_hasher(time_cost):
+    if argon2 is None:
+        raise RuntimeError("The argon2 scheme requires the argon2-cffi package")
+    return argon2.PasswordHasher(time_cost=time_cost)
+
+
+# Top-level functions so they can be pickled into the process pool
+def _hash(scheme, cost, password):
+    if scheme == "scrypt":
+        return generate_password_hash(password, method=f"scrypt:{2 ** cost}:8:1")
+    if scheme == "pbkdf2":
+        return generate_password_hash(password, method=f"pbkdf2:sha256:{cost}")
+    if scheme == "bcrypt":
+        return bcrypt.hashpw(password.encode(), bcrypt.gensalt(cost)).decode()
+    if scheme == "argon2":
+        return _argon2_hasher(cost).hash(password)
+    raise ValueError(f"Unknown password hash scheme: {scheme}")
+
+
+def _verify(stored_hash, password):
+    scheme = _scheme_of(stored_hash)
+    if scheme == "bcrypt":
+        return bcrypt.checkpw(password.encode(), stored_hash.encode())
+    if scheme == "argon2":
+        try:
+            return _argon2_hasher(DEFAULT_COSTS["argon2"]).verify(stored_hash, password)
+        except argon2.exceptions.VerificationError:
+            return False
+    return check_password_hash(stored_hash, password)
+
+
+class PasswordHasher:
+    """Hashes and verifies passwords on a bounded process pool."""
+
+    def __init__(self, scheme="scrypt", cost=None, workers=0):
+        self.configure(scheme, cost, workers)
+        self._pool = None
+        self._pool_pid = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.configure(
+            app.config.get("PASSWORD_HASH_SCHEME", "scrypt"),
+            app.config.get("PASSWORD_HASH_COST"),
+            app.config.get("PASSWORD_HASH_WORKERS", 0),
+        )
+
+    def configure(self, scheme, cost=None, workers=0):
+        """
+        Args:
+            scheme (str): One of 'scrypt', 'pbkdf2', 'bcrypt', 'argon2'.
+            cost (int): Scheme-specific cost, see module docstring.
+            workers (int): Process pool size; 0 hashes inline in the caller.
+        """
+        if scheme not in DEFAULT_COSTS:
+            raise ValueError(f"Unknown password hash scheme: {scheme}")
+        self.scheme = scheme
+        self.cost = int(cost) if cost is not None else DEFAULT_COSTS[scheme]
+        self.workers = int(workers)
+        # At most a few queued hashes per worker; further callers wait
+        self._slots = threading.BoundedSemaphore(max(self.workers, 1) * 4)
+        self.shutdown()
+
+    def _run(self, fn, *args):
+        if not self.workers:
+            return fn(*args)
+
+        with self._slots:
+            return self._executor().submit(fn, *args).result()
+
+    def _executor(self):
+        # Pools don't survive fork, so each (gunicorn) worker creates its own
+        with self._lock:
+            if self._pool is None or self._pool_pid != os.getpid():
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+                self._pool_pid = os.getpid()
+            return self._pool
+
+    def shutdown(self):
+        pool = getattr(self, "_pool", None)
+        if pool is not None and self._pool_pid == os.getpid():
+            pool.shutdown(wait=False, cancel_futures=True)
+        self._pool = None
+
+    def hash(self, password):
+        return self._run(_hash, self.scheme, self.cost, password)
+
+    def hash_many(self, passwords):
+        """Hashes a batch of passwords, spread over the whole pool."""
+        if not self.workers:
+            return [_hash(self.scheme, self.cost, password) for password in passwords]
+
+        return list(
+            self._executor().map(
+                partial(_hash, self.scheme, self.cost), passwords, chunksize=16
+            )
+        )
+
+    def verify(self, stored_hash, password):
+        return self._run(_verify, stored_hash, password)
+
+    def needs_rehash(self, stored_hash):
+        """Whether ``stored_hash`` was made with another scheme or cost."""
+        scheme = _scheme_of(stored_hash)
+        if scheme != self.scheme:
+            return True
+
+        if scheme == "scrypt":
+            # scrypt:<N>:<r>:<p>$salt$hash
+            return stored_hash.split("$", 1)[0] != f"scrypt:{2 ** self.cost}:8:1"
+        if scheme == "pbkdf2":
+            # pbkdf2:sha256:<iterations>$salt$hash
+            return stored_hash.split("$", 1)[0] != f"pbkdf2:sha256:{self.cost}"
+        if scheme == "bcrypt":
+            # $2b$<rounds>$...
+            return int(stored_hash.split("$")[2]) != self.cost
+        if scheme == "argon2":
+            return _argon2_hasher(self.cost).check_needs_rehash(stored_hash)
+        return True
+
+
+password_hasher = AppLocal("password_hasher", PasswordHasher)
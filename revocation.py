@@ -0,0 +1,217 @@
+"""
+Shared, expiring JWT revocation store.
+
+Logged-out tokens are recorded by ``jti`` until they would have expired anyway.
+Deleted accounts are recorded as ``user:<id>`` for as long as tokens issued
+before the deletion can live (``JWT_ACCESS_TOKEN_EXPIRES``), so their tokens
+are rejected by every worker even though role checks trust the token's
+claims. The store behind it is pluggable:
+
+    memory    - process-local dict + expiry heap, for tests and single workers
+    database  - ``revoked_token`` table shared by every worker (default)
+    redis     - any Redis-compatible server (``REVOCATION_REDIS_URL``), with
+                native key expiry; a stand-in client can be injected
+
+Each worker keeps a front cache in front of the store. Revoked JTIs are
+remembered until the token expires. "Not revoked" answers are reused for
+``REVOCATION_CACHE_TTL`` seconds, which bounds how long a token revoked by
+another worker can still be used. Tokens revoked by the same worker are
+rejected immediately.
+"""
+
+import heapq
+import threading
+import time
+from datetime import timedelta
+
+from sqlalchemy import delete, select
+
+from cache import MISSING, TTLCache
+from extensions import AppLocal
+from models import db, insert_ignore, RevokedToken
+
+try:
+    import redis
+except ImportError:  # Optional dependency, only needed for the redis backend
+    redis = None
+
+PURGE_EVERY = 100  # Revocations between two purges of expired rows
+
+
+class MemoryRevocationStore:
+    """O(1) dict lookups, expired entries evicted through a min-heap."""
+
+    def __init__(self, app=None):
+        self._expiry = {}
+        self._heap = []
+        self._lock = threading.Lock()
+
+    def _evict(self, now):
+        while self._heap and self._heap[0][0] <= now:
+            expires_at, jti = heapq.heappop(self._heap)
+            if self._expiry.get(jti) == expires_at:
+                del self._expiry[jti]
+
+    def revoke(self, keys, expires_at):
+        with self._lock:
+            self._evict(time.time())
+            for key in keys:
+                self._expiry[key] = expires_at
+                heapq.heappush(self._heap, (expires_at, key))
+
+    def revoked_until(self, key):
+        expires_at = self._expiry.get(key)
+        return (
+            expires_at if expires_at is not None and expires_at > time.time() else None
+        )
+
+
+class DatabaseRevocationStore:
+    """Primary-key lookups in the ``revoked_token`` table."""
+
+    def __init__(self, app=None):
+        self._revocations = 0
+
+    def revoke(self, keys, expires_at):
+        stmt = insert_ignore(RevokedToken).values(
+            [{"jti": key, "expires_at": int(expires_at)} for key in keys]
+        )
+        # A user deleted again (SQLite reuses IDs) moves the deletion time
+        db.session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=["jti"], set_={"expires_at": stmt.excluded.expires_at}
+            )
+        )
+        self._revocations += 1
+        if self._revocations % PURGE_EVERY == 0:
+            db.session.execute(
+                delete(RevokedToken).where(RevokedToken.expires_at <= time.time())
+            )
+        db.session.commit()
+
+    def revoked_until(self, key):
+        return db.session.execute(
+            select(RevokedToken.expires_at).where(
+                RevokedToken.jti == key, RevokedToken.expires_at > time.time()
+            )
+        ).scalar()
+
+
+class RedisRevocationStore:
+    """One key per JTI, expired by the server."""
+
+    def __init__(self, app=None, client=None):
+        if client is None:
+            if redis is None:
+                raise RuntimeError("The redis revocation backend requires 'redis'")
+            client = redis.Redis.from_url(app.config["REVOCATION_REDIS_URL"])
+        self.client = client
+
+    def revoke(self, keys, expires_at):
+        ttl = int(expires_at - time.time())
+        if ttl > 0:
+            pipeline = self.client.pipeline()
+            for key in keys:
+                pipeline.set(f"revoked:{key}", int(expires_at), ex=ttl)
+            pipeline.execute()
+
+    def revoked_until(self, key):
+        expires_at = self.client.get(f"revoked:{key}")
+        return int(expires_at) if expires_at is not None else None
+
+
+BACKENDS = {
+    "memory": MemoryRevocationStore,
+    "database": DatabaseRevocationStore,
+    "redis": RedisRevocationStore,
+}
+
+
+class TokenRevocation:
+    """Revocation store plus the per-worker front cache."""
+
+    def __init__(self, store=None):
+        self.store = store or MemoryRevocationStore()
+        self.cache = TTLCache(maxsize=65536, ttl=5)
+        self.token_lifetime = 3600
+        self.identity_claim = "sub"
+
+    def init_app(self, app, store=None):
+        """
+        Selects the backend from ``REVOCATION_BACKEND`` unless ``store`` is
+        given, and registers the blocklist check with the app's JWTManager.
+        """
+        if store is None:
+            store = BACKENDS[app.config.get("REVOCATION_BACKEND", "database")](app)
+        self.store = store
+        self.cache.ttl = app.config.get("REVOCATION_CACHE_TTL", self.cache.ttl)
+        self.cache.clear()
+
+        lifetime = app.config["JWT_ACCESS_TOKEN_EXPIRES"]
+        if isinstance(lifetime, timedelta):
+            lifetime = lifetime.total_seconds()
+        if not lifetime:
+            raise ValueError("Revoking deleted users requires expiring tokens")
+        self.token_lifetime = lifetime
+        self.identity_claim = app.config["JWT_IDENTITY_CLAIM"]
+
+        # The JWTManager is shared by every app: check with the current one's
+        jwt = app.extensions["flask-jwt-extended"]
+        jwt.token_in_blocklist_loader(
+            lambda jwt_header, jwt_payload: token_revocation.is_token_revoked(
+                jwt_payload
+            )
+        )
+
+    def revoke(self, jti, expires_at):
+        """Revokes a token until ``expires_at`` (a UNIX timestamp)."""
+        self.store.revoke([jti], expires_at)
+        self.cache.put(jti, expires_at, ttl=max(expires_at - time.time(), 0))
+
+    def revoke_users(self, user_ids):
+        """Revokes every token issued so far to ``user_ids``, e.g. deleted accounts."""
+        keys = [f"user:{user_id}" for user_id in user_ids]
+        if not keys:
+            return
+        expires_at = time.time() + self.token_lifetime
+        self.store.revoke(keys, expires_at)
+        for key in keys:
+            self.cache.put(key, expires_at, ttl=self.token_lifetime)
+
+    def _revoked_until(self, key, cached_only):
+        expires_at = self.cache.get(key)
+        if expires_at is MISSING and not cached_only:
+            expires_at = self.store.revoked_until(key)
+            if expires_at is not None:
+                self.cache.put(key, expires_at, ttl=max(expires_at - time.time(), 0))
+            else:
+                self.cache.put(key, None)
+        return expires_at
+
+    def is_token_revoked(self, claims, cached_only=False):
+        """
+        Whether a decoded token was logged out or its user deleted since.
+
+        Args:
+            claims (dict): The token's payload.
+            cached_only (bool): Answer from the front cache only.
+
+        Returns:
+            bool, or ``MISSING`` when ``cached_only`` and the store is needed.
+        """
+        logged_out = self._revoked_until(claims["jti"], cached_only)
+        if logged_out is not None:
+            return logged_out if logged_out is MISSING else True
+
+        deleted = self._revoked_until(
+            f"user:{claims[self.identity_claim]}", cached_only
+        )
+        if deleted is MISSING:
+            return MISSING
+        if deleted is None:
+            return False
+        # Tokens issued after the deletion belong to a new account reusing the ID
+        return claims.get("iat", 0) <= deleted - self.token_lifetime
+
+
+token_revocation = AppLocal("token_revocation", TokenRevocation)
@@ -0,0 +1,7 @@
+"""
+HTTP API of the app, one blueprint per area, registered by ``create_app``.
+"""
+
+from routes import admin, appointments, auth, doctor
+
+BLUEPRINTS = (auth.bp, appointments.bp, doctor.bp, admin.bp)
@@ -0,0 +1,426 @@
+"""
+Admin dashboard routes: user lists, imports, deletion and purge, exports,
+analytics and bulk appointment updates.
+"""
+
+from datetime import date as date_cls, timedelta
+
+from flask import Blueprint, Response, jsonify, request, stream_with_context
+
+from accounts import (
+    PURGE_ROLES,
+    delete_accounts,
+    import_accounts,
+    parse_import,
+    parse_purge_request,
+    purge_batches,
+)
+from analytics import GROUPS as ANALYTICS_GROUPS, MAX_ANALYTICS_DAYS
+from analytics import check as check_analytics_rollup, summary as analytics_summary
+from auth import current_identity, identity_cache, role_required
+from directory import FIELDS as DIRECTORY_FIELDS, doctor_directory, snapshot_versions
+from exports import EXPORTS, FORMATS, stream_export
+from models import db, User
+from pagination import keyset_page
+from revocation import token_revocation
+from routes.doctor import bulk_appointments_response, event_stream
+from schemas import PATIENT, USER
+from serialization import json_response
+from slots import slot_engine
+from versions import conditional
+
+bp = Blueprint("admin", __name__)
+
+
+# ------------------------- ADMIN DASHBOARD -------------------------
+
+
+@bp.route("/admin/appointments/done", methods=["PUT"])
+@role_required("Admin")
+def admin_bulk_mark_appointments_done():
+    """Mark any appointments as 'done'. Same payload and results as the doctor route."""
+    return bulk_appointments_response("done")
+
+
+@bp.route("/admin/appointments", methods=["DELETE"])
+@role_required("Admin")
+def admin_bulk_delete_appointments():
+    """Delete any appointments. Same payload and results as the doctor route."""
+    return bulk_appointments_response("delete")
+
+
+@bp.route("/admin/appointments/events", methods=["GET"])
+@role_required("Admin")
+def admin_appointment_events():
+    """Server-Sent Events for appointment changes of every doctor."""
+    return event_stream(["admin"])
+
+
+@bp.route("/admin/doctors", methods=["GET"])
+@role_required("Admin")
+@conditional("doctors", source=snapshot_versions)
+def list_doctors():
+    """
+    Fetch a page of doctors from the in-process directory.
+
+    Supports the keyset pagination and search parameters of ``pagination``.
+
+    Returns:
+        JSON: List of doctors and the ``next_after`` cursor.
+    """
+    try:
+        body = doctor_directory.snapshot().page(DIRECTORY_FIELDS, request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return Response(body, mimetype="application/json")
+
+
+@bp.route("/admin/patients", methods=["GET"])
+@role_required("Admin")
+@conditional("patients")
+def list_patients():
+    """
+    Fetch a page of patients.
+
+    Supports the keyset pagination and search parameters of ``pagination``.
+
+    Returns:
+        JSON: List of patients and the ``next_after`` cursor.
+    """
+    try:
+        patient_list, next_after = keyset_page(PATIENT, ("id", "name", "email"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return json_response({"patients": patient_list, "next_after": next_after})
+
+
+@bp.route("/admin/admins", methods=["GET"])
+@role_required("Admin")
+@conditional("admins")
+def list_admins():
+    """
+    Fetch a page of admins.
+
+    Supports the keyset pagination and search parameters of ``pagination``.
+
+    Returns:
+        JSON: List of admins and the ``next_after`` cursor.
+    """
+    try:
+        admin_list, next_after = keyset_page(
+            USER, ("id", "name", "email"), User.role == "Admin"
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return json_response({"admins": admin_list, "next_after": next_after})
+
+
+@bp.route("/admin/users/import", methods=["POST"])
+@role_required("Admin")
+def import_users():
+    """
+    Onboard many staff members and patients at once.
+
+    Accepts a JSON body {"users": [{name, email, password, role, ...}]} or a
+    CSV body (Content-Type: text/csv) with the same columns, at most 100 rows
+    per request. Rows are written with batched multi-row INSERTs in a single
+    transaction.
+
+    Returns:
+        201 - Accounts created, with skipped emails and per-row errors
+        200 - Nothing created
+        400 - Unreadable body
+        500 - Database error
+    """
+    try:
+        rows = parse_import(request.get_data(), request.content_type or "")
+        result = import_accounts(rows)
+        db.session.commit()
+    except (TypeError, ValueError, KeyError) as e:
+        db.session.rollback()
+        return jsonify({"error": f"Invalid import: {str(e)}"}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": f"Database error: {str(e)}"}), 500
+
+    return jsonify(result), 201 if result["created"] else 200
+
+
+@bp.route("/admin/analytics", methods=["GET"])
+@role_required("Admin")
+def appointment_analytics():
+    """
+    Booking counts and utilization per specialty or doctor, from the rollup.
+
+    Query parameters:
+        start (str): First date in YYYY-MM-DD format (default: today)
+        end (str): Last date in YYYY-MM-DD format (default: 6 days after start)
+        group (str): 'specialty' (default) or 'doctor'
+        specialty (str): Restrict to doctors of this specialty
+
+    Returns:
+        200 - {"start", "end", "group", "rows": [{"specialty", "capacity",
+              "booked", "utilization", "statuses": {status: count}, ...}]}
+        400 - Invalid parameters
+    """
+    try:
+        start = date_cls.fromisoformat(
+            request.args.get("start") or date_cls.today().isoformat()
+        )
+        end = (
+            date_cls.fromisoformat(request.args["end"])
+            if "end" in request.args
+            else start + timedelta(days=6)
+        )
+    except ValueError:
+        return jsonify({"error": "Invalid date"}), 400
+
+    group = request.args.get("group", "specialty")
+    if group not in ANALYTICS_GROUPS:
+        return jsonify({"error": "group must be 'specialty' or 'doctor'"}), 400
+    if not 1 <= (end - start).days + 1 <= MAX_ANALYTICS_DAYS:
+        return (
+            jsonify({"error": f"Date range must span 1 to {MAX_ANALYTICS_DAYS} days"}),
+            400,
+        )
+
+    rows = analytics_summary(start, end, group, request.args.get("specialty"))
+    return jsonify(
+        {
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "group": group,
+            "rows": rows,
+        }
+    )
+
+
+@bp.route("/admin/analytics/check", methods=["GET", "POST"])
+@role_required("Admin")
+def check_analytics():
+    """
+    Compare the analytics rollup with a full recount of the appointments.
+
+    GET only reports the differences; POST also repairs them.
+
+    Returns:
+        200 - {"consistent": bool, "mismatches": [{"doctor_id", "date",
+              "status", "expected", "actual"}], "repaired": bool}
+        500 - Database error
+    """
+    repair = request.method == "POST"
+    try:
+        mismatches = check_analytics_rollup(repair=repair)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": f"Database error: {str(e)}"}), 500
+
+    return jsonify(
+        {
+            "consistent": not mismatches,
+            "mismatches": mismatches,
+            "repaired": repair and bool(mismatches),
+        }
+    )
+
+
+@bp.route("/admin/export/<entity>", methods=["GET"])
+@role_required("Admin")
+def export_data(entity):
+    """
+    Stream a full export of appointments, doctors or patients.
+
+    Args:
+        entity (str): 'appointments', 'doctors' or 'patients'
+
+    Query parameters:
+        format (str): 'ndjson' (default) or 'csv'
+        start, end (str): Appointment date range in YYYY-MM-DD format
+        status (str): Appointment status, e.g. 'pending' or 'done'
+
+    Returns:
+        200 - Streamed export
+        400 - Invalid format or filters
+        404 - Unknown entity
+    """
+    if entity not in EXPORTS:
+        return jsonify({"error": "Unknown export"}), 404
+
+    fmt = request.args.get("format", "ndjson")
+    if fmt not in FORMATS:
+        return jsonify({"error": "Format must be 'ndjson' or 'csv'"}), 400
+
+    try:
+        filters = {
+            key: date_cls.fromisoformat(request.args[key])
+            for key in ("start", "end")
+            if key in request.args
+        }
+        filters["status"] = request.args.get("status")
+    except ValueError:
+        return jsonify({"error": "Invalid date"}), 400
+
+    return Response(
+        stream_with_context(stream_export(entity, fmt, filters)),
+        mimetype=FORMATS[fmt],
+        headers={"Content-Disposition": f"attachment; filename={entity}.{fmt}"},
+    )
+
+
+def forget_accounts(deleted):
+    """
+    Revokes the tokens of users deleted by a committed transaction, in the
+    store shared by every worker, and drops this worker's caches of them.
+    """
+    token_revocation.revoke_users(deleted)
+    for user_id, role in deleted.items():
+        identity_cache.invalidate(user_id)
+        if role == "Doctor":
+            slot_engine.invalidate(user_id)
+
+
+@bp.route("/admin/doctors/<int:doctor_id>", methods=["DELETE"])
+@role_required("Admin")
+def delete_doctor(doctor_id):
+    """
+    Delete a doctor and their associated appointments.
+
+    Args:
+        doctor_id (int): The ID of the doctor to be deleted.
+
+    Returns:
+        200 - Doctor deleted
+        404 - Doctor not found
+        500 - Database error
+    """
+    try:
+        deleted = delete_accounts([doctor_id], roles=("Doctor",))
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": f"Database error: {str(e)}"}), 500
+
+    if not deleted:
+        return jsonify({"message": "Doctor not found"}), 404
+    forget_accounts(deleted)
+
+    return (
+        jsonify({"message": "Doctor and associated appointments deleted successfully"}),
+        200,
+    )
+
+
+@bp.route("/admin/patients/<int:patient_id>", methods=["DELETE", "OPTIONS"])
+@role_required("Admin")
+def delete_patient(patient_id):
+    """
+     Delete a patient and their associated appointments.
+
+     Args:
+         patient_id (int): The ID of the patient to be deleted.
+
+    Returns:
+         200 - Patient deleted
+         404 - Patient not found
+         500 - Database error
+    """
+    if request.method == "OPTIONS":
+        return (
+            jsonify({"message": "CORS preflight successful"}),
+            200,
+        )  # Handle preflight requests
+
+    try:
+        deleted = delete_accounts([patient_id], roles=("Patient",))
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": f"Database error: {str(e)}"}), 500
+
+    if not deleted:
+        return jsonify({"error": "Patient not found"}), 404
+    forget_accounts(deleted)
+
+    return (
+        jsonify(
+            {"message": "Patient and associated appointments deleted successfully"}
+        ),
+        200,
+    )
+
+
+@bp.route("/admin/purge", methods=["POST"])
+@role_required("Admin")
+def purge_accounts():
+    """
+    Delete many doctors and patients, in batches of short transactions.
+
+    Expected JSON payload, one of:
+        {"ids": [1, 2, 3]}                  doctors and patients by ID
+        {"inactive_since": "YYYY-MM-DD"}    patients whose last appointment
+                                            is before that date
+
+    Returns:
+        200 - {"count": int, "deleted": {role: count}, "not_found": [ids]}
+        400 - Invalid payload
+        500 - Database error; batches committed before it stay deleted
+    """
+    try:
+        ids, since = parse_purge_request(request.get_json(silent=True))
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+
+    deleted = {}
+    try:
+        for batch in purge_batches(ids, since):
+            batch_deleted = delete_accounts(batch)
+            db.session.commit()
+            forget_accounts(batch_deleted)
+            deleted.update(batch_deleted)
+    except Exception as e:
+        db.session.rollback()
+        return (
+            jsonify({"error": f"Database error: {str(e)}", "count": len(deleted)}),
+            500,
+        )
+
+    counts = {role: 0 for role in PURGE_ROLES}
+    for role in deleted.values():
+        counts[role] += 1
+    not_found = [user_id for user_id in ids or () if user_id not in deleted]
+    return jsonify({"count": len(deleted), "deleted": counts, "not_found": not_found})
+
+
+@bp.route("/admin/admins/<int:admin_id>", methods=["DELETE"])
+@role_required("Admin")
+def delete_admin(admin_id):
+    """
+    Deletes an admin user.
+
+    Args:
+        admin_id (int): The ID of the admin to delete.
+
+    Returns:
+        200 - Admin deleted
+        400 - Cannot delete own account
+        404 - Admin not found
+        500 - Database error
+    """
+    if admin_id == current_identity()["id"]:
+        return jsonify({"error": "You cannot delete yourself!"}), 400
+
+    try:
+        deleted = delete_accounts([admin_id], roles=("Admin",))
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": f"Database error: {str(e)}"}), 500
+
+    if not deleted:
+        return jsonify({"error": "Admin not found"}), 404
+    forget_accounts(deleted)
+    return jsonify({"message": "Admin deleted successfully"}), 200
@@ -0,0 +1,284 @@
+"""
+Booking routes: the doctor directory, free slots, booking and the patient's
+own appointments.
+"""
+
+from datetime import date as date_cls, timedelta
+
+from flask import Blueprint, Response, jsonify, request
+
+from auth import current_identity, role_required
+from directory import PUBLIC_FIELDS, doctor_directory, snapshot_versions
+from history import history_page
+from models import db, Appointment, insert_ignore
+from serialization import json_response
+from slots import parse_slot_time, slot_engine
+from sync import record_changes
+from versions import conditional
+
+bp = Blueprint("appointments", __name__)
+
+
+# ------------------------- DOCTOR MANAGEMENT -------------------------
+
+
+@bp.route("/doctors", methods=["GET"])
+@role_required("Doctor", "Patient", "Admin")
+@conditional("doctors", source=snapshot_versions)
+def get_doctors():
+    """
+    Returns a page of doctors from the in-process directory.
+
+    Supports the keyset pagination and search parameters of ``pagination``.
+
+    Returns:
+        200 - {"doctors": [...], "next_after": <id or null>}
+        400 - Invalid pagination parameters
+    """
+    try:
+        body = doctor_directory.snapshot().page(PUBLIC_FIELDS, request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return Response(body, mimetype="application/json")
+
+
+# ------------------------- APPOINTMENT MANAGEMENT -------------------------
+
+
+@bp.route("/available-times/<doctor_name>/<date>", methods=["GET"])
+@role_required("Doctor", "Admin", "Patient")
+def available_times(doctor_name, date):
+    """
+    Returns available time slots for a doctor on a specific date.
+
+    Args:
+        doctor_name (str): Name of the doctor
+        date (str): Appointment date in YYYY-MM-DD format
+
+    Returns:
+        200 - Available times
+        400 - Invalid date
+        404 - Doctor not found
+        500 - Internal error
+    """
+    try:
+        day = date_cls.fromisoformat(date)
+    except ValueError:
+        return jsonify({"error": "Invalid date"}), 400
+
+    doctor = doctor_directory.find(doctor_name)
+    if not doctor:
+        return jsonify({"error": "Doctor not found"}), 404
+
+    try:
+        # Slots come from the doctor's cached availability template
+        available_times = slot_engine.free_slots(doctor, day)
+
+        return jsonify({"available_times": available_times})
+
+    except Exception as e:
+        return jsonify({"error": f"An error occurred: {str(e)}"}), 500
+
+
+MAX_AVAILABILITY_DAYS = 31
+MAX_AVAILABILITY_DOCTORS = 100
+MAX_NEXT_SLOTS = 100
+
+
+@bp.route("/availability", methods=["GET"])
+@role_required("Doctor", "Admin", "Patient")
+def availability():
+    """
+    Returns free slots for many doctors over a date range in one request.
+
+    Query parameters:
+        start (str): First date in YYYY-MM-DD format (required)
+        end (str): Last date in YYYY-MM-DD format (default: 6 days after start)
+        doctor_ids (str): Comma-separated doctor IDs
+        specialty (str): Restrict to doctors of this specialty; at least one
+            of ``doctor_ids`` and ``specialty`` is required, and they may
+            select at most 100 doctors
+        next (int): Return only the N (1 to 100) earliest free slots instead
+            of the matrix
+
+    Returns:
+        200 - {"dates": [...], "doctors": [{"id", "name", "specialty", "free": [[slots per date]]}]}
+              or {"next_slots": [{"doctor_id", "doctor_name", "specialty", "date", "time"}]}
+        400 - Invalid parameters
+    """
+    try:
+        start = date_cls.fromisoformat(request.args["start"])
+        end = (
+            date_cls.fromisoformat(request.args["end"])
+            if "end" in request.args
+            else start + timedelta(days=6)
+        )
+        doctor_ids = {
+            int(doc_id)
+            for doc_id in request.args.get("doctor_ids", "").split(",")
+            if doc_id
+        }
+        limit = int(request.args["next"]) if "next" in request.args else None
+    except (KeyError, ValueError):
+        return jsonify({"error": "Invalid or missing parameters"}), 400
+
+    if not doctor_ids and "specialty" not in request.args:
+        return jsonify({"error": "doctor_ids or specialty is required"}), 400
+    if limit is not None and not 1 <= limit <= MAX_NEXT_SLOTS:
+        return jsonify({"error": f"next must be 1 to {MAX_NEXT_SLOTS}"}), 400
+
+    num_days = (end - start).days + 1
+    if not 1 <= num_days <= MAX_AVAILABILITY_DAYS:
+        return (
+            jsonify(
+                {"error": f"Date range must span 1 to {MAX_AVAILABILITY_DAYS} days"}
+            ),
+            400,
+        )
+    dates = [start + timedelta(days=i) for i in range(num_days)]
+
+    directory = doctor_directory.snapshot()
+    doctors = directory.doctors
+    if "specialty" in request.args:
+        doctors = directory.by_specialty.get(request.args["specialty"], ())
+    if doctor_ids:
+        doctors = [doctor for doctor in doctors if doctor.id in doctor_ids]
+    if len(doctors) > MAX_AVAILABILITY_DOCTORS:
+        return (
+            jsonify(
+                {
+                    "error": f"At most {MAX_AVAILABILITY_DOCTORS} doctors per "
+                    "request, narrow the search with doctor_ids"
+                }
+            ),
+            400,
+        )
+
+    if limit is not None:
+        next_slots = slot_engine.next_free_slots(doctors, dates, limit)
+        return jsonify(
+            {
+                "next_slots": [
+                    {
+                        "doctor_id": doctor.id,
+                        "doctor_name": doctor.name,
+                        "specialty": doctor.specialty,
+                        "date": day.isoformat(),
+                        "time": time_slot,
+                    }
+                    for day, time_slot, doctor in next_slots
+                ]
+            }
+        )
+
+    matrix = slot_engine.free_slot_matrix(doctors, dates)
+    return jsonify(
+        {
+            "dates": [day.isoformat() for day in dates],
+            "doctors": [
+                {
+                    "id": doctor.id,
+                    "name": doctor.name,
+                    "specialty": doctor.specialty,
+                    "free": [matrix[doctor.id][day] for day in dates],
+                }
+                for doctor in doctors
+            ],
+        }
+    )
+
+
+@bp.route("/book-appointment-api", methods=["POST"])
+@role_required("Patient", "Admin")  # Allow only Patients and Admins to book
+def book_appointment_api():
+    """Handles booking of an appointment."""
+    data = request.get_json()
+    patient_id, doctor_name, date, time_slot = (
+        data.get("patient_id"),
+        data.get("doctor"),
+        data.get("date"),
+        data.get("time"),
+    )
+
+    if not all([patient_id, doctor_name, date, time_slot]):
+        return jsonify({"status": "error", "message": "Missing data"}), 400
+
+    try:
+        date, time_slot = date_cls.fromisoformat(date), parse_slot_time(time_slot)
+    except (TypeError, ValueError):
+        return jsonify({"status": "error", "message": "Invalid date or time"}), 400
+
+    # Resolve the doctor by name from the in-process directory
+    doctor = doctor_directory.find(doctor_name)
+    if not doctor:
+        return jsonify({"status": "error", "message": "Doctor not found"}), 404
+
+    if not slot_engine.is_valid_slot(doctor, time_slot):
+        return jsonify({"status": "error", "message": "Invalid time slot"}), 400
+
+    # Insert in one statement; the unique constraint on (doctor_id, date,
+    # time_slot) decides which of several concurrent bookings wins the slot
+    stmt = (
+        insert_ignore(Appointment)
+        .values(
+            patient_id=patient_id, doctor_id=doctor.id, date=date, time_slot=time_slot
+        )
+        .on_conflict_do_nothing(index_elements=["doctor_id", "date", "time_slot"])
+        .returning(Appointment.id)
+    )
+
+    try:
+        appointment_id = db.session.execute(stmt).scalar()
+        if appointment_id is not None:
+            record_changes([(appointment_id, doctor.id)], "booked")
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return (
+            jsonify({"status": "error", "message": f"Database error: {str(e)}"}),
+            500,
+        )
+
+    if appointment_id is None:
+        return (
+            jsonify({"status": "error", "message": "Time slot already booked"}),
+            400,
+        )
+
+    return jsonify(
+        {
+            "status": "success",
+            "message": "Appointment booked successfully!",
+            "appointment_id": appointment_id,
+        }
+    )
+
+
+# ------------------------- PATIENT DASHBOARD -------------------------
+
+
+@bp.route("/patient/appointments", methods=["GET"])
+@role_required("Patient")
+def get_patient_appointments():
+    """
+    Fetch a page of the logged-in patient's appointments.
+
+    Query parameters:
+        window (str): 'upcoming' (default, soonest first) or 'past' (latest first)
+        limit (int): Page size, 1 to 500 (default 50)
+        after (str): ``next_after`` cursor of the previous page
+
+    Returns:
+        200 - {"appointments": [...], "next_after": str or null}, with the
+              doctor's name and specialty on each appointment
+        400 - Invalid window or pagination parameters
+    """
+    try:
+        appointments, next_after = history_page(
+            current_identity()["profile_id"], request.args
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return json_response({"appointments": appointments, "next_after": next_after})
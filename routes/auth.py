@@ -0,0 +1,199 @@
+"""
+Account routes: signup, login/logout with JWT cookies and the current user.
+"""
+
+from flask import Blueprint, jsonify, request
+from flask_jwt_extended import (
+    create_access_token,
+    get_jwt,
+    get_jwt_identity,
+    jwt_required,
+    set_access_cookies,
+)
+from sqlalchemy.exc import IntegrityError
+
+from accounts import create_account, validate_account
+from auth import current_identity, identity_claims, role_required
+from models import db, User, Doctor, Patient
+from passwords import password_hasher
+from revocation import token_revocation
+
+bp = Blueprint("auth", __name__)
+
+
+# ------------------------- AUTHENTICATION & AUTHORIZATION using using JWT Tokens -------------------------
+@bp.route("/signup", methods=["POST"])
+def signup():
+    """
+    Handles user registration.
+
+    Expected JSON payload:
+    {
+        "name": "John Doe",
+        "email": "johndoe@example.com",
+        "password": "securepassword",
+        "role": "Doctor/Patient/Admin"
+    }
+
+    Returns:
+        201 - User registered successfully
+        400 - Missing fields, invalid role or availability, or email already exists
+        500 - Database error
+    """
+    data = request.get_json(silent=True) or {}
+
+    # Validate fields, role and availability before touching the database
+    error = validate_account(data)
+    if error:
+        return jsonify({"error": error}), 400
+
+    # User and Doctor/Patient rows are written in one transaction; the unique
+    # email constraint reports existing accounts
+    try:
+        create_account(data)
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({"error": "Email already exists"}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": f"Error adding user: {str(e)}"}), 500
+
+    response = jsonify({"message": "Signup successful!", "role": data["role"]})
+    return response, 201
+
+
+@bp.route("/login", methods=["POST"])
+def login():
+    """
+    Handles user login.
+
+    Expected JSON payload:
+    {
+        "email": "user@example.com",
+        "password": "securepassword"
+    }
+
+    Returns:
+        200 - Login successful
+        401 - Invalid credentials
+    """
+    data = request.get_json()
+    email, password = data.get("email"), data.get("password")
+
+    user = User.query.filter_by(email=email).first()
+
+    if user and user.check_password(password):  # Use check_password method
+
+        # Upgrade hashes made with an outdated scheme or cost
+        if password_hasher.needs_rehash(user.password_hash):
+            user.set_password(password)
+            try:
+                db.session.commit()
+            except Exception:
+                db.session.rollback()  # Keep the old hash, login still succeeds
+
+        # instead of Generating JWT token we will use HTTP-only cookies to store JWTs, to prevent token leaks.
+        access_token = create_access_token(
+            identity=str(user.id),
+            additional_claims=identity_claims(user),  # Role checks skip the DB
+        )  # Expires after JWT_ACCESS_TOKEN_EXPIRES, see revocation.revoke_users
+        response = jsonify(
+            {"message": f"Welcome {user.role}!", "role": user.role, "name": user.name}
+        )
+        set_access_cookies(response, access_token)
+        return response, 200
+
+    return jsonify({"error": "Invalid credentials"}), 401
+
+
+@bp.route("/logout", methods=["POST"])
+@jwt_required()
+def logout():
+    token = get_jwt()
+    token_revocation.revoke(token["jti"], token["exp"])  # Until the token expires
+
+    # Create a response object
+    response = jsonify({"message": "Logged out successfully"})
+
+    # Expire the cookies immediately
+    response.set_cookie(
+        "access_token_cookie",
+        "",
+        expires=0,
+        httponly=True,
+        samesite="None",
+        secure=True,
+    )
+    response.set_cookie(
+        "csrf_access_token", "", expires=0, httponly=False, samesite="None", secure=True
+    )
+
+    return response, 200
+
+
+# ------------------------- GET USER DETAILS -------------------------
+@bp.route("/me", methods=["GET"])
+@jwt_required()
+def get_current_user():
+    """Fetches user details from the JWT token."""
+    user_id = get_jwt_identity()
+    user = User.query.get(user_id)
+
+    if not user:
+        return jsonify({"error": "User not found"}), 404
+
+    return (
+        jsonify(
+            {"id": user.id, "name": user.name, "email": user.email, "role": user.role}
+        ),
+        200,
+    )
+
+
+# ------------------------- DASHBOARD -------------------------
+
+
+@bp.route("/dashboard", methods=["GET"])
+@role_required(error="Invalid role")
+def dashboard():
+    """
+    Returns dashboard information based on user role.
+
+    Returns:
+        401 - Unauthorized
+        403 - Access denied
+        200 - User-specific dashboard data
+    """
+    identity = current_identity()
+    current_user_id = identity["id"]
+
+    if identity["role"] == "Patient":
+        patient = Patient.query.get(current_user_id)
+        if patient:
+            return jsonify(
+                {
+                    "message": f"Welcome {patient.name}",
+                    "patient_id": patient.id,
+                    "role": "Patient",
+                    "name": patient.name,
+                }
+            )
+
+    elif identity["role"] == "Doctor":
+        doctor = Doctor.query.get(current_user_id)
+        if doctor:
+            return jsonify(
+                {
+                    "message": f"Welcome Dr. {doctor.name}",
+                    "doctor_id": doctor.id,
+                    "role": "Doctor",
+                    "name": doctor.name,
+                    "specialty": doctor.specialty,
+                }
+            )
+
+    elif identity["role"] == "Admin":
+        return jsonify({"message": "Welcome Admin", "role": "Admin"})
+
+    return jsonify({"error": "Access denied"}), 403
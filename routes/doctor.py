@@ -0,0 +1,212 @@
+"""
+Doctor dashboard routes: the doctor's appointments, their sync and event
+streams, and single and bulk updates.
+"""
+
+from datetime import date as date_cls
+
+from flask import Blueprint, Response, jsonify, request
+
+from auth import current_identity, role_required
+from bulk import bulk_appointment_action, parse_bulk_request
+from events import event_hub
+from models import db, Doctor, Patient, Appointment
+from schemas import APPOINTMENT
+from serialization import json_response
+from sync import record_changes, record_deletions, sync_appointments
+from versions import conditional, doctor_scope
+
+bp = Blueprint("doctor", __name__)
+
+
+# ------------------------- DOCTOR DASHBOARD -------------------------
+
+
+@bp.route("/doctor/appointments", methods=["GET"])
+@role_required("Doctor")
+@conditional(lambda: doctor_scope(current_identity()["profile_id"]))
+def get_doctor_appointments():
+    """
+    Fetch all appointments assigned to the logged-in doctor.
+
+    Returns:
+        JSON: List of appointments with patient details.
+    """
+    doctor = Doctor.query.get(current_identity()["profile_id"])
+    if not doctor:
+        return jsonify({"error": "Doctor not found"}), 404
+
+    # One query with the patient names, encoded straight from the rows
+    rows = db.session.execute(
+        APPOINTMENT.select()
+        .outerjoin(Patient, Patient.id == Appointment.patient_id)
+        .where(Appointment.doctor_id == doctor.id)
+        .order_by(Appointment.date, Appointment.time_slot)
+    )
+
+    return json_response({"appointments": APPOINTMENT.encode(rows)})
+
+
+@bp.route("/doctor/appointments/sync", methods=["GET"])
+@role_required("Doctor")
+def sync_doctor_appointments():
+    """
+    Incremental sync of the logged-in doctor's appointments.
+
+    Query parameters:
+        since (str): Cursor returned by the previous sync; omit for a full list
+        start, end (str): Date window in YYYY-MM-DD format; defaults to the
+            past week and everything upcoming
+
+    Returns:
+        200 - {"appointments": [...], "deleted": [ids], "cursor": str, "full": bool}
+        400 - Invalid cursor or date
+    """
+    try:
+        start, end = (
+            date_cls.fromisoformat(request.args[key]) if key in request.args else None
+            for key in ("start", "end")
+        )
+        result = sync_appointments(
+            current_identity()["profile_id"], request.args.get("since"), start, end
+        )
+    except ValueError:
+        return jsonify({"error": "Invalid cursor or date"}), 400
+
+    return json_response(result)
+
+
+def event_stream(channels):
+    """SSE response following ``channels``, resuming after ``Last-Event-ID``."""
+    return Response(
+        event_hub.stream(channels, request.headers.get("Last-Event-ID")),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@bp.route("/doctor/appointments/events", methods=["GET"])
+@role_required("Doctor")
+def doctor_appointment_events():
+    """
+    Server-Sent Events for the logged-in doctor's appointments.
+
+    Events: 'booked', 'done', 'deleted' with {"doctor_id", "ids", "version"},
+    and 'reset' when the client missed events and should resync.
+    """
+    return event_stream([f"doctor:{current_identity()['profile_id']}"])
+
+
+@bp.route("/doctor/appointments/<int:appointment_id>", methods=["DELETE"])
+@role_required("Doctor", error="Unauthorized role")
+def delete_appointment(appointment_id):
+    """
+    Allow a doctor to delete an appointment they own.
+
+    Args:
+        appointment_id (int): The ID of the appointment to be deleted.
+
+    Returns:
+        200 - Appointment deleted
+        403 - Unauthorized
+        404 - Appointment not found
+        500 - Database error
+    """
+    current_user_id = current_identity()["id"]
+
+    appointment = Appointment.query.get(appointment_id)
+    if not appointment:
+        return jsonify({"error": "Appointment not found"}), 404
+
+    if int(appointment.doctor_id) != int(current_user_id):
+        return jsonify({"error": "Unauthorized to delete this appointment"}), 403
+
+    try:
+        db.session.delete(appointment)
+        record_deletions([(appointment.id, appointment.doctor_id, appointment.date)])
+        db.session.commit()
+        return jsonify({"message": "Appointment deleted successfully"}), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": f"Database error: {str(e)}"}), 500
+
+
+@bp.route("/doctor/appointments/<int:appointment_id>/done", methods=["PUT"])
+@role_required("Doctor")
+def mark_appointment_done(appointment_id):
+    """
+    Allow a doctor to mark an appointment as 'done'.
+
+    Args:
+        appointment_id (int): The ID of the appointment.
+
+    Returns:
+        JSON: Success or error message.
+    """
+    current_user_id = current_identity()["id"]
+
+    appointment = Appointment.query.get(appointment_id)
+    if not appointment:
+        return jsonify({"error": "Appointment not found"}), 404
+
+    if int(appointment.doctor_id) != int(current_user_id):
+        return jsonify({"error": "Unauthorized to mark this appointment as done"}), 403
+
+    try:
+        appointment.status = "done"
+        record_changes([(appointment.id, appointment.doctor_id)], "done")
+        db.session.commit()
+        return jsonify({"message": "Appointment marked as done"}), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": f"Database error: {str(e)}"}), 500
+
+
+def bulk_appointments_response(action, doctor_id=None):
+    """Runs a bulk action from the request body and builds the JSON response."""
+    try:
+        ids, day = parse_bulk_request(request.get_json(silent=True))
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        results = bulk_appointment_action(action, ids, day, doctor_id)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": f"Database error: {str(e)}"}), 500
+
+    count = sum(result in ("done", "deleted") for result in results.values())
+    return jsonify({"results": results, "count": count}), 200
+
+
+@bp.route("/doctor/appointments/done", methods=["PUT"])
+@role_required("Doctor")
+def bulk_mark_appointments_done():
+    """
+    Mark many of the doctor's appointments as 'done' in one transaction.
+
+    Expected JSON payload: {"ids": [1, 2, 3]} or {"date": "YYYY-MM-DD"}
+
+    Returns:
+        200 - Per-ID results: 'done', 'not_found' or 'forbidden'
+        400 - Invalid payload
+        500 - Database error
+    """
+    return bulk_appointments_response("done", doctor_id=current_identity()["id"])
+
+
+@bp.route("/doctor/appointments", methods=["DELETE"])
+@role_required("Doctor", error="Unauthorized role")
+def bulk_delete_appointments():
+    """
+    Delete many of the doctor's appointments in one transaction.
+
+    Expected JSON payload: {"ids": [1, 2, 3]} or {"date": "YYYY-MM-DD"}
+
+    Returns:
+        200 - Per-ID results: 'deleted', 'not_found' or 'forbidden'
+        400 - Invalid payload
+        500 - Database error
+    """
+    return bulk_appointments_response("delete", doctor_id=current_identity()["id"])
@@ -0,0 +1,92 @@
+"""
+JSON serialization of API responses.
+
+The app's JSON provider is pluggable (``JSON_PROVIDER``):
+
+    stdlib  - Flask's default provider (``json`` module)
+    orjson  - the same documents (sorted keys, HTTP dates) encoded by orjson,
+              several times faster on large lists
+    auto    - orjson when it is installed, stdlib otherwise (default)
+
+List endpoints skip the per-row dicts altogether: ``schemas.py`` encodes
+result rows straight into a ``RawJSON`` array, which ``json_response``
+embeds into the response as is.
+"""
+
+from json.encoder import encode_basestring_ascii
+
+from flask import current_app
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # Optional dependency, only needed for the orjson provider
+    orjson = None
+
+
+class RawJSON(str):
+    """Already-encoded JSON, embedded as is by ``json_response``."""
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask's default provider with orjson doing the encoding and decoding."""
+
+    def _option(self, indent):
+        # Dates go through ``default`` to be formatted like Flask does; int
+        # keys become strings like with ``json``
+        option = (
+            orjson.OPT_SORT_KEYS
+            | orjson.OPT_PASSTHROUGH_DATETIME
+            | orjson.OPT_NON_STR_KEYS
+        )
+        return option | orjson.OPT_INDENT_2 if indent else option
+
+    def dumps(self, obj, **kwargs):
+        # Formatting arguments of ``json.dumps`` other than indent don't apply
+        return orjson.dumps(
+            obj, default=self.default, option=self._option(kwargs.get("indent"))
+        ).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = self.compact is False or (self.compact is None and self._app.debug)
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=self._option(indent))
+            + b"\n",
+            mimetype=self.mimetype,
+        )
+
+
+PROVIDERS = {"stdlib": DefaultJSONProvider, "orjson": OrjsonProvider}
+
+
+def init_json_provider(app):
+    """Installs the provider selected by ``JSON_PROVIDER`` on ``app``."""
+    name = app.config.get("JSON_PROVIDER", "auto")
+    if name == "auto":
+        name = "stdlib" if orjson is None else "orjson"
+    if name == "orjson" and orjson is None:
+        raise RuntimeError("The orjson JSON provider requires 'orjson'")
+    app.json = PROVIDERS[name](app)
+
+
+def json_response(obj, status=200):
+    """
+    ``jsonify`` for a dict whose values may be ``RawJSON``.
+
+    Keys are sorted and the body is compact, like ``jsonify`` outside debug
+    mode, so clients can't tell the two apart.
+    """
+    dumps = current_app.json.dumps
+    members = ",".join(
+        encode_basestring_ascii(key)
+        + ":"
+        + (value if isinstance(value, RawJSON) else dumps(value, separators=(",", ":")))
+        for key, value in sorted(obj.items())
+    )
+    return current_app.response_class(
+        "{" + members + "}\n", status=status, mimetype=current_app.json.mimetype
+    )
@@ -0,0 +1,293 @@
+"""
+Slot engine for doctor availability.
+
+A doctor's ``available_slots`` spec is parsed once into integer minute-offset
+ranges and turned into a ``SlotTemplate``. Templates are cached per doctor, so
+computing free slots for a day only costs one projected ``SELECT time_slot``
+plus a few bitmask operations. Slots are stored as ``TIME`` values and exposed
+to clients as labels such as '09:00AM'.
+
+Spec format: comma/semicolon separated ranges, each optionally followed by
+``/<minutes>`` for the slot length (default 60), e.g.::
+
+    9:00AM-5:00PM
+    9:00AM-12:00PM, 1:00PM-5:00PM/30
+    08:00-12:00/20; 14:00-18:00
+"""
+
+import heapq
+import logging
+import re
+import threading
+from collections import defaultdict
+from datetime import time
+
+from sqlalchemy import select
+
+from extensions import AppLocal
+from models import db, Appointment
+
+DEFAULT_AVAILABILITY = "9:00AM-5:00PM"
+DEFAULT_SLOT_MINUTES = 60
+MINUTES_PER_DAY = 24 * 60
+
+logger = logging.getLogger(__name__)
+
+_TIME_RE = re.compile(r"^\s*(\d{1,2})(?::(\d{2}))?\s*([AaPp][Mm])?\s*$")
+
+
+def _parse_time(value):
+    """Converts '9:00AM', '09:00PM' or '17:30' to minutes after midnight."""
+    match = _TIME_RE.match(value)
+    if not match:
+        raise ValueError(f"Invalid time: {value!r}")
+
+    hours, minutes, meridiem = int(match[1]), int(match[2] or 0), match[3]
+    if meridiem:
+        if not 1 <= hours <= 12:
+            raise ValueError(f"Invalid time: {value!r}")
+        hours = hours % 12 + (12 if meridiem.upper() == "PM" else 0)
+    if hours > 23 or minutes > 59:
+        raise ValueError(f"Invalid time: {value!r}")
+
+    return hours * 60 + minutes
+
+
+def format_minutes(minutes):
+    """Formats minutes after midnight the way time slots are stored ('09:00AM')."""
+    hours, minutes = divmod(minutes, 60)
+    meridiem = "AM" if hours < 12 else "PM"
+    return f"{(hours % 12) or 12:02d}:{minutes:02d}{meridiem}"
+
+
+def parse_slot_time(label):
+    """Converts a slot label such as '09:00AM' to a ``time``."""
+    minutes = _parse_time(label)
+    return time(minutes // 60, minutes % 60)
+
+
+def format_slot_time(value):
+    """Converts a ``time`` to its slot label ('09:00AM')."""
+    return format_minutes(value.hour * 60 + value.minute)
+
+
+def parse_availability(spec):
+    """
+    Parses an availability spec into minute-offset ranges.
+
+    Args:
+        spec (str): Availability spec, see module docstring.
+
+    Returns:
+        tuple: ``(start, end, step)`` tuples in minutes, sorted by start.
+
+    Raises:
+        ValueError: If the spec is malformed or ranges overlap.
+    """
+    ranges = []
+    for part in re.split(r"[,;]", spec or DEFAULT_AVAILABILITY):
+        if not part.strip():
+            continue
+
+        span, _, step = part.partition("/")
+        start, sep, end = span.partition("-")
+        if not sep:
+            raise ValueError(f"Invalid range: {part.strip()!r}")
+
+        start, end = _parse_time(start), _parse_time(end)
+        step = int(step) if step.strip() else DEFAULT_SLOT_MINUTES
+        if end == 0:
+            end = MINUTES_PER_DAY  # '-12:00AM' means midnight
+        if start >= end or step <= 0:
+            raise ValueError(f"Invalid range: {part.strip()!r}")
+        ranges.append((start, end, step))
+
+    if not ranges:
+        raise ValueError("Empty availability spec")
+
+    ranges.sort()
+    for (_, prev_end, _), (start, _, _) in zip(ranges, ranges[1:]):
+        if start < prev_end:
+            raise ValueError(f"Overlapping ranges in {spec!r}")
+
+    return tuple(ranges)
+
+
+class SlotTemplate:
+    """Immutable per-day list of slots derived from an availability spec."""
+
+    __slots__ = ("spec", "offsets", "labels", "index", "full_mask")
+
+    def __init__(self, spec, ranges=None):
+        self.spec = spec
+        if ranges is None:
+            ranges = parse_availability(spec)
+        self.offsets = tuple(
+            minute
+            for start, end, step in ranges
+            for minute in range(start, end - step + 1, step)
+        )
+        self.labels = tuple(format_minutes(m) for m in self.offsets)
+        self.index = {minute: i for i, minute in enumerate(self.offsets)}
+        self.full_mask = (1 << len(self.labels)) - 1
+
+    def booked_mask(self, booked_slots):
+        """Bitmask of the template slots present in ``booked_slots`` (times)."""
+        mask = 0
+        for slot in booked_slots:
+            i = self.index.get(slot.hour * 60 + slot.minute)
+            if i is not None:
+                mask |= 1 << i
+        return mask
+
+    def labels_for(self, mask):
+        """Slot labels for the bits set in ``mask``, in time order."""
+        return [label for i, label in enumerate(self.labels) if mask >> i & 1]
+
+    def free_slots(self, booked_slots):
+        return self.labels_for(self.full_mask & ~self.booked_mask(booked_slots))
+
+
+class SlotEngine:
+    """Per-app cache of parsed slot templates keyed by doctor ID."""
+
+    def __init__(self):
+        self._templates = {}
+        self._lock = threading.Lock()
+
+    def template_for(self, doctor):
+        """
+        Returns the cached template, reparsing if the doctor's spec changed.
+
+        Specs saved before signup validated them (e.g. 'Mon-Fri 9-5') get
+        the default hours, so one such doctor can't fail the pages that list
+        every doctor. The fallback is cached under the stored spec and
+        logged once.
+        """
+        spec = doctor.available_slots or DEFAULT_AVAILABILITY
+        template = self._templates.get(doctor.id)
+        if template is None or template.spec != spec:
+            try:
+                template = SlotTemplate(spec)
+            except ValueError as e:
+                logger.warning(
+                    "Doctor %s has an invalid availability spec %r (%s), using %r",
+                    doctor.id,
+                    spec,
+                    e,
+                    DEFAULT_AVAILABILITY,
+                )
+                template = SlotTemplate(spec, parse_availability(DEFAULT_AVAILABILITY))
+            with self._lock:
+                self._templates[doctor.id] = template
+        return template
+
+    def invalidate(self, doctor_id):
+        with self._lock:
+            self._templates.pop(doctor_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._templates.clear()
+
+    @staticmethod
+    def booked_slots_query(doctor_id, date):
+        return select(Appointment.time_slot).where(
+            Appointment.doctor_id == doctor_id, Appointment.date == date
+        )
+
+    def booked_slots(self, doctor_id, date):
+        """Booked time slots of a doctor on a date, as one projected query."""
+        return db.session.execute(self.booked_slots_query(doctor_id, date)).scalars()
+
+    def free_slots(self, doctor, date):
+        """
+        Returns the free time slots of a doctor on a date.
+
+        Args:
+            doctor (Doctor): The doctor.
+            date (date): The day.
+
+        Returns:
+            list: Slot labels such as '09:00AM', in time order.
+        """
+        template = self.template_for(doctor)
+        return template.free_slots(self.booked_slots(doctor.id, date))
+
+    def booked_slots_by_day(self, doctor_ids, dates):
+        """Booked slots for many doctors and dates, grouped by (doctor_id, date)."""
+        booked = defaultdict(list)
+        rows = db.session.execute(
+            select(
+                Appointment.doctor_id, Appointment.date, Appointment.time_slot
+            ).where(Appointment.doctor_id.in_(doctor_ids), Appointment.date.in_(dates))
+        )
+        for doctor_id, date, time_slot in rows:
+            booked[doctor_id, date].append(time_slot)
+        return booked
+
+    def free_slot_matrix(self, doctors, dates):
+        """
+        Returns free slots for every doctor and date from one grouped query.
+
+        Args:
+            doctors (list): Doctor rows.
+            dates (list): ``date`` objects.
+
+        Returns:
+            dict: ``{doctor_id: {date: [slot labels]}}``
+        """
+        booked = self.booked_slots_by_day([doc.id for doc in doctors], dates)
+        matrix = {}
+        for doctor in doctors:
+            template = self.template_for(doctor)
+            matrix[doctor.id] = {
+                date: template.free_slots(booked.get((doctor.id, date), ()))
+                for date in dates
+            }
+        return matrix
+
+    def next_free_slots(self, doctors, dates, limit):
+        """
+        Returns the ``limit`` earliest free slots across doctors and dates.
+
+        Days are scanned in order, a week of bookings at a time, and the scan
+        stops at the first day that completes the result.
+
+        Returns:
+            list: ``(date, label, doctor)`` tuples ordered by date and time.
+        """
+        dates = sorted(dates)
+        templates = [(doctor, self.template_for(doctor)) for doctor in doctors]
+        result = []
+        for week_start in range(0, len(dates), 7):
+            week = dates[week_start : week_start + 7]
+            booked = self.booked_slots_by_day([doc.id for doc in doctors], week)
+            for date in week:
+                candidates = []
+                for doctor, template in templates:
+                    free = template.full_mask & ~template.booked_mask(
+                        booked.get((doctor.id, date), ())
+                    )
+                    candidates.extend(
+                        (template.offsets[i], doctor.id, template.labels[i], doctor)
+                        for i in range(len(template.labels))
+                        if free >> i & 1
+                    )
+                result.extend(
+                    (date, label, doctor)
+                    for _, _, label, doctor in heapq.nsmallest(
+                        limit - len(result), candidates
+                    )
+                )
+                if len(result) >= limit:
+                    return result
+        return result
+
+    def is_valid_slot(self, doctor, time_slot):
+        """Whether ``time_slot`` (a ``time``) is part of the doctor's template."""
+        minute = time_slot.hour * 60 + time_slot.minute
+        return minute in self.template_for(doctor).index
+
+
+slot_engine = AppLocal("slot_engine", SlotEngine)
@@ -0,0 +1,214 @@
+"""
+Delta sync of a doctor's appointment list.
+
+Every write to an appointment stamps it with the doctor's new change counter
+(see ``versions.py``), and every deletion leaves a tombstone stamped the same
+way. A client that remembers the cursor of its last sync then only needs the
+rows and tombstones with a higher version:
+
+    GET /doctor/appointments/sync                     full list of the window
+    GET /doctor/appointments/sync?since=<cursor>      changes since that sync
+
+The counters are bumped under a row lock held until commit, so versions are
+handed out in commit order and a cursor never skips a concurrent write.
+Tombstones are kept for ``TOMBSTONE_RETENTION``; older cursors get a full list
+again (``"full": true``).
+"""
+
+import itertools
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import case, delete, select, update
+
+from analytics import refresh_days
+from events import event_hub
+from models import db, insert_ignore, Appointment, AppointmentTombstone, Patient
+from schemas import APPOINTMENT
+from versions import bump, current, doctor_scope
+
+RECENT_DAYS = 7  # Default window: past week and everything upcoming
+TOMBSTONE_RETENTION = timedelta(days=30)
+PURGE_EVERY = 100  # Deletions between two purges of old tombstones
+
+_deletions = itertools.count(1)
+
+
+def _utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _by_doctor(rows):
+    """Groups appointment IDs by doctor, from rows starting with both IDs."""
+    grouped = defaultdict(list)
+    for appointment_id, doctor_id, *_ in rows:
+        grouped[doctor_id].append(appointment_id)
+    return grouped
+
+
+def _publish(event_type, grouped, versions):
+    for doctor_id, ids in grouped.items():
+        version = versions[doctor_scope(doctor_id)]
+        event_hub.publish(
+            [f"doctor:{doctor_id}", "admin"],
+            event_type,
+            {"doctor_id": doctor_id, "ids": ids, "version": version},
+        )
+
+
+def record_changes(rows, event_type="updated"):
+    """
+    Stamps created or updated appointments with their doctors' new versions,
+    recounts their days in the analytics rollup and publishes ``event_type``
+    to the doctors' event streams.
+
+    Args:
+        rows: (appointment ID, doctor ID) pairs written in this transaction.
+        event_type (str): 'booked', 'done' or 'updated'.
+    """
+    grouped = _by_doctor(rows)
+    if not grouped:
+        return
+
+    versions = bump(*(doctor_scope(doctor_id) for doctor_id in grouped))
+    days = db.session.execute(
+        update(Appointment)
+        .where(Appointment.id.in_([i for ids in grouped.values() for i in ids]))
+        .values(
+            version=case(
+                {d: versions[doctor_scope(d)] for d in grouped},
+                value=Appointment.doctor_id,
+            )
+        )
+        .returning(Appointment.doctor_id, Appointment.date),
+        execution_options={"synchronize_session": False},
+    ).all()
+    # After the bump, which serializes the doctors' writers (see analytics.py)
+    refresh_days(days)
+    _publish(event_type, grouped, versions)
+
+
+def record_deletions(rows):
+    """
+    Leaves tombstones for deleted appointments, recounts their days in the
+    analytics rollup and publishes 'deleted' events.
+
+    Args:
+        rows: (appointment ID, doctor ID, date) of the appointments deleted in
+            this transaction.
+    """
+    grouped = _by_doctor(rows)
+    if not grouped:
+        return
+
+    versions = bump(*(doctor_scope(doctor_id) for doctor_id in grouped))
+    now = _utcnow()
+    stmt = insert_ignore(AppointmentTombstone).values(
+        [
+            {
+                "id": appointment_id,
+                "doctor_id": doctor_id,
+                "version": versions[doctor_scope(doctor_id)],
+                "deleted_at": now,
+            }
+            for doctor_id, ids in grouped.items()
+            for appointment_id in ids
+        ]
+    )
+    # SQLite may reuse the IDs of deleted rows; the latest deletion wins
+    db.session.execute(
+        stmt.on_conflict_do_update(
+            index_elements=["id"],
+            set_={
+                "doctor_id": stmt.excluded.doctor_id,
+                "version": stmt.excluded.version,
+                "deleted_at": stmt.excluded.deleted_at,
+            },
+        )
+    )
+
+    refresh_days((doctor_id, day) for _, doctor_id, day in rows)
+    _publish("deleted", grouped, versions)
+
+    if next(_deletions) % PURGE_EVERY == 0:
+        db.session.execute(
+            delete(AppointmentTombstone).where(
+                AppointmentTombstone.deleted_at < now - TOMBSTONE_RETENTION
+            )
+        )
+
+
+def parse_cursor(cursor):
+    """
+    Splits a sync cursor ``<version>.<issued at>``.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    version, issued_at = cursor.split(".")
+    return int(version), int(issued_at)
+
+
+def sync_appointments(doctor_id, since=None, start=None, end=None):
+    """
+    Appointments of a doctor changed since a cursor, or all of them.
+
+    Args:
+        doctor_id (int): The doctor.
+        since (str): Cursor of the previous sync; None for a full list.
+        start (date): First date of the window, by default ``RECENT_DAYS`` ago.
+        end (date): Last date of the window, open-ended by default.
+
+    Returns:
+        dict: ``appointments`` created or changed (a ``RawJSON`` array, see
+        ``serialization.json_response``), ``deleted`` IDs, the new ``cursor``
+        and whether this is a ``full`` list replacing the client's.
+
+    Raises:
+        ValueError: If ``since`` is malformed.
+    """
+    # Read the counter first: later writes get higher versions and are picked
+    # up (again) by the next sync
+    version = current(doctor_scope(doctor_id))[0][doctor_scope(doctor_id)]
+
+    full, since_version = True, 0
+    if since:
+        since_version, issued_at = parse_cursor(since)
+        expired = time.time() - issued_at > TOMBSTONE_RETENTION.total_seconds()
+        full = expired or since_version > version
+
+    start = start or date.today() - timedelta(days=RECENT_DAYS)
+    query = (
+        APPOINTMENT.select()
+        .outerjoin(Patient, Patient.id == Appointment.patient_id)
+        .where(Appointment.doctor_id == doctor_id, Appointment.date >= start)
+        .order_by(Appointment.date, Appointment.time_slot)
+    )
+    if end:
+        query = query.where(Appointment.date <= end)
+    if not full:
+        query = query.where(Appointment.version > since_version)
+
+    rows = db.session.execute(query).all()
+
+    deleted = []
+    if not full:
+        changed = {row.id for row in rows}
+        deleted = [
+            appointment_id
+            for appointment_id in db.session.execute(
+                select(AppointmentTombstone.id).where(
+                    AppointmentTombstone.doctor_id == doctor_id,
+                    AppointmentTombstone.version > since_version,
+                )
+            ).scalars()
+            if appointment_id not in changed
+        ]
+
+    return {
+        "appointments": APPOINTMENT.encode(rows),
+        "deleted": deleted,
+        "cursor": f"{version}.{int(time.time())}",
+        "full": full,
+    }
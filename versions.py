@@ -0,0 +1,164 @@
+"""
+Change counters for conditional GETs.
+
+Every write that changes what a list endpoint returns bumps the counter of a
+*scope* in the ``change_version`` table, in the same transaction as the write:
+
+    doctors                 - the doctor directory (``/doctors``, ``/admin/doctors``)
+    patients                - ``/admin/patients``
+    admins                  - ``/admin/admins``
+    appointments:doctor:<id> - one doctor's appointments
+
+``conditional`` derives an ETag and Last-Modified from those counters. A
+client that still has the current version gets ``304 Not Modified`` after a
+single primary-key lookup, without the rows being queried or serialized.
+Because the counters live in the database, all workers agree on them.
+Writes that bypass the application (manual SQL, seed scripts) don't bump
+anything, so clients may keep a stale copy until the next bump.
+"""
+
+import hashlib
+import time
+from functools import wraps
+
+from flask import make_response, request
+from sqlalchemy import select
+from werkzeug.http import http_date, quote_etag
+
+from auth import current_identity
+from models import db, insert_ignore, ChangeVersion
+
+ROLE_SCOPES = {"Doctor": "doctors", "Patient": "patients", "Admin": "admins"}
+
+
+def doctor_scope(doctor_id):
+    """Scope of one doctor's appointments."""
+    return f"appointments:doctor:{doctor_id}"
+
+
+def bump(*scopes):
+    """
+    Increments the counters of ``scopes`` in the current transaction.
+
+    The caller commits. The counter rows stay locked until then, so the new
+    versions of a scope are handed out in commit order.
+
+    The scopes are also collected in ``session.info["bumped_scopes"]`` for
+    after-commit hooks, see ``directory.py``.
+
+    Returns:
+        dict: New version of every scope.
+    """
+    scopes = sorted(set(scopes))  # Fixed order, so concurrent bumps can't deadlock
+    if not scopes:
+        return {}
+    db.session.info.setdefault("bumped_scopes", set()).update(scopes)
+
+    now = int(time.time())
+    stmt = insert_ignore(ChangeVersion).values(
+        [{"scope": scope, "version": 1, "changed_at": now} for scope in scopes]
+    )
+    return dict(
+        db.session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=["scope"],
+                set_={"version": ChangeVersion.version + 1, "changed_at": now},
+            ).returning(ChangeVersion.scope, ChangeVersion.version)
+        ).all()
+    )
+
+
+def current_query(scopes):
+    return select(
+        ChangeVersion.scope, ChangeVersion.version, ChangeVersion.changed_at
+    ).where(ChangeVersion.scope.in_(scopes))
+
+
+def current_result(rows, scopes):
+    """
+    Returns:
+        tuple: (versions keyed by scope, latest change as a UNIX timestamp or 0)
+    """
+    versions = {scope: 0 for scope in scopes}
+    versions.update({scope: version for scope, version, _ in rows})
+    return versions, max((changed_at for _, _, changed_at in rows), default=0)
+
+
+def current(*scopes):
+    """Current versions of ``scopes``, see ``current_result``."""
+    return current_result(db.session.execute(current_query(scopes)).all(), scopes)
+
+
+def etag_for(versions, full_path, user_id):
+    """ETag of a response built from ``versions`` for a path and user."""
+    key = f"{sorted(versions.items())}|{full_path}|{user_id}"
+    return hashlib.blake2b(key.encode(), digest_size=12).hexdigest()
+
+
+def is_not_modified(etag, changed_at, if_none_match, if_modified_since):
+    """
+    Whether the client's copy is current.
+
+    Args:
+        if_none_match (ETags): Parsed If-None-Match header, takes precedence.
+        if_modified_since (datetime): Parsed If-Modified-Since header or None.
+    """
+    if if_none_match:
+        # Weak comparison: gzipped responses carry the ETag as W/"..."
+        return if_none_match.contains_weak(etag)
+    # Change times are whole seconds, like HTTP dates: a later change in the
+    # same second looks unchanged unless the whole second has passed
+    return bool(
+        if_modified_since
+        and changed_at
+        and int(changed_at) + 1 <= if_modified_since.timestamp()
+    )
+
+
+def conditional(*scopes, source=current):
+    """
+    Route decorator answering conditional GETs from the change counters.
+
+    Goes below ``role_required``, so the JWT is verified first.
+
+    Args:
+        *scopes (str | callable): Scopes the response depends on; callables are
+            called per request, e.g. to build the current doctor's scope.
+        source (callable): Returns the versions of the scopes like ``current``;
+            views served from an in-process copy pass that copy's versions.
+
+    The ETag covers the counters, the full path (page, filters) and the user.
+    Responses are marked ``private, no-cache`` so browsers keep them and
+    revalidate on every use.
+    """
+
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            names = [scope() if callable(scope) else scope for scope in scopes]
+            versions, changed_at = source(*names)
+            etag = etag_for(versions, request.full_path, current_identity()["id"])
+
+            if is_not_modified(
+                etag, changed_at, request.if_none_match, request.if_modified_since
+            ):
+                response = make_response("", 304)
+            else:
+                response = make_response(fn(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.headers.update(cache_headers(etag, changed_at))
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def cache_headers(etag, changed_at):
+    """ETag, Last-Modified and Cache-Control of a versioned response."""
+    headers = {"ETag": quote_etag(etag), "Cache-Control": "private, no-cache"}
+    if changed_at:
+        headers["Last-Modified"] = http_date(changed_at)
+    return headers